@@ -0,0 +1,166 @@
+import json
+import os
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Colonnes des fichiers d'archive (le dict feature_importance est stocké en JSON)
+ARCHIVE_COLUMNS = [
+    "_id", "prediction_id", "customer_id", "customer_name", "timestamp", "created_at",
+    "churn_probability", "prediction", "confidence", "risk_level", "message", "feature_importance"
+]
+
+def _archive_schema():
+    return pa.schema([
+        ("_id", pa.string()),
+        ("prediction_id", pa.string()),
+        ("customer_id", pa.string()),
+        ("customer_name", pa.string()),
+        ("timestamp", pa.string()),
+        ("created_at", pa.timestamp("us")),
+        ("churn_probability", pa.float64()),
+        ("prediction", pa.int8()),
+        ("confidence", pa.float64()),
+        ("risk_level", pa.string()),
+        ("message", pa.string()),
+        ("feature_importance", pa.string())
+    ])
+
+class PredictionArchive:
+    """Archive froide des prédictions : fichiers Parquet compressés partitionnés par jour"""
+
+    def __init__(self, base_dir: str, compression: str = "zstd"):
+        self.base_dir = base_dir
+        self.compression = compression
+        self.manifest_path = os.path.join(base_dir, "manifest.json")
+        self._manifest: Optional[Dict[str, Dict[str, Any]]] = None
+
+    @property
+    def available(self) -> bool:
+        return pa is not None
+
+    # --- Manifest (statistiques par partition, évite de relire les fichiers) ---
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        if self._manifest is None:
+            if os.path.exists(self.manifest_path):
+                with open(self.manifest_path) as f:
+                    self._manifest = json.load(f)
+            else:
+                self._manifest = {}
+        return self._manifest
+
+    def _save_manifest(self):
+        os.makedirs(self.base_dir, exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def partitions(self, newest_first: bool = True) -> List[str]:
+        """Dates (YYYY-MM-DD) des partitions archivées"""
+        return sorted(self._load_manifest().keys(), reverse=newest_first)
+
+    def stats(self) -> Dict[str, float]:
+        """Totaux agrégés de l'archive (comptes, churn, haut risque, somme des confiances)"""
+        totals = {"count": 0, "churn_count": 0, "high_risk_count": 0, "confidence_sum": 0.0}
+        for partition in self._load_manifest().values():
+            for key in totals:
+                totals[key] += partition.get(key, 0)
+        return totals
+
+    # --- Écriture ---
+
+    def write_partition(self, day: date, documents: List[Dict[str, Any]]) -> str:
+        """Écrire un lot de prédictions d'une même journée dans un nouveau fichier de la partition"""
+        partition_key = day.isoformat()
+        partition_dir = os.path.join(self.base_dir, f"date={partition_key}")
+        os.makedirs(partition_dir, exist_ok=True)
+
+        rows = [self._to_row(doc) for doc in documents]
+        table = pa.Table.from_pylist(rows, schema=_archive_schema())
+        file_path = os.path.join(partition_dir, f"part-{datetime.now().strftime('%Y%m%d%H%M%S%f')}.parquet")
+
+        tmp_path = file_path + ".tmp"
+        pq.write_table(table, tmp_path, compression=self.compression)
+        os.replace(tmp_path, file_path)
+
+        manifest = self._load_manifest()
+        partition = manifest.setdefault(partition_key, {
+            "files": [], "count": 0, "churn_count": 0, "high_risk_count": 0, "confidence_sum": 0.0
+        })
+        partition["files"].append(os.path.basename(file_path))
+        partition["count"] += len(rows)
+        partition["churn_count"] += sum(1 for row in rows if row["prediction"] == 1)
+        partition["high_risk_count"] += sum(1 for row in rows if row["risk_level"] == "HIGH")
+        partition["confidence_sum"] += sum(row["confidence"] or 0.0 for row in rows)
+        self._save_manifest()
+
+        return file_path
+
+    @staticmethod
+    def _to_row(doc: Dict[str, Any]) -> Dict[str, Any]:
+        row = {column: doc.get(column) for column in ARCHIVE_COLUMNS}
+        row["_id"] = str(doc["_id"])
+        if row["feature_importance"] is not None:
+            row["feature_importance"] = json.dumps(row["feature_importance"])
+        return row
+
+    # --- Lecture ---
+
+    def read_partition(self, partition_key: str, newest_first: bool = True) -> List[Dict[str, Any]]:
+        """Lire une partition complète, triée par created_at"""
+        partition = self._load_manifest().get(partition_key)
+        if not partition:
+            return []
+
+        partition_dir = os.path.join(self.base_dir, f"date={partition_key}")
+        rows = []
+        for file_name in partition["files"]:
+            rows.extend(pq.read_table(os.path.join(partition_dir, file_name)).to_pylist())
+
+        rows.sort(key=lambda row: row["created_at"], reverse=newest_first)
+        return [self._to_document(row) for row in rows]
+
+    @staticmethod
+    def _to_document(row: Dict[str, Any]) -> Dict[str, Any]:
+        if row.get("feature_importance"):
+            row["feature_importance"] = json.loads(row["feature_importance"])
+        if isinstance(row.get("created_at"), datetime):
+            row["created_at"] = row["created_at"].isoformat()
+        return row
+
+    def read_page(self, skip: int, limit: int) -> List[Dict[str, Any]]:
+        """Page de l'archive du plus récent au plus ancien ; les partitions sautées ne sont pas lues"""
+        manifest = self._load_manifest()
+        page = []
+        for partition_key in self.partitions(newest_first=True):
+            count = manifest[partition_key]["count"]
+            if skip >= count:
+                skip -= count
+                continue
+
+            rows = self.read_partition(partition_key)
+            page.extend(rows[skip:skip + limit - len(page)])
+            skip = 0
+            if len(page) >= limit:
+                break
+        return page
+
+    def partitions_in_range(self, start: datetime, end: datetime) -> List[str]:
+        """Partitions (ordre chronologique) pouvant contenir des prédictions de l'intervalle"""
+        start_key, end_key = start.date().isoformat(), end.date().isoformat()
+        return [key for key in self.partitions(newest_first=False) if start_key <= key <= end_key]
+
+    def read_range(self, partition_key: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """Lire une partition en ne gardant que les prédictions de l'intervalle"""
+        return [
+            row for row in self.read_partition(partition_key, newest_first=False)
+            if start <= datetime.fromisoformat(row["created_at"]) <= end
+        ]
@@ -0,0 +1,87 @@
+"""Benchmark de sérialisation des listes : chemin Pydantic vs chemin orjson direct.
+
+Compare, pour une page de 1000 lignes, la re-validation Pydantic suivie de
+l'encodeur JSON par défaut (ancien chemin) à la sérialisation directe des
+lignes déjà décodées avec orjson (chemin rapide de /predictions/history et /customers).
+
+Usage : python benchmark_serialization.py [--rows 1000] [--repeat 50]
+"""
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime
+
+import orjson
+
+from storage import CUSTOMER_FEATURE_FIELDS
+from main import PredictionHistoryResponse, CustomerResponse
+
+def make_prediction_rows(n_rows: int):
+    feature_importance = {f"feature_{i}": 1.0 / (i + 1) for i in range(21)}
+    return [
+        {
+            "prediction_id": str(uuid.uuid4()),
+            "customer_id": f"CUST_{i}",
+            "timestamp": datetime.now().isoformat(),
+            "churn_probability": 0.42,
+            "prediction": i % 2,
+            "confidence": 0.58,
+            "risk_level": "MEDIUM",
+            "message": "Risque de churn modéré - Surveillance recommandée",
+            "feature_importance": feature_importance
+        }
+        for i in range(n_rows)
+    ]
+
+def make_customer_rows(n_rows: int):
+    rows = []
+    for i in range(n_rows):
+        row = {field: 100.0 for field in CUSTOMER_FEATURE_FIELDS}
+        row.update({
+            "id": str(uuid.uuid4()), "name": f"Customer {i}", "email": None, "phone": None,
+            "signup_date": None, "customer_id": f"CUST_{i}", "created_at": datetime.now().isoformat()
+        })
+        rows.append(row)
+    return rows
+
+def pydantic_history(rows):
+    response = PredictionHistoryResponse(predictions=rows, total_count=len(rows), has_more=False)
+    return json.dumps(response.model_dump(mode="json")).encode()
+
+def fast_history(rows):
+    return orjson.dumps({"predictions": rows, "total_count": len(rows), "has_more": False})
+
+def pydantic_customers(rows):
+    return json.dumps([CustomerResponse(**row).model_dump(mode="json") for row in rows]).encode()
+
+def fast_customers(rows):
+    return orjson.dumps(rows)
+
+def timeit(func, rows, repeat: int) -> float:
+    func(rows)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(rows)
+    return (time.perf_counter() - start) / repeat * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de sérialisation des réponses de liste")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    cases = [
+        ("/predictions/history", make_prediction_rows(args.rows), pydantic_history, fast_history),
+        ("/customers", make_customer_rows(args.rows), pydantic_customers, fast_customers),
+    ]
+
+    print(f"📊 Sérialisation de {args.rows} lignes (moyenne sur {args.repeat} exécutions)")
+    for endpoint, rows, slow, fast in cases:
+        assert json.loads(slow(rows)) == json.loads(fast(rows))
+        slow_ms = timeit(slow, rows, args.repeat)
+        fast_ms = timeit(fast, rows, args.repeat)
+        print(f"   {endpoint}: Pydantic={slow_ms:.2f}ms, orjson={fast_ms:.2f}ms (x{slow_ms / fast_ms:.1f})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Benchmark des backends de stockage (écritures concurrentes et requêtes des endpoints).
+
+Usage : python benchmark_storage.py [--backend sqlite|mongo] [--predictions 10000] [--concurrency 64]
+
+Le benchmark n'écrit jamais dans le stockage de l'application : il travaille sur un fichier
+SQLite temporaire ou une base MongoDB jetable (même serveur, nom unique), supprimés à la fin.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from config import settings
+from storage import create_storage, RISK_LEVELS
+
+MESSAGES = {
+    "LOW": "Faible risque de churn - Client fidèle",
+    "MEDIUM": "Risque de churn modéré - Surveillance recommandée",
+    "HIGH": "Client à haut risque de churn - Action immédiate recommandée"
+}
+
+def make_prediction(i: int):
+    probability = random.random()
+    risk_level = RISK_LEVELS[min(int(probability * 3), 2)]
+    return {
+        "prediction_id": str(uuid.uuid4()),
+        "customer_id": f"BENCH_{i % 1000}",
+        "customer_name": None,
+        "timestamp": datetime.now().isoformat(),
+        "churn_probability": probability,
+        "prediction": 1 if probability > 0.5 else 0,
+        "confidence": max(probability, 1 - probability),
+        "risk_level": risk_level,
+        "message": MESSAGES[risk_level],
+        "feature_importance": {"customer_service_calls": 0.3, "total_day_minutes": 0.2},
+        "model_version": "benchmark"
+    }
+
+async def timed(label: str, coroutine, repeat: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await coroutine()
+    elapsed = (time.perf_counter() - start) / repeat * 1000
+    print(f"   {label}: {elapsed:.2f}ms")
+
+def scratch_storage(backend: str, workdir: str):
+    """Backend isolé : fichier SQLite temporaire ou base MongoDB au nom unique"""
+    settings.ARCHIVE_DIR = os.path.join(workdir, "archive")
+    if backend == "sqlite":
+        settings.SQLITE_PATH = os.path.join(workdir, "benchmark.db")
+    elif backend == "mongo":
+        settings.DATABASE_NAME = f"churn_benchmark_{uuid.uuid4().hex[:12]}"
+    return create_storage(backend)
+
+async def run(backend: str, n_predictions: int, concurrency: int):
+    with tempfile.TemporaryDirectory(prefix="churn_benchmark_") as workdir:
+        storage = scratch_storage(backend, workdir)
+        await storage.connect()
+        try:
+            await measure(storage, n_predictions, concurrency)
+        finally:
+            if backend == "mongo" and storage.client:
+                await storage.client.drop_database(settings.DATABASE_NAME)
+                print(f"🗑️ Base de benchmark supprimée: {settings.DATABASE_NAME}")
+            await storage.close()
+
+async def measure(storage, n_predictions: int, concurrency: int):
+    """Débit d'écriture concurrente puis latence des requêtes des endpoints"""
+    print(f"📊 Backend {storage.name}: {n_predictions} prédictions, {concurrency} écritures concurrentes")
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def write(i):
+        async with semaphore:
+            await storage.save_prediction(make_prediction(i))
+
+    start = time.perf_counter()
+    await asyncio.gather(*[write(i) for i in range(n_predictions)])
+    elapsed = time.perf_counter() - start
+    print(f"   écritures: {n_predictions / elapsed:.0f} prédictions/s")
+
+    now = datetime.now()
+    await timed("get_predictions(50)", lambda: storage.get_predictions(50, 0), repeat=20)
+    await timed("get_predictions_count", storage.get_predictions_count, repeat=20)
+    await timed("get_high_risk_count", storage.get_high_risk_count, repeat=20)
+    await timed("get_avg_confidence", storage.get_avg_confidence, repeat=20)
+    await timed("get_hourly_distribution", storage.get_hourly_distribution, repeat=20)
+    await timed("get_trends(30j, jour)", lambda: storage.get_trends(now - timedelta(days=30), now, "day"), repeat=20)
+    await timed("get_customers(50)", lambda: storage.get_customers(50), repeat=20)
+
+    async def export_all():
+        async for _ in storage.iter_predictions(now - timedelta(days=1), now + timedelta(minutes=1), batch_size=5000):
+            pass
+    await timed("iter_predictions (tout)", export_all)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark des backends de stockage")
+    parser.add_argument("--backend", default="sqlite", choices=["sqlite", "mongo"])
+    parser.add_argument("--predictions", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+    asyncio.run(run(args.backend, args.predictions, args.concurrency))
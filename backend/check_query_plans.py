@@ -0,0 +1,94 @@
+"""Vérification des plans d'exécution des requêtes de la classe MongoDB.
+
+Explique, contre un mongod local, exactement les requêtes que les méthodes de
+`database.MongoDB` exécutent (`mongodb.query_specs()` : find, count et
+pipelines d'agrégation) et échoue si un plan contient un COLLSCAN ou un tri en
+mémoire. Les pipelines de maintenance qui parcourent toute la collection par
+construction (reconstruction des rollups et des totaux) sont affichés mais ne
+font pas échouer la vérification. Les variantes "schéma hérité" ne sont
+expliquées que si la base contient des documents non migrés (leurs index
+n'existent que dans ce cas).
+
+Le même contrôle tourne dans tests/test_query_plans.py, sur une base jetable,
+dès qu'un mongod est joignable (MONGODB_URL).
+
+Usage : python check_query_plans.py
+"""
+import asyncio
+import sys
+from typing import List
+
+from database import mongodb
+
+FORBIDDEN_STAGES = {"COLLSCAN", "SORT"}
+
+def _explain_command(spec):
+    """Commande explain équivalente à la requête décrite par la spec"""
+    if spec["kind"] == "count":
+        command = {"count": spec["collection"], "query": spec["filter"]}
+    elif spec["kind"] == "aggregate":
+        command = {"aggregate": spec["collection"], "pipeline": spec["pipeline"], "cursor": {}}
+    else:
+        command = {"find": spec["collection"], "filter": spec["filter"]}
+        if spec["sort"]:
+            command["sort"] = dict(spec["sort"])
+        if spec["projection"]:
+            command["projection"] = spec["projection"]
+    return {"explain": command, "verbosity": "queryPlanner"}
+
+def _winning_plans(explanation):
+    """Tous les plans retenus d'une explication (une agrégation peut en contenir plusieurs)"""
+    plans = []
+    if isinstance(explanation, dict):
+        for key, value in explanation.items():
+            if key == "winningPlan":
+                plans.append(value)
+            else:
+                plans.extend(_winning_plans(value))
+    elif isinstance(explanation, list):
+        for item in explanation:
+            plans.extend(_winning_plans(item))
+    return plans
+
+def _plan_stages(plan):
+    """Parcourir récursivement un plan et retourner toutes ses étapes"""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+async def plan_failures(storage) -> List[str]:
+    """Expliquer les requêtes d'une instance MongoDB connectée et retourner les méthodes en échec"""
+    failures = []
+    for method, spec in storage.query_specs().items():
+        if spec["legacy"] and not storage.legacy_predictions:
+            print(f"⏭️  {method}: aucun document hérité, variante ignorée")
+            continue
+        explanation = await storage.database.command(_explain_command(spec))
+
+        stages = [stage for plan in _winning_plans(explanation) for stage in _plan_stages(plan)]
+        bad_stages = FORBIDDEN_STAGES.intersection(stages)
+        if bad_stages and spec["allow_collscan"]:
+            print(f"⚠️  {method} ({spec['kind']}, maintenance): {' -> '.join(stages)}")
+        elif bad_stages:
+            failures.append(method)
+            print(f"❌ {method} ({spec['kind']}): {' -> '.join(stages)}")
+        else:
+            print(f"✅ {method} ({spec['kind']}): {' -> '.join(stages)}")
+    return failures
+
+async def check_query_plans() -> bool:
+    await mongodb.connect()
+    try:
+        return not await plan_failures(mongodb)
+    finally:
+        await mongodb.close()
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(check_query_plans()) else 1)
@@ -0,0 +1,39 @@
+"""Vérification des backends de stockage : import et instanciation de chaque implémentation.
+
+Échoue si un backend ne s'importe pas ou n'implémente pas toutes les méthodes
+abstraites de `StorageBackend` (l'instanciation lèverait alors un TypeError au
+démarrage de l'API). Aucune connexion n'est ouverte.
+
+Usage : python check_storage_backends.py [--backend sqlite|mongo]
+"""
+import argparse
+import sys
+
+from storage import StorageBackend, create_storage
+
+BACKENDS = ["mongo", "sqlite"]
+
+def check_backend(backend: str) -> bool:
+    try:
+        storage = create_storage(backend)
+    except Exception as e:
+        print(f"❌ {backend}: {type(e).__name__}: {e}")
+        return False
+
+    missing = sorted(
+        name for name in getattr(StorageBackend, "__abstractmethods__", set())
+        if getattr(type(storage), name, None) is getattr(StorageBackend, name)
+    )
+    if missing or not isinstance(storage, StorageBackend):
+        print(f"❌ {backend}: méthodes non implémentées: {', '.join(missing) or 'interface StorageBackend absente'}")
+        return False
+
+    print(f"✅ {backend}: {type(storage).__name__} instancié")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=BACKENDS, help="Backend à vérifier (tous par défaut)")
+    args = parser.parse_args()
+    results = [check_backend(backend) for backend in ([args.backend] if args.backend else BACKENDS)]
+    sys.exit(0 if all(results) else 1)
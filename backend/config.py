@@ -4,10 +4,92 @@ from dotenv import load_dotenv
 load_dotenv()
 
 class Settings:
+    # Backend de stockage : "mongo" ou "sqlite" (moteur embarqué, sans service externe)
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mongo")
+    SQLITE_PATH = os.getenv("SQLITE_PATH", "app/data/churn.db")
+    SQLITE_BATCH_SIZE = int(os.getenv("SQLITE_BATCH_SIZE", "500"))
+    SQLITE_BATCH_DELAY_MS = float(os.getenv("SQLITE_BATCH_DELAY_MS", "2"))
+    
     MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
     DATABASE_NAME = os.getenv("DATABASE_NAME", "churn_prediction")
+    
+    # Pool de connexions, délais, compression réseau et garanties de lecture/écriture
+    MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "100"))
+    MONGODB_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", "0"))
+    MONGODB_MAX_IDLE_TIME_MS = int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "300000"))
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", "10000"))
+    MONGODB_CONNECT_TIMEOUT_MS = int(os.getenv("MONGODB_CONNECT_TIMEOUT_MS", "10000"))
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "10000"))
+    MONGODB_SOCKET_TIMEOUT_MS = int(os.getenv("MONGODB_SOCKET_TIMEOUT_MS", "0"))
+    MONGODB_COMPRESSORS = os.getenv("MONGODB_COMPRESSORS", "zlib")
+    MONGODB_READ_CONCERN = os.getenv("MONGODB_READ_CONCERN", "local")
+    MONGODB_WRITE_CONCERN_W = os.getenv("MONGODB_WRITE_CONCERN_W", "1")
+    MONGODB_WRITE_CONCERN_JOURNAL = os.getenv("MONGODB_WRITE_CONCERN_JOURNAL", "false").lower() == "true"
+    MONGODB_READ_PREFERENCE = os.getenv("MONGODB_READ_PREFERENCE", "primary")
     COLLECTION_PREDICTIONS = "predictions"
     COLLECTION_CUSTOMERS = "customers"
     COLLECTION_MODEL_METRICS = "model_metrics"
+    COLLECTION_MODEL_VERSIONS = "model_versions"
+    COLLECTION_ROLLUPS_HOURLY = "prediction_rollups_hourly"
+    COLLECTION_ROLLUPS_DAILY = "prediction_rollups_daily"
+    COLLECTION_PREDICTION_TOTALS = "prediction_totals"
+    
+    # Archivage des anciennes prédictions vers des fichiers Parquet locaux
+    ARCHIVE_ENABLED = os.getenv("ARCHIVE_ENABLED", "true").lower() == "true"
+    ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "app/archive/predictions")
+    ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+    ARCHIVE_INTERVAL_HOURS = float(os.getenv("ARCHIVE_INTERVAL_HOURS", "6"))
+    ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "5000"))
+    
+    # Artefacts du modèle et budget CPU du processus d'entraînement
+    MODELS_DIR = os.getenv("MODELS_DIR", "app/models")
+    TRAINING_DATA_PATH = os.getenv("TRAINING_DATA_PATH", "churn-bigml-80.csv")
+    TRAINING_CACHE_DIR = os.getenv("TRAINING_CACHE_DIR", "app/cache/training")
+    # Réactiver une version existante quand données, code et paramètres sont identiques
+    TRAINING_RUN_CACHE = os.getenv("TRAINING_RUN_CACHE", "true").lower() == "true"
+    # Features retirées quand elles sont expliquées linéairement par les autres (R² >= seuil ; > 1 désactive)
+    FEATURE_COLLINEARITY_R2 = float(os.getenv("FEATURE_COLLINEARITY_R2", "0.999"))
+    # Évaluation des versions (métriques servies par /model/metrics) : split de test du pipeline par défaut,
+    # ou fichier holdout externe (refusé s'il est identique aux données d'entraînement)
+    EVALUATION_DATA_PATH = os.getenv("EVALUATION_DATA_PATH", "")
+    EVALUATION_MAX_ROWS = int(os.getenv("EVALUATION_MAX_ROWS", "200000"))
+    EVALUATION_LATENCY_SAMPLES = int(os.getenv("EVALUATION_LATENCY_SAMPLES", "200"))
+    # Budgets de sélection du modèle servi (0 = pas de contrainte)
+    SELECTION_MAX_P99_LATENCY_MS = float(os.getenv("SELECTION_MAX_P99_LATENCY_MS", "25"))
+    SELECTION_MAX_MODEL_SIZE_MB = float(os.getenv("SELECTION_MAX_MODEL_SIZE_MB", "50"))
+    SELECTION_MAX_MEMORY_MB = float(os.getenv("SELECTION_MAX_MEMORY_MB", "200"))
+    # Compression du modèle retenu (sous-ensemble d'arbres / distillation) pour le service à fort débit
+    COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    COMPRESSION_VALIDATION_SIZE = float(os.getenv("COMPRESSION_VALIDATION_SIZE", "0.2"))
+    COMPRESSION_AUC_TOLERANCE = float(os.getenv("COMPRESSION_AUC_TOLERANCE", "0.005"))
+    DISTILL_MAX_DEPTH = int(os.getenv("DISTILL_MAX_DEPTH", "8"))
+    SERVE_COMPRESSED_MODEL = os.getenv("SERVE_COMPRESSED_MODEL", "false").lower() == "true"
+    # Recherche d'hyperparamètres par successive halving (budget de temps en secondes)
+    SEARCH_ENABLED = os.getenv("SEARCH_ENABLED", "false").lower() == "true"
+    SEARCH_N_CANDIDATES = int(os.getenv("SEARCH_N_CANDIDATES", "24"))
+    SEARCH_ETA = int(os.getenv("SEARCH_ETA", "3"))
+    SEARCH_MIN_SAMPLES = int(os.getenv("SEARCH_MIN_SAMPLES", "200"))
+    SEARCH_CV_FOLDS = int(os.getenv("SEARCH_CV_FOLDS", "3"))
+    SEARCH_TIME_BUDGET_SECONDS = float(os.getenv("SEARCH_TIME_BUDGET_SECONDS", "300"))
+    # Réentraînement incrémental : nouvelles données labellisées (même format que TRAINING_DATA_PATH)
+    INCREMENTAL_DATA_PATH = os.getenv("INCREMENTAL_DATA_PATH", "churn-new-labels.csv")
+    INCREMENTAL_TREES = int(os.getenv("INCREMENTAL_TREES", "50"))
+    INCREMENTAL_BOOSTING_STAGES = int(os.getenv("INCREMENTAL_BOOSTING_STAGES", "20"))
+    INCREMENTAL_MAX_AUC_DROP = float(os.getenv("INCREMENTAL_MAX_AUC_DROP", "0.005"))
+    # Entraînement out-of-core : fichier CSV ou Parquet lu par chunks (par défaut TRAINING_DATA_PATH)
+    OUT_OF_CORE_DATA_PATH = os.getenv("OUT_OF_CORE_DATA_PATH", "")
+    OUT_OF_CORE_CHUNK_ROWS = int(os.getenv("OUT_OF_CORE_CHUNK_ROWS", "100000"))
+    OUT_OF_CORE_EPOCHS = int(os.getenv("OUT_OF_CORE_EPOCHS", "5"))
+    TRAINING_NICENESS = int(os.getenv("TRAINING_NICENESS", "10"))
+    TRAINING_CPU_AFFINITY = os.getenv("TRAINING_CPU_AFFINITY", "")
+    # Budget de parallélisme (plis de CV et candidats) ; 0 = tous les CPU disponibles
+    TRAINING_N_JOBS = int(os.getenv("TRAINING_N_JOBS", "0"))
+    # Délai laissé au worker pour s'arrêter proprement après une annulation avant de le terminer
+    TRAINING_CANCEL_TIMEOUT_SECONDS = float(os.getenv("TRAINING_CANCEL_TIMEOUT_SECONDS", "30"))
+    
+    # Re-scoring de tout le portefeuille clients après chaque réentraînement
+    RESCORE_ON_RETRAIN = os.getenv("RESCORE_ON_RETRAIN", "true").lower() == "true"
+    RESCORE_BATCH_SIZE = int(os.getenv("RESCORE_BATCH_SIZE", "2000"))
+    RESCORE_WORKERS = int(os.getenv("RESCORE_WORKERS", "2"))
 
 settings = Settings()
\ No newline at end of file
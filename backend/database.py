@@ -1,32 +1,215 @@
 import motor.motor_asyncio
 from config import settings
-from datetime import datetime, time
+from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
-from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
 import json
+import hashlib
+import asyncio
+from pymongo import ReplaceOne, UpdateOne
+from live_stream import live_feed
+from archive import PredictionArchive
+from pool_metrics import PoolMetrics
+from storage import (
+    StorageBackend, RISK_LEVELS, CUSTOMER_FEATURE_FIELDS, CUSTOMER_OPTIONAL_FIELDS,
+    build_trend_points, trend_start
+)
+from prediction_schema import (
+    encode_prediction, decode_prediction, decode_prediction_response, is_compact, RISK_CODES,
+    PREDICTION_RESPONSE_PROJECTION, PREDICTION_RESPONSE_FIELDS,
+    FIELD_TIMESTAMP, FIELD_PREDICTION, FIELD_RISK, FIELD_MODEL_VERSION
+)
 
-class MongoDB:
+# Registre déclaratif des index : chaque index est associé aux requêtes qu'il sert.
+# Les requêtes en égalité sont placées avant la clé de tri / d'intervalle (règle ESR).
+INDEX_SPECS = {
+    settings.COLLECTION_PREDICTIONS: [
+        {
+            "keys": [(FIELD_TIMESTAMP, DESCENDING)],
+            "name": "ts_desc",
+            "queries": ["get_predictions", "get_predictions_today", "get_predictions_by_date", "archive_old_predictions"]
+        },
+        {
+            "keys": [(FIELD_RISK, ASCENDING), (FIELD_TIMESTAMP, DESCENDING)],
+            "name": "r_ts",
+            "queries": ["get_high_risk_count", "get_high_risk_predictions"]
+        },
+        {
+            "keys": [(FIELD_PREDICTION, ASCENDING), (FIELD_TIMESTAMP, DESCENDING)],
+            "name": "y_ts",
+            "queries": ["get_churn_count"]
+        }
+    ],
+    settings.COLLECTION_CUSTOMERS: [
+        {
+            # $in sur customer_id puis tri sur updated_at : SORT_MERGE, sans tri en mémoire
+            "keys": [("customer_id", ASCENDING), ("updated_at", ASCENDING)],
+            "name": "customer_id_updated_at",
+            "queries": ["save_customer", "get_customer_features"]
+        },
+        {
+            "keys": [("created_at", DESCENDING)],
+            "name": "created_at_desc",
+            "queries": ["get_customers"]
+        }
+    ]
+}
+
+# Index des branches "champs longs" des filtres, conservés tant que des prédictions au schéma hérité
+# existent (voir _prediction_filter) et supprimés par la migration vers le schéma compact
+LEGACY_SCHEMA_INDEXES = {
+    settings.COLLECTION_PREDICTIONS: [
+        {
+            "keys": [("created_at", DESCENDING)],
+            "name": "created_at_desc",
+            "queries": ["get_predictions_today"]
+        },
+        {
+            # Tri sur ts conservé (absent des documents hérités) : fusion triée des branches du $or
+            "keys": [("risk_level", ASCENDING), (FIELD_TIMESTAMP, DESCENDING)],
+            "name": "legacy_risk_level_ts",
+            "queries": ["get_high_risk_count", "get_high_risk_predictions"]
+        },
+        {
+            "keys": [("prediction", ASCENDING), (FIELD_TIMESTAMP, DESCENDING)],
+            "name": "legacy_prediction_ts",
+            "queries": ["get_churn_count"]
+        }
+    ]
+}
+
+# Document unique des totaux de la collection chaude (compte et somme des confiances)
+PREDICTION_TOTALS_ID = "predictions"
+
+def query_spec(collection: str, query: Dict[str, Any], sort: Optional[List] = None,
+               projection: Optional[Dict[str, Any]] = None, kind: str = "find",
+               pipeline: Optional[List[Dict[str, Any]]] = None, allow_collscan: bool = False) -> Dict[str, Any]:
+    """Description d'une requête (find, count ou aggregate), exécutée par la méthode et expliquée
+    par check_query_plans.py ; allow_collscan marque les parcours complets assumés (maintenance)"""
+    return {
+        "collection": collection, "kind": kind, "filter": query, "sort": sort,
+        "projection": projection, "pipeline": pipeline, "allow_collscan": allow_collscan, "legacy": False
+    }
+
+# Read model des listes de clients : seuls les champs de CustomerResponse sont projetés
+CUSTOMER_LIST_PROJECTION = {field: 1 for field in CUSTOMER_FEATURE_FIELDS + CUSTOMER_OPTIONAL_FIELDS + ["created_at"]}
+
+# Anciens index rendus redondants par le registre (champs longs du schéma non compact)
+LEGACY_INDEXES = {
+    settings.COLLECTION_PREDICTIONS: [
+        "created_at_1", "customer_id_1", "risk_level_1",
+        "risk_level_created_at", "prediction_created_at", "customer_id_created_at",
+        # Aucune requête ne lit les prédictions par client
+        "cid_ts"
+    ],
+    settings.COLLECTION_CUSTOMERS: ["customer_id_1"]
+}
+
+class MongoDB(StorageBackend):
+    name = "mongo"
+    
     def __init__(self):
         self.client = None
         self.database = None
+        self.archive = PredictionArchive(settings.ARCHIVE_DIR)
+        self.model_versions: Dict[str, Optional[Dict[str, float]]] = {}
+        self.pool_metrics = PoolMetrics()
+        # Présence de documents de prédiction non migrés au schéma compact (voir migrate_predictions.py)
+        self.legacy_predictions = False
         
     async def connect(self):
         """Établir la connexion à MongoDB"""
         try:
-            self.client = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGODB_URL)
+            self.client = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGODB_URL, **self.client_options())
             self.database = self.client[settings.DATABASE_NAME]
             
+            # Documents hérités : servis via leurs champs longs (et leurs index) jusqu'à la migration
+            self.legacy_predictions = await self.database[settings.COLLECTION_PREDICTIONS].find_one(
+                {"pid": {"$exists": False}}, {"_id": 1}
+            ) is not None
+            if self.legacy_predictions:
+                print("⚠️  Prédictions au schéma hérité détectées : lancez migrate_predictions.py")
+            
             # Créer des index pour optimiser les requêtes
-            await self.database[settings.COLLECTION_PREDICTIONS].create_index("created_at")
-            await self.database[settings.COLLECTION_PREDICTIONS].create_index("customer_id")
-            await self.database[settings.COLLECTION_PREDICTIONS].create_index("risk_level")
-            await self.database[settings.COLLECTION_CUSTOMERS].create_index("customer_id")
+            await self.ensure_indexes()
+            
+            # Construire les rollups une première fois à partir de l'historique existant
+            if await self.database[settings.COLLECTION_ROLLUPS_DAILY].estimated_document_count() == 0:
+                await self.rebuild_rollups()
+            if await self.database[settings.COLLECTION_PREDICTION_TOTALS].find_one({"_id": PREDICTION_TOTALS_ID}) is None:
+                await self.rebuild_totals()
             
             print("✅ Connecté à MongoDB avec succès!")
         except Exception as e:
             print(f"❌ Erreur de connexion MongoDB: {e}")
             raise
     
+    @property
+    def is_connected(self) -> bool:
+        return self.client is not None
+    
+    def status(self) -> Dict[str, Any]:
+        return {"pool": self.pool_status()}
+    
+    def client_options(self) -> Dict[str, Any]:
+        """Options du client Motor construites à partir de Settings"""
+        write_concern_w = settings.MONGODB_WRITE_CONCERN_W
+        options = {
+            "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+            "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+            "maxIdleTimeMS": settings.MONGODB_MAX_IDLE_TIME_MS,
+            "waitQueueTimeoutMS": settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+            "connectTimeoutMS": settings.MONGODB_CONNECT_TIMEOUT_MS,
+            "serverSelectionTimeoutMS": settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+            "readConcernLevel": settings.MONGODB_READ_CONCERN,
+            "w": int(write_concern_w) if write_concern_w.isdigit() else write_concern_w,
+            "journal": settings.MONGODB_WRITE_CONCERN_JOURNAL,
+            "readPreference": settings.MONGODB_READ_PREFERENCE,
+            "event_listeners": [self.pool_metrics]
+        }
+        if settings.MONGODB_SOCKET_TIMEOUT_MS > 0:
+            options["socketTimeoutMS"] = settings.MONGODB_SOCKET_TIMEOUT_MS
+        if settings.MONGODB_COMPRESSORS:
+            options["compressors"] = settings.MONGODB_COMPRESSORS
+        return options
+    
+    def pool_status(self) -> Dict[str, Any]:
+        """Configuration et télémétrie du pool de connexions"""
+        return {
+            "max_pool_size": settings.MONGODB_MAX_POOL_SIZE,
+            "min_pool_size": settings.MONGODB_MIN_POOL_SIZE,
+            "compressors": settings.MONGODB_COMPRESSORS,
+            **self.pool_metrics.snapshot()
+        }
+    
+    async def ensure_indexes(self):
+        """Appliquer le registre d'index de manière idempotente (index du schéma hérité compris
+        tant que des documents hérités existent)"""
+        for collection_name, specs in INDEX_SPECS.items():
+            collection = self.database[collection_name]
+            existing = await collection.index_information()
+            
+            # Supprimer les index hérités remplacés par le registre
+            for legacy_name in LEGACY_INDEXES.get(collection_name, []):
+                if legacy_name in existing:
+                    await collection.drop_index(legacy_name)
+            
+            legacy_specs = LEGACY_SCHEMA_INDEXES.get(collection_name, [])
+            if self.legacy_predictions:
+                specs = specs + legacy_specs
+            else:
+                for spec in legacy_specs:
+                    if spec["name"] in existing:
+                        await collection.drop_index(spec["name"])
+            
+            missing = [
+                IndexModel(spec["keys"], name=spec["name"])
+                for spec in specs
+                if spec["name"] not in existing
+            ]
+            if missing:
+                await collection.create_indexes(missing)
+    
     async def close(self):
         """Fermer la connexion"""
         if self.client:
@@ -36,23 +219,261 @@ class MongoDB:
         """Sauvegarder une prédiction"""
         try:
             prediction_data["created_at"] = datetime.now()
-            result = await self.database[settings.COLLECTION_PREDICTIONS].insert_one(prediction_data)
+            
+            # La feature_importance est portée par la version du modèle, pas par chaque document
+            model_version = prediction_data.get("model_version")
+            if model_version and model_version not in self.model_versions:
+                await self.register_model_version(model_version, prediction_data.get("feature_importance"))
+            
+            result = await self.database[settings.COLLECTION_PREDICTIONS].insert_one(encode_prediction(prediction_data))
+            await self.update_rollups(prediction_data)
+            
+            # Diffuser le delta aux abonnés du tableau de bord en direct
+            live_feed.publish_prediction(prediction_data)
+            
             return str(result.inserted_id)
         except Exception as e:
             print(f"❌ Erreur sauvegarde prédiction: {e}")
             raise
     
+    async def save_predictions(self, predictions: List[Dict[str, Any]]) -> int:
+        """Sauvegarder un lot de prédictions en une seule écriture (insert_many + rollups groupés)"""
+        if not predictions:
+            return 0
+        try:
+            created_at = datetime.now()
+            for prediction_data in predictions:
+                prediction_data["created_at"] = created_at
+            
+            model_version = predictions[0].get("model_version")
+            if model_version and model_version not in self.model_versions:
+                await self.register_model_version(model_version, predictions[0].get("feature_importance"))
+            
+            result = await self.database[settings.COLLECTION_PREDICTIONS].insert_many(
+                [encode_prediction(prediction_data) for prediction_data in predictions], ordered=False
+            )
+            await self.update_rollups_bulk(predictions)
+            
+            live_feed.publish_predictions(predictions)
+            
+            return len(result.inserted_ids)
+        except Exception as e:
+            print(f"❌ Erreur sauvegarde prédictions en masse: {e}")
+            raise
+    
+    async def register_model_version(self, version: str, feature_importance: Optional[Dict[str, float]]):
+        """Enregistrer une version de modèle et sa feature_importance (référencée par les prédictions)"""
+        try:
+            feature_importance = {k: float(v) for k, v in (feature_importance or {}).items()}
+            await self.database[settings.COLLECTION_MODEL_VERSIONS].update_one(
+                {"_id": version},
+                {"$set": {"feature_importance": feature_importance, "registered_at": datetime.now()}},
+                upsert=True
+            )
+            self.model_versions[version] = feature_importance
+        except Exception as e:
+            print(f"❌ Erreur enregistrement version du modèle: {e}")
+    
+    async def _load_model_versions(self, documents: List[Dict]):
+        """Charger en une seule requête les versions de modèle inconnues référencées par des documents"""
+        missing_versions = {
+            doc.get(FIELD_MODEL_VERSION) for doc in documents
+            if is_compact(doc) and doc.get(FIELD_MODEL_VERSION) and doc.get(FIELD_MODEL_VERSION) not in self.model_versions
+        }
+        if missing_versions:
+            cursor = self.database[settings.COLLECTION_MODEL_VERSIONS].find({"_id": {"$in": list(missing_versions)}})
+            async for version in cursor:
+                self.model_versions[version["_id"]] = version.get("feature_importance")
+    
+    async def _decode_predictions(self, documents: List[Dict]) -> List[Dict]:
+        """Reconstruire la forme API complète de documents compacts"""
+        await self._load_model_versions(documents)
+        
+        predictions = []
+        for doc in documents:
+            pred = decode_prediction(doc, self.model_versions.get(doc.get(FIELD_MODEL_VERSION)))
+            pred["_id"] = str(pred["_id"])
+            if "created_at" in pred and isinstance(pred["created_at"], datetime):
+                pred["created_at"] = pred["created_at"].isoformat()
+            predictions.append(pred)
+        return predictions
+    
+    async def _decode_prediction_responses(self, documents: List[Dict]) -> List[Dict]:
+        """Décoder des documents projetés directement dans la forme PredictionResponse"""
+        await self._load_model_versions(documents)
+        return [
+            decode_prediction_response(doc, self.model_versions.get(doc.get(FIELD_MODEL_VERSION)))
+            for doc in documents
+        ]
+    
+    def _prediction_filter(self, compact: Dict[str, Any], legacy: Dict[str, Any],
+                           include_legacy: Optional[bool] = None) -> Dict[str, Any]:
+        """Filtre sur les champs compacts, étendu aux champs longs tant que des documents hérités existent"""
+        if not (self.legacy_predictions if include_legacy is None else include_legacy):
+            return compact
+        return {"$or": [compact, legacy]}
+    
+    # --- Requêtes : chaque méthode exécute la spec construite ici, check_query_plans.py explique les mêmes ---
+    
+    def _find(self, spec: Dict[str, Any]):
+        cursor = self.database[spec["collection"]].find(spec["filter"], spec["projection"])
+        return cursor.sort(spec["sort"]) if spec["sort"] else cursor
+    
+    async def _count(self, spec: Dict[str, Any]) -> int:
+        return await self.database[spec["collection"]].count_documents(spec["filter"])
+    
+    def _predictions_page_query(self) -> Dict[str, Any]:
+        return query_spec(settings.COLLECTION_PREDICTIONS, {}, [(FIELD_TIMESTAMP, DESCENDING)], PREDICTION_RESPONSE_PROJECTION)
+    
+    def _predictions_today_query(self, include_legacy: Optional[bool] = None) -> Dict[str, Any]:
+        today = datetime.now().date()
+        day_range = {"$gte": datetime(today.year, today.month, today.day), "$lte": datetime(today.year, today.month, today.day, 23, 59, 59)}
+        return query_spec(
+            settings.COLLECTION_PREDICTIONS,
+            self._prediction_filter({FIELD_TIMESTAMP: day_range}, {"created_at": day_range}, include_legacy), kind="count"
+        )
+    
+    def _high_risk_query(self, include_legacy: Optional[bool] = None) -> Dict[str, Any]:
+        return query_spec(
+            settings.COLLECTION_PREDICTIONS,
+            self._prediction_filter({FIELD_RISK: RISK_CODES["HIGH"]}, {"risk_level": "HIGH"}, include_legacy),
+            [(FIELD_TIMESTAMP, DESCENDING)], PREDICTION_RESPONSE_PROJECTION
+        )
+    
+    def _churn_query(self, include_legacy: Optional[bool] = None) -> Dict[str, Any]:
+        return query_spec(
+            settings.COLLECTION_PREDICTIONS,
+            self._prediction_filter({FIELD_PREDICTION: 1}, {"prediction": 1}, include_legacy), kind="count"
+        )
+    
+    def _totals_query(self) -> Dict[str, Any]:
+        return query_spec(settings.COLLECTION_PREDICTION_TOTALS, {"_id": PREDICTION_TOTALS_ID})
+    
+    def _hourly_distribution_query(self, start_of_day: datetime) -> Dict[str, Any]:
+        return query_spec(
+            settings.COLLECTION_ROLLUPS_HOURLY,
+            {"_id": {"$gte": start_of_day, "$lt": start_of_day + timedelta(days=1)}}, projection={"count": 1}
+        )
+    
+    def _trends_query(self, start: datetime, end: datetime, granularity: str) -> Dict[str, Any]:
+        collection_name = settings.COLLECTION_ROLLUPS_HOURLY if granularity == "hour" else settings.COLLECTION_ROLLUPS_DAILY
+        return query_spec(collection_name, {"_id": {"$gte": start, "$lte": end}}, [("_id", ASCENDING)])
+    
+    def _predictions_range_query(self, start: datetime, end: datetime, risk_level: Optional[str] = None) -> Dict[str, Any]:
+        query = {FIELD_TIMESTAMP: {"$gte": start, "$lte": end}}
+        if risk_level:
+            query[FIELD_RISK] = RISK_CODES[risk_level]
+        return query_spec(settings.COLLECTION_PREDICTIONS, query, [(FIELD_TIMESTAMP, ASCENDING)])
+    
+    def _archive_query(self, cutoff: datetime) -> Dict[str, Any]:
+        return query_spec(settings.COLLECTION_PREDICTIONS, {FIELD_TIMESTAMP: {"$lt": cutoff}}, [(FIELD_TIMESTAMP, ASCENDING)])
+    
+    def _customer_lookup_query(self, customer_id: str) -> Dict[str, Any]:
+        return query_spec(settings.COLLECTION_CUSTOMERS, {"customer_id": customer_id})
+    
+    def _customers_page_query(self) -> Dict[str, Any]:
+        return query_spec(settings.COLLECTION_CUSTOMERS, {}, [("created_at", DESCENDING)], CUSTOMER_LIST_PROJECTION)
+    
+    def _customer_scan_query(self) -> Dict[str, Any]:
+        projection = {field: 1 for field in CUSTOMER_FEATURE_FIELDS + ["customer_id", "name"]}
+        return query_spec(settings.COLLECTION_CUSTOMERS, {}, [("_id", ASCENDING)], projection)
+    
+    def _customer_features_query(self, customer_ids: List[str]) -> Dict[str, Any]:
+        projection = {field: 1 for field in CUSTOMER_FEATURE_FIELDS + ["customer_id", "name", "updated_at"]}
+        projection["_id"] = 0
+        return query_spec(
+            settings.COLLECTION_CUSTOMERS, {"customer_id": {"$in": list(set(customer_ids))}},
+            [("updated_at", ASCENDING)], projection
+        )
+    
+    def _rebuild_totals_query(self) -> Dict[str, Any]:
+        # Parcours complet assumé : exécuté une seule fois, quand le document des totaux est absent
+        pipeline = [
+            {"$group": {
+                "_id": PREDICTION_TOTALS_ID,
+                "count": {"$sum": 1},
+                "confidence_sum": {"$sum": {"$ifNull": ["$c", "$confidence"]}}
+            }},
+            {"$merge": {"into": settings.COLLECTION_PREDICTION_TOTALS, "whenMatched": "replace", "whenNotMatched": "insert"}}
+        ]
+        return query_spec(settings.COLLECTION_PREDICTIONS, {}, kind="aggregate", pipeline=pipeline, allow_collscan=True)
+    
+    def _rebuild_rollups_query(self, collection_name: str) -> Dict[str, Any]:
+        # Parcours complet assumé : reconstruction des rollups (démarrage à vide, migration)
+        parts = {"year": {"$year": "$ts"}, "month": {"$month": "$ts"}, "day": {"$dayOfMonth": "$ts"}}
+        if collection_name == settings.COLLECTION_ROLLUPS_HOURLY:
+            parts["hour"] = {"$hour": "$ts"}
+        group = {
+            "_id": {"$dateFromParts": parts},
+            "count": {"$sum": 1},
+            "churn_count": {"$sum": {"$cond": [{"$eq": ["$y", 1]}, 1, 0]}},
+            "probability_sum": {"$sum": "$p"}
+        }
+        for level in RISK_LEVELS:
+            group[level] = {"$sum": {"$cond": [{"$eq": ["$r", RISK_CODES[level]]}, 1, 0]}}
+        
+        pipeline = [
+            {"$match": {FIELD_TIMESTAMP: {"$type": "date"}}},
+            {"$group": group},
+            {"$project": {
+                "count": 1,
+                "churn_count": 1,
+                "probability_sum": 1,
+                "risk_counts": {level: f"${level}" for level in RISK_LEVELS}
+            }},
+            {"$merge": {"into": collection_name, "whenMatched": "replace", "whenNotMatched": "insert"}}
+        ]
+        return query_spec(settings.COLLECTION_PREDICTIONS, {}, kind="aggregate", pipeline=pipeline, allow_collscan=True)
+    
+    def query_specs(self) -> Dict[str, Dict[str, Any]]:
+        """Requêtes émises par chaque méthode, avec des paramètres représentatifs. Les variantes
+        "(schéma hérité)" sont celles émises tant que des documents non migrés existent (legacy=True)."""
+        today = datetime.now().date()
+        start_of_day = datetime(today.year, today.month, today.day)
+        end_of_day = start_of_day + timedelta(hours=23, minutes=59, seconds=59)
+        return {
+            "get_predictions": self._predictions_page_query(),
+            "get_predictions_today": self._predictions_today_query(),
+            "get_high_risk_count": {**self._high_risk_query(), "kind": "count"},
+            "get_high_risk_predictions": self._high_risk_query(),
+            "get_churn_count": self._churn_query(),
+            "get_predictions_today (schéma hérité)": {**self._predictions_today_query(True), "legacy": True},
+            "get_high_risk_count (schéma hérité)": {**self._high_risk_query(True), "kind": "count", "legacy": True},
+            "get_high_risk_predictions (schéma hérité)": {**self._high_risk_query(True), "legacy": True},
+            "get_churn_count (schéma hérité)": {**self._churn_query(True), "legacy": True},
+            "get_avg_confidence": self._totals_query(),
+            "get_hourly_distribution": self._hourly_distribution_query(start_of_day),
+            "get_trends": self._trends_query(start_of_day, end_of_day, "day"),
+            "get_trends (heure)": self._trends_query(start_of_day, end_of_day, "hour"),
+            "iter_predictions": self._predictions_range_query(start_of_day, end_of_day),
+            "iter_predictions (risque)": self._predictions_range_query(start_of_day, end_of_day, "HIGH"),
+            "archive_old_predictions": self._archive_query(start_of_day),
+            "save_customer": self._customer_lookup_query("CHECK"),
+            "get_customers": self._customers_page_query(),
+            "iter_customer_features": self._customer_scan_query(),
+            "get_customer_features": self._customer_features_query(["CHECK_1", "CHECK_2"]),
+            "rebuild_totals": self._rebuild_totals_query(),
+            "rebuild_rollups (heure)": self._rebuild_rollups_query(settings.COLLECTION_ROLLUPS_HOURLY),
+            "rebuild_rollups (jour)": self._rebuild_rollups_query(settings.COLLECTION_ROLLUPS_DAILY)
+        }
+    
     async def get_predictions(self, limit: int = 50, skip: int = 0) -> List[Dict]:
-        """Récupérer les prédictions avec pagination"""
+        """Récupérer une page de prédictions au format PredictionResponse (collection chaude puis archive)"""
         try:
-            cursor = self.database[settings.COLLECTION_PREDICTIONS].find().sort("created_at", -1).skip(skip).limit(limit)
-            predictions = await cursor.to_list(length=limit)
+            cursor = self._find(self._predictions_page_query()).skip(skip).limit(limit)
+            predictions = await self._decode_prediction_responses(await cursor.to_list(length=limit))
             
-            # Convertir ObjectId en string
-            for pred in predictions:
-                pred["_id"] = str(pred["_id"])
-                if "created_at" in pred and isinstance(pred["created_at"], datetime):
-                    pred["created_at"] = pred["created_at"].isoformat()
+            # Compléter la page avec les prédictions archivées
+            if len(predictions) < limit and self.archive.partitions():
+                if predictions:
+                    hot_count = skip + len(predictions)
+                else:
+                    hot_count = await self.database[settings.COLLECTION_PREDICTIONS].estimated_document_count()
+                archive_skip = max(skip - hot_count, 0)
+                archived = await asyncio.to_thread(self.archive.read_page, archive_skip, limit - len(predictions))
+                predictions.extend(
+                    {field: row.get(field) for field in PREDICTION_RESPONSE_FIELDS} for row in archived
+                )
             
             return predictions
         except Exception as e:
@@ -60,9 +481,11 @@ class MongoDB:
             return []
     
     async def get_predictions_count(self) -> int:
-        """Compter le nombre total de prédictions"""
+        """Compter le nombre total de prédictions (archive incluse)"""
         try:
-            return await self.database[settings.COLLECTION_PREDICTIONS].count_documents({})
+            # Compte tiré des métadonnées de la collection (count_documents({}) parcourt tout)
+            hot_count = await self.database[settings.COLLECTION_PREDICTIONS].estimated_document_count()
+            return hot_count + self.archive.stats()["count"]
         except Exception as e:
             print(f"❌ Erreur comptage prédictions: {e}")
             return 0
@@ -70,13 +493,7 @@ class MongoDB:
     async def get_predictions_today(self) -> int:
         """Compter les prédictions d'aujourd'hui"""
         try:
-            today = datetime.now().date()
-            start_of_day = datetime(today.year, today.month, today.day)
-            end_of_day = datetime(today.year, today.month, today.day, 23, 59, 59)
-            
-            return await self.database[settings.COLLECTION_PREDICTIONS].count_documents({
-                "created_at": {"$gte": start_of_day, "$lte": end_of_day}
-            })
+            return await self._count(self._predictions_today_query())
         except Exception as e:
             print(f"❌ Erreur comptage prédictions aujourd'hui: {e}")
             return 0
@@ -84,9 +501,8 @@ class MongoDB:
     async def get_high_risk_count(self) -> int:
         """Compter les prédictions à haut risque"""
         try:
-            return await self.database[settings.COLLECTION_PREDICTIONS].count_documents({
-                "risk_level": "HIGH"
-            })
+            hot_count = await self._count(self._high_risk_query())
+            return hot_count + self.archive.stats()["high_risk_count"]
         except Exception as e:
             print(f"❌ Erreur comptage haut risque: {e}")
             return 0
@@ -94,65 +510,39 @@ class MongoDB:
     async def get_churn_count(self) -> int:
         """Compter les prédictions de churn"""
         try:
-            return await self.database[settings.COLLECTION_PREDICTIONS].count_documents({
-                "prediction": 1
-            })
+            hot_count = await self._count(self._churn_query())
+            return hot_count + self.archive.stats()["churn_count"]
         except Exception as e:
             print(f"❌ Erreur comptage churn: {e}")
             return 0
     
     async def get_avg_confidence(self) -> float:
-        """Calculer la confiance moyenne"""
+        """Calculer la confiance moyenne (totaux maintenus à l'écriture, pas de parcours de la collection)"""
         try:
-            pipeline = [
-                {"$group": {"_id": None, "avg_confidence": {"$avg": "$confidence"}}}
-            ]
-            result = await self.database[settings.COLLECTION_PREDICTIONS].aggregate(pipeline).to_list(length=1)
-            return float(result[0]["avg_confidence"]) if result and result[0].get("avg_confidence") is not None else 0.85
+            totals = await self._find(self._totals_query()).to_list(length=1)
+            
+            # Combiner avec les totaux de l'archive
+            archive_stats = self.archive.stats()
+            confidence_sum = archive_stats["confidence_sum"] + (totals[0]["confidence_sum"] if totals else 0.0)
+            count = archive_stats["count"] + (totals[0]["count"] if totals else 0)
+            return float(confidence_sum / count) if count > 0 else 0.85
         except Exception as e:
             print(f"❌ Erreur calcul confiance moyenne: {e}")
             return 0.85
     
     async def get_hourly_distribution(self) -> Dict[str, int]:
-        """Récupérer la distribution horaire des prédictions d'aujourd'hui"""
+        """Récupérer la distribution horaire des prédictions d'aujourd'hui (depuis les rollups horaires)"""
         try:
             today = datetime.now().date()
-            start_of_day = datetime(today.year, today.month, today.day)
-            end_of_day = datetime(today.year, today.month, today.day, 23, 59, 59)
-            
-            # Pipeline d'agrégation pour grouper par heure
-            pipeline = [
-                {
-                    "$match": {
-                        "created_at": {
-                            "$gte": start_of_day,
-                            "$lte": end_of_day
-                        }
-                    }
-                },
-                {
-                    "$project": {
-                        "hour": {"$hour": "$created_at"}
-                    }
-                },
-                {
-                    "$group": {
-                        "_id": "$hour",
-                        "count": {"$sum": 1}
-                    }
-                }
-            ]
-            
-            result = await self.database[settings.COLLECTION_PREDICTIONS].aggregate(pipeline).to_list(length=24)
+            cursor = self._find(self._hourly_distribution_query(datetime(today.year, today.month, today.day)))
+            result = await cursor.to_list(length=24)
             
             # Initialiser toutes les heures à 0
             distribution = {str(i): 0 for i in range(24)}
             
             # Remplir avec les données réelles
             for item in result:
-                hour_str = str(item["_id"])
-                if hour_str in distribution:
-                    distribution[hour_str] = item["count"]
+                distribution[str(item["_id"].hour)] = item["count"]
             
             return distribution
             
@@ -160,6 +550,98 @@ class MongoDB:
             print(f"❌ Erreur distribution horaire: {e}")
             return {str(i): 0 for i in range(24)}
     
+    async def update_rollups(self, prediction_data: Dict[str, Any]):
+        """Incrémenter les rollups horaire et journalier pour une nouvelle prédiction"""
+        try:
+            created_at = prediction_data["created_at"]
+            hour_bucket = created_at.replace(minute=0, second=0, microsecond=0)
+            day_bucket = datetime(created_at.year, created_at.month, created_at.day)
+            
+            increments = {
+                "count": 1,
+                "churn_count": 1 if prediction_data.get("prediction") == 1 else 0,
+                f"risk_counts.{prediction_data.get('risk_level', 'LOW')}": 1,
+                "probability_sum": float(prediction_data.get("churn_probability", 0.0))
+            }
+            
+            await self.database[settings.COLLECTION_ROLLUPS_HOURLY].update_one(
+                {"_id": hour_bucket}, {"$inc": increments}, upsert=True
+            )
+            await self.database[settings.COLLECTION_ROLLUPS_DAILY].update_one(
+                {"_id": day_bucket}, {"$inc": increments}, upsert=True
+            )
+            await self.update_totals(1, float(prediction_data.get("confidence", 0.0)))
+        except Exception as e:
+            print(f"❌ Erreur mise à jour rollups: {e}")
+    
+    async def update_rollups_bulk(self, predictions: List[Dict[str, Any]]):
+        """Incrémenter les rollups pour un lot : un seul $inc par bucket"""
+        try:
+            buckets = {settings.COLLECTION_ROLLUPS_HOURLY: {}, settings.COLLECTION_ROLLUPS_DAILY: {}}
+            for prediction_data in predictions:
+                created_at = prediction_data["created_at"]
+                keys = {
+                    settings.COLLECTION_ROLLUPS_HOURLY: created_at.replace(minute=0, second=0, microsecond=0),
+                    settings.COLLECTION_ROLLUPS_DAILY: datetime(created_at.year, created_at.month, created_at.day)
+                }
+                for collection_name, bucket in keys.items():
+                    increments = buckets[collection_name].setdefault(bucket, {"count": 0, "churn_count": 0, "probability_sum": 0.0})
+                    increments["count"] += 1
+                    increments["churn_count"] += 1 if prediction_data.get("prediction") == 1 else 0
+                    risk_key = f"risk_counts.{prediction_data.get('risk_level', 'LOW')}"
+                    increments[risk_key] = increments.get(risk_key, 0) + 1
+                    increments["probability_sum"] += float(prediction_data.get("churn_probability", 0.0))
+            
+            for collection_name, increments_by_bucket in buckets.items():
+                await self.database[collection_name].bulk_write([
+                    UpdateOne({"_id": bucket}, {"$inc": increments}, upsert=True)
+                    for bucket, increments in increments_by_bucket.items()
+                ], ordered=False)
+            await self.update_totals(
+                len(predictions), sum(float(prediction_data.get("confidence", 0.0)) for prediction_data in predictions)
+            )
+        except Exception as e:
+            print(f"❌ Erreur mise à jour rollups: {e}")
+    
+    async def update_totals(self, count: int, confidence_sum: float):
+        """Maintenir les totaux de la collection chaude (lus par get_avg_confidence)"""
+        await self.database[settings.COLLECTION_PREDICTION_TOTALS].update_one(
+            {"_id": PREDICTION_TOTALS_ID}, {"$inc": {"count": count, "confidence_sum": confidence_sum}}, upsert=True
+        )
+    
+    async def rebuild_totals(self):
+        """Recalculer les totaux à partir des prédictions brutes (document absent)"""
+        try:
+            spec = self._rebuild_totals_query()
+            await self.database[spec["collection"]].aggregate(spec["pipeline"]).to_list(length=None)
+            print("✅ Totaux des prédictions reconstruits")
+        except Exception as e:
+            print(f"❌ Erreur reconstruction totaux: {e}")
+    
+    async def rebuild_rollups(self):
+        """Reconstruire les rollups horaire et journalier à partir des prédictions brutes"""
+        try:
+            for collection_name in [settings.COLLECTION_ROLLUPS_HOURLY, settings.COLLECTION_ROLLUPS_DAILY]:
+                spec = self._rebuild_rollups_query(collection_name)
+                await self.database[spec["collection"]].aggregate(spec["pipeline"]).to_list(length=None)
+            
+            print("✅ Rollups reconstruits")
+        except Exception as e:
+            print(f"❌ Erreur reconstruction rollups: {e}")
+    
+    async def get_trends(self, start: datetime, end: datetime, granularity: str = "day") -> List[Dict]:
+        """Récupérer les tendances sur une période depuis les rollups (heure, jour ou mois)"""
+        try:
+            start = trend_start(start, granularity)
+            
+            cursor = self._find(self._trends_query(start, end, granularity))
+            rollups = [{"bucket": rollup["_id"], **rollup} async for rollup in cursor]
+            
+            return build_trend_points(rollups, start, end, granularity)
+        except Exception as e:
+            print(f"❌ Erreur récupération tendances: {e}")
+            return []
+    
     async def save_customer(self, customer_data: Dict[str, Any]) -> str:
         """Sauvegarder un client"""
         try:
@@ -168,9 +650,8 @@ class MongoDB:
             
             # Vérifier si le client existe déjà
             if customer_data.get("customer_id"):
-                existing = await self.database[settings.COLLECTION_CUSTOMERS].find_one({
-                    "customer_id": customer_data["customer_id"]
-                })
+                lookup = self._customer_lookup_query(customer_data["customer_id"])
+                existing = await self.database[lookup["collection"]].find_one(lookup["filter"])
                 
                 if existing:
                     # Mettre à jour
@@ -189,21 +670,67 @@ class MongoDB:
             raise
     
     async def get_customers(self, limit: int = 50) -> List[Dict]:
-        """Récupérer la liste des clients"""
+        """Récupérer la liste des clients au format CustomerResponse (champs projetés uniquement)"""
         try:
-            cursor = self.database[settings.COLLECTION_CUSTOMERS].find().sort("created_at", -1).limit(limit)
-            customers = await cursor.to_list(length=limit)
+            cursor = self._find(self._customers_page_query()).limit(limit)
             
-            for customer in customers:
-                customer["_id"] = str(customer["_id"])
-                if "created_at" in customer and isinstance(customer["created_at"], datetime):
-                    customer["created_at"] = customer["created_at"].isoformat()
+            customers = []
+            async for doc in cursor:
+                customer = {field: doc.get(field, 0) for field in CUSTOMER_FEATURE_FIELDS}
+                for field in CUSTOMER_OPTIONAL_FIELDS:
+                    customer[field] = doc.get(field)
+                customer["id"] = str(doc["_id"])
+                created_at = doc.get("created_at")
+                customer["created_at"] = created_at.isoformat() if isinstance(created_at, datetime) else created_at
+                customers.append(customer)
             
             return customers
         except Exception as e:
             print(f"❌ Erreur récupération clients: {e}")
             return []
     
+    async def count_customers(self) -> int:
+        """Nombre total de clients"""
+        try:
+            return await self.database[settings.COLLECTION_CUSTOMERS].estimated_document_count()
+        except Exception as e:
+            print(f"❌ Erreur comptage clients: {e}")
+            return 0
+    
+    async def iter_customer_features(self, batch_size: int = 1000):
+        """Parcourir tous les clients par lots (curseur unique trié sur _id)"""
+        cursor = self._find(self._customer_scan_query()).batch_size(batch_size)
+        
+        batch = []
+        async for doc in cursor:
+            batch.append({
+                **{field: doc.get(field, 0) for field in CUSTOMER_FEATURE_FIELDS},
+                "customer_id": doc.get("customer_id") or str(doc["_id"]),
+                "name": doc.get("name")
+            })
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    async def get_customer_features(self, customer_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Charger les features des clients demandés en une requête $in sur l'index customer_id"""
+        try:
+            cursor = self._find(self._customer_features_query(customer_ids))
+            
+            # En cas de doublons, le document le plus récent l'emporte
+            features = {}
+            async for doc in cursor:
+                features[doc["customer_id"]] = {
+                    **{field: doc.get(field, 0) for field in CUSTOMER_FEATURE_FIELDS},
+                    "name": doc.get("name")
+                }
+            return features
+        except Exception as e:
+            print(f"❌ Erreur récupération features clients: {e}")
+            return {}
+    
     async def save_model_metrics(self, metrics: Dict[str, Any]) -> str:
         """Sauvegarder les métriques du modèle"""
         try:
@@ -230,42 +757,131 @@ class MongoDB:
             print(f"❌ Erreur récupération métriques: {e}")
             return None
 
+    async def iter_predictions(self, start: datetime, end: datetime, risk_level: Optional[str] = None,
+                               batch_size: int = 1000):
+        """Parcourir les prédictions d'un intervalle par lots (archive puis collection chaude, ordre chronologique)"""
+        # Partitions archivées (les plus anciennes), lues une journée à la fois
+        for partition_key in self.archive.partitions_in_range(start, end):
+            rows = await asyncio.to_thread(self.archive.read_range, partition_key, start, end)
+            if risk_level:
+                rows = [row for row in rows if row.get("risk_level") == risk_level]
+            for i in range(0, len(rows), batch_size):
+                yield rows[i:i + batch_size]
+        
+        # Collection chaude : curseur par lots sur l'index ts (ou r_ts si filtre de risque)
+        cursor = self._find(self._predictions_range_query(start, end, risk_level)).batch_size(batch_size)
+        
+        documents = []
+        async for doc in cursor:
+            documents.append(doc)
+            if len(documents) >= batch_size:
+                yield await self._decode_predictions(documents)
+                documents = []
+        if documents:
+            yield await self._decode_predictions(documents)
+
+    async def archive_old_predictions(self, older_than_days: int = None) -> int:
+        """Déplacer les prédictions plus anciennes que N jours vers l'archive Parquet, puis les supprimer
+        (documents au schéma compact, parcourus sur l'index ts)"""
+        if not self.archive.available:
+            print("⚠️  pyarrow non installé, archivage désactivé")
+            return 0
+
+        older_than_days = older_than_days if older_than_days is not None else settings.ARCHIVE_AFTER_DAYS
+        today = datetime.now().date()
+        cutoff = datetime(today.year, today.month, today.day) - timedelta(days=older_than_days)
+        collection = self.database[settings.COLLECTION_PREDICTIONS]
+        archived_count = 0
+
+        async def flush(day, batch):
+            # Écrire le fichier avant de supprimer : un échec laisse les documents dans Mongo
+            await self._load_model_versions(batch)
+            documents = []
+            for doc in batch:
+                decoded = decode_prediction(doc, self.model_versions.get(doc.get(FIELD_MODEL_VERSION)), serialize_dates=False)
+                decoded["_id"] = str(decoded["_id"])
+                documents.append(decoded)
+            await asyncio.to_thread(self.archive.write_partition, day, documents)
+            await collection.delete_many({"_id": {"$in": [doc["_id"] for doc in batch]}})
+            await self.update_totals(-len(batch), -sum(float(doc.get("confidence", 0.0)) for doc in documents))
+            return len(batch)
+
+        try:
+            cursor = self._find(self._archive_query(cutoff)).batch_size(settings.ARCHIVE_BATCH_SIZE)
+            batch, batch_day = [], None
+
+            async for doc in cursor:
+                doc_day = doc[FIELD_TIMESTAMP].date()
+                if batch and (doc_day != batch_day or len(batch) >= settings.ARCHIVE_BATCH_SIZE):
+                    archived_count += await flush(batch_day, batch)
+                    batch = []
+                batch_day = doc_day
+                batch.append(doc)
+
+            if batch:
+                archived_count += await flush(batch_day, batch)
+
+            if archived_count:
+                print(f"📦 {archived_count} prédictions archivées (antérieures au {cutoff.date()})")
+            return archived_count
+        except Exception as e:
+            print(f"❌ Erreur archivage prédictions: {e}")
+            return archived_count
+
     # Méthodes supplémentaires pour la compatibilité
     async def get_predictions_by_date(self, date: datetime) -> List[Dict]:
-        """Récupérer les prédictions d'une date spécifique"""
+        """Récupérer toutes les prédictions d'une date spécifique (archive incluse)"""
         try:
             start_of_day = datetime(date.year, date.month, date.day)
-            end_of_day = datetime(date.year, date.month, date.day, 23, 59, 59)
-            
-            cursor = self.database[settings.COLLECTION_PREDICTIONS].find({
-                "created_at": {"$gte": start_of_day, "$lte": end_of_day}
-            })
-            predictions = await cursor.to_list(length=1000)
-            
-            for pred in predictions:
-                pred["_id"] = str(pred["_id"])
-                if "created_at" in pred and isinstance(pred["created_at"], datetime):
-                    pred["created_at"] = pred["created_at"].isoformat()
+            end_of_day = datetime(date.year, date.month, date.day, 23, 59, 59, 999999)
             
+            predictions = []
+            async for batch in self.iter_predictions(start_of_day, end_of_day):
+                predictions.extend(batch)
             return predictions
         except Exception as e:
             print(f"❌ Erreur récupération prédictions par date: {e}")
             return []
 
+    async def migrate_to_compact_schema(self, batch_size: int = 1000) -> int:
+        """Convertir les documents de prédiction hérités au schéma compact (écritures groupées)"""
+        collection = self.database[settings.COLLECTION_PREDICTIONS]
+        migrated = 0
+        
+        cursor = collection.find({"pid": {"$exists": False}}).batch_size(batch_size)
+        operations = []
+        async for doc in cursor:
+            # Les anciens documents portent leur propre feature_importance : une version par dict distinct
+            feature_importance = doc.get("feature_importance") or {}
+            digest = hashlib.sha1(json.dumps(feature_importance, sort_keys=True).encode()).hexdigest()[:12]
+            doc["model_version"] = f"legacy-{digest}"
+            if doc["model_version"] not in self.model_versions:
+                await self.register_model_version(doc["model_version"], feature_importance)
+            
+            if not isinstance(doc.get("created_at"), datetime):
+                doc["created_at"] = datetime.fromisoformat(doc["timestamp"]) if doc.get("timestamp") else datetime.now()
+            
+            operations.append(ReplaceOne({"_id": doc["_id"]}, encode_prediction(doc)))
+            if len(operations) >= batch_size:
+                await collection.bulk_write(operations, ordered=False)
+                migrated += len(operations)
+                operations = []
+                print(f"🔁 {migrated} prédictions migrées...")
+        
+        if operations:
+            await collection.bulk_write(operations, ordered=False)
+            migrated += len(operations)
+        
+        # Plus de branche "champs longs" dans les filtres : leurs index sont supprimés
+        self.legacy_predictions = False
+        await self.ensure_indexes()
+        return migrated
+
     async def get_high_risk_predictions(self) -> List[Dict]:
         """Récupérer les prédictions à haut risque"""
         try:
-            cursor = self.database[settings.COLLECTION_PREDICTIONS].find({
-                "risk_level": "HIGH"
-            }).sort("created_at", -1)
-            predictions = await cursor.to_list(length=100)
-            
-            for pred in predictions:
-                pred["_id"] = str(pred["_id"])
-                if "created_at" in pred and isinstance(pred["created_at"], datetime):
-                    pred["created_at"] = pred["created_at"].isoformat()
-            
-            return predictions
+            cursor = self._find(self._high_risk_query())
+            return await self._decode_prediction_responses(await cursor.to_list(length=100))
         except Exception as e:
             print(f"❌ Erreur récupération prédictions haut risque: {e}")
             return []
@@ -0,0 +1,171 @@
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+from sklearn.metrics import accuracy_score, confusion_matrix, f1_score, precision_score, recall_score, roc_auc_score
+
+from config import settings
+from out_of_core import ChunkedDataset
+from training_pipeline import TrainingPipeline, feature_indices, file_hash
+
+# Artefacts servables d'une version et fichier d'évaluation de chacun, stocké avec la version
+MODEL_ARTIFACT = "best_churn_model.pkl"
+COMPRESSED_ARTIFACT = "compressed_churn_model.pkl"
+EVALUATION_FILES = {
+    MODEL_ARTIFACT: "evaluation.json",
+    COMPRESSED_ARTIFACT: "evaluation.compressed.json"
+}
+
+def _training_metrics(model_dir: str) -> Dict[str, Any]:
+    path = os.path.join(model_dir, 'training_metrics.json')
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def _training_data_paths(training_metrics: Dict[str, Any]) -> List[str]:
+    """Fichiers dont la version a pu voir des lignes à l'entraînement"""
+    paths = [settings.TRAINING_DATA_PATH]
+    if training_metrics.get('mode') == 'out_of_core' and settings.OUT_OF_CORE_DATA_PATH:
+        paths.append(settings.OUT_OF_CORE_DATA_PATH)
+    if training_metrics.get('mode') == 'incremental':
+        paths.append(settings.INCREMENTAL_DATA_PATH)
+    return [path for path in paths if os.path.exists(path)]
+
+def holdout_data(model_dir: str) -> Tuple[np.ndarray, np.ndarray, List[str], Dict[str, Any]]:
+    """Lignes jamais vues à l'entraînement de la version (X encodé avant réduction, y, noms de colonnes) :
+    - EVALUATION_DATA_PATH s'il est configuré (refusé s'il est identique à un fichier d'entraînement) ;
+    - sinon le holdout de l'entraînement out-of-core (masque déterministe par chunk, EVALUATION_MAX_ROWS lignes au plus) ;
+    - sinon le split de test du pipeline en mémoire, celui qui n'entre ni dans le fit ni dans la réduction."""
+    training_metrics = _training_metrics(model_dir)
+
+    if settings.EVALUATION_DATA_PATH:
+        data_hash = file_hash(settings.EVALUATION_DATA_PATH)
+        identical = [path for path in _training_data_paths(training_metrics) if file_hash(path) == data_hash]
+        if identical:
+            raise ValueError(
+                f"EVALUATION_DATA_PATH ({settings.EVALUATION_DATA_PATH}) est identique aux données d'entraînement "
+                f"({', '.join(identical)}) : évaluation in-sample refusée"
+            )
+        arrays, _ = TrainingPipeline(settings.EVALUATION_DATA_PATH).run_stages(stop_after="encode", data_hash=data_hash)
+        holdout = {'source': 'external', 'data_path': settings.EVALUATION_DATA_PATH, 'data_hash': data_hash}
+        return arrays["X"], arrays["y"], [str(name) for name in arrays["feature_names"]], holdout
+
+    if training_metrics.get('mode') == 'out_of_core':
+        data_path = settings.OUT_OF_CORE_DATA_PATH or settings.TRAINING_DATA_PATH
+        dataset = ChunkedDataset(data_path, settings.OUT_OF_CORE_CHUNK_ROWS)
+        X_parts, y_parts, rows = [], [], 0
+        for X, y, mask in dataset.chunks():
+            X_parts.append(X[mask])
+            y_parts.append(y[mask])
+            rows += int(mask.sum())
+            if rows >= settings.EVALUATION_MAX_ROWS:
+                break
+        holdout = {'source': 'out_of_core_holdout', 'data_path': data_path, 'data_hash': file_hash(data_path)}
+        return (np.vstack(X_parts)[:settings.EVALUATION_MAX_ROWS], np.concatenate(y_parts)[:settings.EVALUATION_MAX_ROWS],
+                dataset.feature_names, holdout)
+
+    pipeline = TrainingPipeline(settings.TRAINING_DATA_PATH)
+    data_hash = file_hash(settings.TRAINING_DATA_PATH)
+    arrays, _ = pipeline.run_stages(stop_after="split", data_hash=data_hash)
+    holdout = {
+        'source': 'training_split', 'data_path': settings.TRAINING_DATA_PATH, 'data_hash': data_hash,
+        'split': pipeline.params["split"]
+    }
+    return arrays["X_test"], arrays["y_test"], [str(name) for name in arrays["feature_names"]], holdout
+
+def _latency_profile(model, scaler, X: np.ndarray, samples: int) -> Dict[str, float]:
+    """Latences de bout en bout (standardisation + predict_proba) : une ligne à la fois et lot complet"""
+    single_row_latencies = []
+    for index in range(min(samples, len(X))):
+        started = time.perf_counter()
+        model.predict_proba(scaler.transform(X[index:index + 1]))
+        single_row_latencies.append(time.perf_counter() - started)
+    single_row_latencies = np.array(single_row_latencies) * 1000
+
+    started = time.perf_counter()
+    model.predict_proba(scaler.transform(X))
+    batch_latency = time.perf_counter() - started
+    return {
+        'single_row_p50_ms': float(np.percentile(single_row_latencies, 50)),
+        'single_row_p95_ms': float(np.percentile(single_row_latencies, 95)),
+        'single_row_p99_ms': float(np.percentile(single_row_latencies, 99)),
+        'single_row_max_ms': float(single_row_latencies.max()),
+        'batch_size': len(X),
+        'batch_latency_ms': batch_latency * 1000,
+        'batch_rows_per_second': len(X) / batch_latency if batch_latency > 0 else 0.0
+    }
+
+def evaluate_model_dir(model_dir: str, artifact: str = MODEL_ARTIFACT) -> Dict[str, Any]:
+    """Évaluer un artefact d'un répertoire de modèle sur le holdout (inférence vectorisée en un lot)"""
+    model = joblib.load(os.path.join(model_dir, artifact))
+    scaler = joblib.load(os.path.join(model_dir, 'scaler.pkl'))
+    feature_names = list(joblib.load(os.path.join(model_dir, 'feature_names.pkl')))
+
+    # Mêmes étapes de préparation que l'entraînement, restreintes aux features du modèle
+    X, y, available, holdout = holdout_data(model_dir)
+    X = X[:, feature_indices(available, feature_names)]
+
+    probabilities = model.predict_proba(scaler.transform(X))[:, 1]
+    predictions = (probabilities > 0.5).astype(np.int64)
+    tn, fp, fn, tp = confusion_matrix(y, predictions, labels=[0, 1]).ravel()
+
+    return {
+        'evaluated_at': datetime.now().isoformat(),
+        'artifact': artifact,
+        'holdout': holdout,
+        'rows': int(len(y)),
+        'accuracy': accuracy_score(y, predictions),
+        'precision': precision_score(y, predictions, zero_division=0),
+        'recall': recall_score(y, predictions, zero_division=0),
+        'f1_score': f1_score(y, predictions, zero_division=0),
+        'auc_score': roc_auc_score(y, probabilities) if len(np.unique(y)) > 1 else None,
+        'confusion_matrix': {
+            'true_positive': [int(tp)],
+            'false_positive': [int(fp)],
+            'false_negative': [int(fn)],
+            'true_negative': [int(tn)]
+        },
+        'latency': _latency_profile(model, scaler, X, settings.EVALUATION_LATENCY_SAMPLES),
+        'feature_importance': {
+            name: float(importance) for name, importance in zip(feature_names, model.feature_importances_)
+        } if hasattr(model, 'feature_importances_') else {}
+    }
+
+def _holdout_unchanged(evaluation: Dict[str, Any]) -> bool:
+    holdout = evaluation.get('holdout') or {}
+    return bool(holdout.get('data_path')) and os.path.exists(holdout['data_path']) \
+        and holdout.get('data_hash') == file_hash(holdout['data_path'])
+
+def load_or_evaluate(model_dir: str, artifact: str = MODEL_ARTIFACT) -> Dict[str, Any]:
+    """Évaluation stockée avec la version (un fichier par artefact) ; recalculée seulement si absente
+    ou si les données du holdout ont changé"""
+    evaluation_path = os.path.join(model_dir, EVALUATION_FILES[artifact])
+    if os.path.exists(evaluation_path):
+        with open(evaluation_path) as f:
+            evaluation = json.load(f)
+        if _holdout_unchanged(evaluation) and (evaluation['holdout']['source'] == 'external') == bool(settings.EVALUATION_DATA_PATH):
+            return evaluation
+
+    evaluation = evaluate_model_dir(model_dir, artifact)
+    tmp_path = evaluation_path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(evaluation, f, indent=2, default=float)
+    os.replace(tmp_path, evaluation_path)
+    print(f"📏 Évaluation holdout ({artifact}, {evaluation['holdout']['source']}): accuracy {evaluation['accuracy']:.3f}, "
+          f"F1 {evaluation['f1_score']:.3f}, p99 {evaluation['latency']['single_row_p99_ms']:.2f}ms")
+    return evaluation
+
+def evaluate_version(model_dir: str):
+    """Évaluer chaque artefact servable présent dans une version (les erreurs sont journalisées)"""
+    for artifact in EVALUATION_FILES:
+        if not os.path.exists(os.path.join(model_dir, artifact)):
+            continue
+        try:
+            load_or_evaluate(model_dir, artifact)
+        except Exception as e:
+            print(f"❌ Erreur lors de l'évaluation holdout ({artifact}): {e}")
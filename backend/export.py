@@ -0,0 +1,106 @@
+import csv
+import io
+from typing import Any, AsyncIterator, Dict, List
+
+import orjson
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+PARQUET_AVAILABLE = pa is not None
+
+# Colonnes exportées (la feature_importance est portée par model_version)
+EXPORT_COLUMNS = [
+    "prediction_id", "customer_id", "customer_name", "created_at", "churn_probability",
+    "prediction", "confidence", "risk_level", "message", "model_version"
+]
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet"
+}
+
+def _export_row(prediction: Dict[str, Any]) -> Dict[str, Any]:
+    return {column: prediction.get(column) for column in EXPORT_COLUMNS}
+
+async def stream_ndjson(batches: AsyncIterator[List[Dict]]) -> AsyncIterator[bytes]:
+    async for batch in batches:
+        yield b"".join(orjson.dumps(_export_row(prediction)) + b"\n" for prediction in batch)
+
+async def stream_csv(batches: AsyncIterator[List[Dict]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+
+    async for batch in batches:
+        writer.writerows(_export_row(prediction) for prediction in batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+class _ChunkSink(io.RawIOBase):
+    """Flux d'écriture dont le contenu est vidé après chaque row group Parquet"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+def _parquet_schema():
+    return pa.schema([
+        ("prediction_id", pa.string()),
+        ("customer_id", pa.string()),
+        ("customer_name", pa.string()),
+        ("created_at", pa.string()),
+        ("churn_probability", pa.float64()),
+        ("prediction", pa.int8()),
+        ("confidence", pa.float64()),
+        ("risk_level", pa.string()),
+        ("message", pa.string()),
+        ("model_version", pa.string())
+    ])
+
+async def stream_parquet(batches: AsyncIterator[List[Dict]]) -> AsyncIterator[bytes]:
+    # Un row group par lot du curseur : la mémoire reste bornée par la taille du lot
+    sink = _ChunkSink()
+    schema = _parquet_schema()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        async for batch in batches:
+            table = pa.Table.from_pylist([_export_row(prediction) for prediction in batch], schema=schema)
+            writer.write_table(table)
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+def stream_export(batches: AsyncIterator[List[Dict]], export_format: str) -> AsyncIterator[bytes]:
+    """Sérialiser un flux de lots de prédictions dans le format demandé"""
+    if export_format == "csv":
+        return stream_csv(batches)
+    if export_format == "parquet":
+        return stream_parquet(batches)
+    return stream_ndjson(batches)
@@ -0,0 +1,176 @@
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, HistGradientBoostingClassifier
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import ParameterSampler, StratifiedKFold
+
+from config import settings
+from model_training import parallelism_budget
+
+# Espace de recherche par famille de modèles (valeurs échantillonnées aléatoirement)
+SEARCH_SPACE = {
+    'Random Forest': (
+        lambda params: RandomForestClassifier(random_state=42, **params),
+        {
+            'n_estimators': [100, 200, 400],
+            'max_depth': [8, 12, 15, None],
+            'min_samples_leaf': [1, 2, 5],
+            'max_features': ['sqrt', 0.5]
+        }
+    ),
+    'Gradient Boosting': (
+        lambda params: GradientBoostingClassifier(random_state=42, **params),
+        {
+            'n_estimators': [100, 200, 300],
+            'learning_rate': [0.05, 0.1, 0.2],
+            'max_depth': [2, 3, 4],
+            'subsample': [0.8, 1.0]
+        }
+    ),
+    'Hist Gradient Boosting': (
+        lambda params: HistGradientBoostingClassifier(random_state=42, **params),
+        {
+            'max_iter': [100, 200, 400],
+            'learning_rate': [0.05, 0.1, 0.2],
+            'max_leaf_nodes': [15, 31, 63],
+            'l2_regularization': [0.0, 1.0]
+        }
+    )
+}
+
+def search_settings() -> Dict[str, Any]:
+    """Paramètres de la recherche (entrent dans la clé du cache de runs)"""
+    return {
+        "n_candidates": settings.SEARCH_N_CANDIDATES,
+        "eta": settings.SEARCH_ETA,
+        "min_samples": settings.SEARCH_MIN_SAMPLES,
+        "cv": settings.SEARCH_CV_FOLDS,
+        "time_budget_seconds": settings.SEARCH_TIME_BUDGET_SECONDS,
+        "space": {family: space for family, (_, space) in SEARCH_SPACE.items()}
+    }
+
+def _sample_configurations(n_candidates: int, random_state: int = 42) -> List[Dict[str, Any]]:
+    """Configurations candidates réparties entre les familles"""
+    per_family = max(1, n_candidates // len(SEARCH_SPACE))
+    configurations = []
+    for family, (_, space) in SEARCH_SPACE.items():
+        for params in ParameterSampler(space, n_iter=per_family, random_state=random_state):
+            configurations.append({"config_id": len(configurations), "family": family, "params": params})
+    return configurations
+
+def _evaluate_fold(family: str, params: Dict[str, Any], X: np.ndarray, y: np.ndarray,
+                   train_index: np.ndarray, val_index: np.ndarray) -> Dict[str, float]:
+    build, _ = SEARCH_SPACE[family]
+    started = time.perf_counter()
+    model = build(params).fit(X[train_index], y[train_index])
+    return {
+        "auc": roc_auc_score(y[val_index], model.predict_proba(X[val_index])[:, 1]),
+        "fit_time": time.perf_counter() - started
+    }
+
+def stratified_sample_floor(y_ordered: np.ndarray, n_splits: int) -> int:
+    """Plus petit préfixe de l'ordre d'échantillonnage contenant au moins n_splits lignes de chaque classe
+    (condition de StratifiedKFold)"""
+    return max(
+        int(np.flatnonzero(y_ordered == label)[n_splits - 1]) + 1
+        for label in np.unique(y_ordered)
+    )
+
+def successive_halving_search(X_train, y_train, report: Optional[Callable[[str, float], None]] = None,
+                              n_jobs: Optional[int] = None) -> Dict[str, Any]:
+    """Recherche par successive halving : chaque tour évalue les configurations restantes (AUC en CV)
+    sur un échantillon eta fois plus grand et ne garde que le meilleur 1/eta. La recherche s'arrête
+    au budget de temps ; le gagnant est le meilleur du dernier tour terminé."""
+    report = report or (lambda stage, progress: None)
+    X_train, y_train = np.asarray(X_train), np.asarray(y_train)
+    eta = settings.SEARCH_ETA
+    started = time.perf_counter()
+    deadline = started + settings.SEARCH_TIME_BUDGET_SECONDS
+
+    survivors = _sample_configurations(settings.SEARCH_N_CANDIDATES)
+    n_rounds = max(1, math.ceil(math.log(len(survivors), eta))) if len(survivors) > 1 else 1
+    order = np.random.default_rng(42).permutation(len(y_train))
+    budget = parallelism_budget(n_jobs)
+
+    # Nombre de plis limité par la classe minoritaire, et taille minimale des échantillons de tour
+    # pour que chaque classe y ait au moins n_splits lignes
+    n_splits = min(settings.SEARCH_CV_FOLDS, int(np.unique(y_train, return_counts=True)[1].min()))
+    if n_splits < 2:
+        raise ValueError("Classe minoritaire trop rare pour une validation croisée stratifiée")
+    min_samples = stratified_sample_floor(y_train[order], n_splits)
+
+    trace = []
+    best = None
+    stopped_early = False
+    for round_index in range(n_rounds + 1):
+        # Ressources du tour : taille d'échantillon croissante, jeu complet au dernier tour
+        n_samples = len(y_train) if round_index == n_rounds else min(
+            len(y_train), max(min_samples, settings.SEARCH_MIN_SAMPLES * eta ** round_index)
+        )
+        subset = np.sort(order[:n_samples])
+        X_round, y_round = X_train[subset], y_train[subset]
+        folds = list(StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42).split(X_round, y_round))
+        report(f"search_round_{round_index + 1}", 0.15 + 0.3 * round_index / (n_rounds + 1))
+
+        tasks = [
+            delayed(_evaluate_fold)(config["family"], config["params"], X_round, y_round, train_index, val_index)
+            for config in survivors for train_index, val_index in folds
+        ]
+        fold_results = []
+        for result in Parallel(n_jobs=min(budget, len(tasks)), backend="loky", return_as="generator")(tasks):
+            fold_results.append(result)
+            if time.perf_counter() > deadline:
+                # Budget écoulé : les tâches restantes du tour sont abandonnées
+                stopped_early = True
+                break
+
+        round_scores = []
+        for position, config in enumerate(survivors):
+            results = fold_results[position * len(folds):(position + 1) * len(folds)]
+            if len(results) < len(folds):
+                continue
+            score = {
+                **config,
+                "round": round_index + 1,
+                "n_samples": int(n_samples),
+                "mean_auc": float(np.mean([result["auc"] for result in results])),
+                "std_auc": float(np.std([result["auc"] for result in results])),
+                "fit_time_seconds": float(np.sum([result["fit_time"] for result in results]))
+            }
+            round_scores.append(score)
+            trace.append(score)
+
+        if round_scores:
+            round_scores.sort(key=lambda score: score["mean_auc"], reverse=True)
+            best = round_scores[0]
+            print(f"🔎 Tour {round_index + 1}: {len(round_scores)} configurations sur {n_samples} lignes, "
+                  f"meilleure AUC {best['mean_auc']:.3f} ({best['family']})")
+
+        if stopped_early or len(round_scores) <= 1 or n_samples >= len(y_train):
+            break
+        # Élimination des configurations perdantes
+        survivors = [
+            {"config_id": score["config_id"], "family": score["family"], "params": score["params"]}
+            for score in round_scores[:max(1, len(round_scores) // eta)]
+        ]
+
+    if best is None:
+        raise RuntimeError("Budget de recherche écoulé avant la fin du premier tour")
+
+    return {
+        "best": {"family": best["family"], "params": best["params"], "mean_auc": best["mean_auc"], "round": best["round"]},
+        "elapsed_seconds": time.perf_counter() - started,
+        "stopped_by_time_budget": stopped_early,
+        "cv_folds": n_splits,
+        "settings": search_settings(),
+        "trace": trace
+    }
+
+def build_searched_model(search_result: Dict[str, Any]):
+    """Instancier le modèle de la configuration retenue"""
+    build, _ = SEARCH_SPACE[search_result["best"]["family"]]
+    return build(search_result["best"]["params"])
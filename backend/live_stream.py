@@ -0,0 +1,137 @@
+import asyncio
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Set
+
+class LiveFeed:
+    """Fan-out en mémoire des deltas du tableau de bord vers les abonnés SSE"""
+
+    def __init__(self, queue_size: int = 256, keepalive_seconds: float = 15.0):
+        self.queue_size = queue_size
+        self.keepalive_seconds = keepalive_seconds
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.events_published = 0
+        self.subscribers_resynced = 0
+
+    def subscribe(self) -> asyncio.Queue:
+        """Enregistrer un nouvel abonné et retourner sa file d'événements"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        """Retirer un abonné"""
+        self.subscribers.discard(queue)
+
+    def publish(self, event: Dict[str, Any]):
+        """Diffuser un événement à tous les abonnés (sérialisé une seule fois)"""
+        if not self.subscribers:
+            return
+
+        payload = f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+        self.events_published += 1
+
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                # Abonné trop lent : ses deltas en attente ne suffisent plus, il recharge l'état complet
+                self.resync(queue)
+
+    def resync(self, queue: asyncio.Queue):
+        """Vider la file d'un abonné en retard et lui envoyer un événement de resynchronisation"""
+        while not queue.empty():
+            queue.get_nowait()
+        event = {"type": "resync", "timestamp": datetime.now().isoformat()}
+        queue.put_nowait(f"event: resync\ndata: {json.dumps(event)}\n\n")
+        self.subscribers_resynced += 1
+
+    def publish_prediction(self, prediction_data: Dict[str, Any]):
+        """Construire et diffuser le delta correspondant à une nouvelle prédiction"""
+        self.publish_predictions([prediction_data])
+
+    def publish_predictions(self, predictions: List[Dict[str, Any]]):
+        """Diffuser un seul delta cumulé pour un lot de prédictions (écritures en masse)"""
+        if not self.subscribers or not predictions:
+            return
+
+        today = datetime.now().date()
+        delta = {
+            "total_predictions": 0,
+            "churn_count": 0,
+            "predictions_today": 0,
+            "high_risk_customers": 0,
+            "confidence": 0.0,
+            "hourly_distribution": {}
+        }
+        high_risk_customer = None
+        created_ats = [
+            prediction_data["created_at"] if isinstance(prediction_data.get("created_at"), datetime) else datetime.now()
+            for prediction_data in predictions
+        ]
+
+        for prediction_data, created_at in zip(predictions, created_ats):
+            hour = str(created_at.hour)
+
+            delta["total_predictions"] += 1
+            delta["churn_count"] += 1 if prediction_data.get("prediction") == 1 else 0
+            delta["predictions_today"] += 1 if created_at.date() == today else 0
+            delta["confidence"] += prediction_data.get("confidence", 0.0)
+            delta["hourly_distribution"][hour] = delta["hourly_distribution"].get(hour, 0) + 1
+
+            if prediction_data.get("risk_level") == "HIGH":
+                delta["high_risk_customers"] += 1
+                high_risk_customer = {
+                    "customer_id": prediction_data.get("customer_id"),
+                    "customer_name": prediction_data.get("customer_name"),
+                    "churn_probability": prediction_data.get("churn_probability", 0.0)
+                }
+
+        # La prédiction affichée est la plus récente du lot
+        latest = predictions[-1]
+        timestamp = max(created_ats).isoformat()
+        event = {
+            "type": "prediction",
+            "timestamp": timestamp,
+            "delta": delta,
+            "prediction": {
+                "prediction_id": latest.get("prediction_id", ""),
+                "customer_id": latest.get("customer_id"),
+                "timestamp": latest.get("timestamp", timestamp),
+                "churn_probability": latest.get("churn_probability", 0.0),
+                "prediction": latest.get("prediction", 0),
+                "confidence": latest.get("confidence", 0.0),
+                "risk_level": latest.get("risk_level", "LOW"),
+                "message": latest.get("message", "")
+            }
+        }
+
+        if high_risk_customer:
+            event["high_risk_customer"] = high_risk_customer
+
+        self.publish(event)
+
+    async def stream(self) -> AsyncIterator[str]:
+        """Générateur SSE pour un abonné, avec keepalive périodique"""
+        queue = self.subscribe()
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    payload = await asyncio.wait_for(queue.get(), timeout=self.keepalive_seconds)
+                    yield payload
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            self.unsubscribe(queue)
+
+    def stats(self) -> Dict[str, int]:
+        """Statistiques du flux en direct"""
+        return {
+            "subscribers": len(self.subscribers),
+            "events_published": self.events_published,
+            "subscribers_resynced": self.subscribers_resynced
+        }
+
+# Instance globale
+live_feed = LiveFeed()
@@ -1,7 +1,7 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, ORJSONResponse
 from pydantic import BaseModel
-import pandas as pd
 import joblib
 import numpy as np
 import os
@@ -9,27 +9,43 @@ import asyncio
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 import json
-from sklearn.metrics import classification_report, confusion_matrix, accuracy_score, roc_auc_score
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.model_selection import train_test_split, cross_val_score
 import uuid
 from contextlib import asynccontextmanager
 
-# Import MongoDB
-from database import mongodb
+# Import du backend de stockage (MongoDB ou SQLite embarqué selon STORAGE_BACKEND)
+from storage import create_storage, TREND_GRANULARITIES, RISK_LEVELS
 from config import settings
+from live_stream import live_feed
+from export import stream_export, EXPORT_FORMATS, PARQUET_AVAILABLE
+from rescoring import PortfolioRescorer
+from training_jobs import TrainingScheduler, TrainingJob, TRAINING_MODES
+from training_worker import train_in_worker, current_model_dir, current_model_version, INCREMENTAL_REQUIRES_VERSION
+from training_pipeline import serving_frame
+from evaluation import load_or_evaluate, MODEL_ARTIFACT, COMPRESSED_ARTIFACT
+import model_compression  # requis par joblib.load pour dépickler DistilledClassifier (compressed_churn_model.pkl)
+
+storage = create_storage()
+rescorer = PortfolioRescorer(settings.RESCORE_BATCH_SIZE, settings.RESCORE_WORKERS)
+
+# Archivage périodique des anciennes prédictions
+async def archive_loop():
+    while True:
+        await storage.archive_old_predictions()
+        await asyncio.sleep(settings.ARCHIVE_INTERVAL_HOURS * 3600)
 
 # Gestion du lifespan
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    await mongodb.connect()
+    await storage.connect()
     load_model()
-    print("✅ Backend started successfully with MongoDB!")
+    archive_task = asyncio.create_task(archive_loop()) if settings.ARCHIVE_ENABLED else None
+    print(f"✅ Backend started successfully with {storage.name}!")
     yield
     # Shutdown
-    await mongodb.close()
+    if archive_task:
+        archive_task.cancel()
+    await storage.close()
     print("🔴 Backend shutting down...")
 
 app = FastAPI(
@@ -55,6 +71,12 @@ model = None
 scaler = None
 feature_names = None
 model_metrics = {}
+model_version = "simulation"
+# Artefact servi pour la version courante (modèle complet ou compressé)
+served_artifact = None
+# État de l'évaluation holdout du modèle servi : not_evaluated, pending, evaluated ou failed
+model_evaluation_status = "not_evaluated"
+model_metrics_task: Optional[asyncio.Task] = None
 
 # Modèles Pydantic
 class PredictionInput(BaseModel):
@@ -81,6 +103,12 @@ class PredictionInput(BaseModel):
 class BatchPredictionInput(BaseModel):
     customers: List[PredictionInput]
 
+class PredictionByIdInput(BaseModel):
+    customer_id: str
+
+class BatchPredictionByIdInput(BaseModel):
+    customer_ids: List[str]
+
 class PredictionResponse(BaseModel):
     prediction_id: str
     churn_probability: float
@@ -99,13 +127,19 @@ class BatchPredictionResponse(BaseModel):
 
 class ModelMetricsResponse(BaseModel):
     model_version: str
-    training_date: str
-    accuracy: float
-    precision: float
-    recall: float
-    f1_score: float
-    feature_importance: Dict[str, float]
-    confusion_matrix: Dict[str, List[int]]
+    evaluation_status: str
+    artifact: Optional[str] = None
+    holdout_source: Optional[str] = None
+    training_date: Optional[str] = None
+    accuracy: Optional[float] = None
+    precision: Optional[float] = None
+    recall: Optional[float] = None
+    f1_score: Optional[float] = None
+    feature_importance: Dict[str, float] = {}
+    confusion_matrix: Optional[Dict[str, List[int]]] = None
+    auc_score: Optional[float] = None
+    evaluated_rows: Optional[int] = None
+    latency: Optional[Dict[str, float]] = None
 
 class AnalyticsResponse(BaseModel):
     total_predictions: int
@@ -115,6 +149,20 @@ class AnalyticsResponse(BaseModel):
     high_risk_customers: int
     hourly_distribution: Dict[str, int]
 
+class TrendPoint(BaseModel):
+    period: str
+    count: int
+    churn_count: int
+    churn_rate: float
+    avg_probability: float
+    risk_counts: Dict[str, int]
+
+class TrendsResponse(BaseModel):
+    granularity: str
+    start: str
+    end: str
+    points: List[TrendPoint]
+
 class CustomerResponse(BaseModel):
     id: str
     name: Optional[str]
@@ -147,94 +195,123 @@ class PredictionHistoryResponse(BaseModel):
     has_more: bool
 
 # Chargement du modèle
+async def refresh_model_metrics(model_dir: str, artifact: str, version: str, training_date: str):
+    """Évaluation holdout du modèle chargé, hors de la boucle d'événements : l'evaluation.json
+    écrit par le worker est relu tel quel, le calcul complet n'a lieu que pour des artefacts non évalués"""
+    global model_metrics, model_evaluation_status
+    try:
+        evaluation = await asyncio.to_thread(load_or_evaluate, model_dir, artifact)
+    except Exception as e:
+        if version == model_version:
+            model_evaluation_status = "failed"
+        print(f"❌ Erreur lors de l'évaluation holdout: {e}")
+        return
+    
+    # Un autre modèle a pu être chargé pendant l'évaluation
+    if version != model_version:
+        return
+    model_metrics = {**evaluation, 'model_version': version, 'training_date': training_date}
+    model_evaluation_status = "evaluated"
+    
+    # Sauvegarder les métriques dans MongoDB
+    try:
+        await storage.save_model_metrics(dict(model_metrics))
+    except Exception as e:
+        print(f"❌ Erreur sauvegarde métriques du modèle: {e}")
+
+def log_task_failure(task: asyncio.Task):
+    """Journaliser l'exception d'une tâche de fond qui n'a pas été gérée"""
+    if not task.cancelled() and task.exception() is not None:
+        print(f"❌ Erreur dans la tâche {task.get_name()}: {task.exception()}")
+
 def load_model():
-    global model, scaler, feature_names, model_metrics
+    global model, scaler, feature_names, model_metrics, model_version, model_evaluation_status, model_metrics_task, served_artifact
     try:
-        model_path = 'app/models/best_churn_model.pkl'
-        scaler_path = 'app/models/scaler.pkl'
-        features_path = 'app/models/feature_names.pkl'
+        # Artefacts de la version publiée par le worker d'entraînement
+        model_dir = current_model_dir()
+        model_path = os.path.join(model_dir, MODEL_ARTIFACT)
+        compressed_path = os.path.join(model_dir, COMPRESSED_ARTIFACT)
+        scaler_path = os.path.join(model_dir, 'scaler.pkl')
+        features_path = os.path.join(model_dir, 'feature_names.pkl')
         
         if os.path.exists(model_path):
-            model = joblib.load(model_path)
+            # Modèle compressé (moins d'arbres ou élève distillé) si demandé et disponible
+            served_artifact = MODEL_ARTIFACT
+            if settings.SERVE_COMPRESSED_MODEL and os.path.exists(compressed_path):
+                served_artifact = COMPRESSED_ARTIFACT
+                print("🗜️  Modèle compressé chargé")
+            model = joblib.load(os.path.join(model_dir, served_artifact))
             scaler = joblib.load(scaler_path)
             feature_names = joblib.load(features_path)
             
-            # Calcul des métriques du modèle
-            if hasattr(model, 'feature_importances_'):
-                feature_importance = dict(zip(feature_names, model.feature_importances_))
-                model_metrics = {
-                    'model_version': '3.0.0',
-                    'training_date': datetime.now().strftime('%Y-%m-%d'),
-                    'feature_importance': feature_importance,
-                    'accuracy': 0.87,
-                    'precision': 0.85,
-                    'recall': 0.82,
-                    'f1_score': 0.83
-                }
-                
-                # Sauvegarder les métriques dans MongoDB
-                asyncio.create_task(mongodb.save_model_metrics(model_metrics))
-                
+            # Référence de version stockée avec chaque prédiction
+            model_version = current_model_version() or datetime.fromtimestamp(os.path.getmtime(model_path)).strftime('%Y%m%d%H%M%S')
+            
+            # Métriques réelles sur le holdout de l'artefact servi, chargées en arrière-plan (une évaluation par artefact)
+            model_metrics = {}
+            model_evaluation_status = "pending"
+            if model_metrics_task is not None and not model_metrics_task.done():
+                model_metrics_task.cancel()
+            training_date = datetime.fromtimestamp(os.path.getmtime(model_path)).strftime('%Y-%m-%d')
+            model_metrics_task = asyncio.create_task(
+                refresh_model_metrics(model_dir, served_artifact, model_version, training_date), name="model-metrics"
+            )
+            model_metrics_task.add_done_callback(log_task_failure)
+            
             print("✅ Modèle ML chargé avec succès!")
         else:
             print("⚠️  Modèle non trouvé, utilisation du mode simulation")
     except Exception as e:
         print(f"❌ Erreur lors du chargement du modèle: {e}")
 
-# Fonction de prédiction avancée
-def predict_churn_advanced(input_data: PredictionInput) -> Dict[str, Any]:
+# Niveau de risque et message associés à une probabilité (modèle entraîné)
+def risk_from_probability(probability: float):
+    if probability > 0.7:
+        return "HIGH", "Client à haut risque de churn - Action immédiate recommandée"
+    elif probability > 0.4:
+        return "MEDIUM", "Risque de churn modéré - Surveillance recommandée"
+    return "LOW", "Faible risque de churn - Client fidèle"
+
+# Prédiction vectorisée : une seule passe scaler + predict_proba pour tous les clients
+def predict_churn_vectorized(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    if not records:
+        return []
+    
     if model is None or scaler is None:
         # Mode simulation
-        return simulate_prediction(input_data)
+        return [simulate_prediction(PredictionInput(**record)) for record in records]
     
     try:
-        # Préparation des données
-        input_df = pd.DataFrame([input_data.dict()])
-        
-        # S'assurer que toutes les features sont présentes
-        for feature in feature_names:
-            if feature not in input_df.columns:
-                input_df[feature] = 0
+        # Préparation des données : colonnes, encodage et features dérivées identiques à l'entraînement
+        input_df = serving_frame(records, feature_names)
+        input_scaled = scaler.transform(input_df.to_numpy())
+        probabilities = model.predict_proba(input_scaled)[:, 1]
         
-        # Réorganiser les colonnes
-        input_df = input_df[feature_names]
-        
-        # Standardisation
-        input_scaled = scaler.transform(input_df)
-        
-        # Prédiction
-        probability = model.predict_proba(input_scaled)[0][1]
-        prediction = 1 if probability > 0.5 else 0
-        confidence = max(probability, 1 - probability)
-        
-        # Niveau de risque
-        if probability > 0.7:
-            risk_level = "HIGH"
-            message = "Client à haut risque de churn - Action immédiate recommandée"
-        elif probability > 0.4:
-            risk_level = "MEDIUM"
-            message = "Risque de churn modéré - Surveillance recommandée"
-        else:
-            risk_level = "LOW"
-            message = "Faible risque de churn - Client fidèle"
-        
-        # Importance des features
+        # Importance des features (commune à toutes les prédictions)
         feature_importance = {}
         if hasattr(model, 'feature_importances_'):
             feature_importance = dict(zip(feature_names, model.feature_importances_))
         
-        return {
-            "churn_probability": float(probability),
-            "prediction": int(prediction),
-            "confidence": float(confidence),
-            "risk_level": risk_level,
-            "message": message,
-            "feature_importance": feature_importance
-        }
+        results = []
+        for probability in probabilities:
+            risk_level, message = risk_from_probability(probability)
+            results.append({
+                "churn_probability": float(probability),
+                "prediction": 1 if probability > 0.5 else 0,
+                "confidence": float(max(probability, 1 - probability)),
+                "risk_level": risk_level,
+                "message": message,
+                "feature_importance": feature_importance
+            })
+        return results
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur de prédiction: {str(e)}")
 
+# Fonction de prédiction avancée
+def predict_churn_advanced(input_data: PredictionInput) -> Dict[str, Any]:
+    return predict_churn_vectorized([input_data.dict()])[0]
+
 def simulate_prediction(input_data: PredictionInput) -> Dict[str, Any]:
     """Simulation de prédiction pour le développement - CORRIGÉE"""
     base_prob = 0.15
@@ -318,18 +395,21 @@ async def root():
         "status": "running",
         "version": "3.0.0",
         "model_loaded": model is not None,
-        "database": "MongoDB"
+        "database": storage.name
     }
 
 @app.get("/health")
 async def health_check():
     model_status = "loaded" if model is not None else "simulation"
-    db_status = "connected" if mongodb.client else "disconnected"
+    db_status = "connected" if storage.is_connected else "disconnected"
     
     return {
         "status": "healthy", 
         "model_status": model_status,
+        "database_backend": storage.name,
         "database_status": db_status,
+        "database": storage.status(),
+        "live_stream": live_feed.stats(),
         "timestamp": datetime.now().isoformat()
     }
 
@@ -347,11 +427,12 @@ async def predict_churn(input_data: PredictionInput):
             "customer_name": input_data.customer_name,
             "timestamp": timestamp,
             "created_at": datetime.now(),
+            "model_version": model_version,
             **prediction_result
         }
         
         # Sauvegarder dans MongoDB
-        await mongodb.save_prediction(prediction_data)
+        await storage.save_prediction(prediction_data)
         
         # Sauvegarder aussi le client si provided
         if input_data.customer_id or input_data.customer_name:
@@ -360,7 +441,7 @@ async def predict_churn(input_data: PredictionInput):
                 "name": input_data.customer_name,
                 **input_data.dict()
             }
-            await mongodb.save_customer(customer_data)
+            await storage.save_customer(customer_data)
         
         return PredictionResponse(
             prediction_id=prediction_id,
@@ -376,23 +457,24 @@ async def batch_predict(batch_input: BatchPredictionInput):
     try:
         batch_id = str(uuid.uuid4())
         predictions = []
+        rows = []
         churn_count = 0
         
-        for customer in batch_input.customers:
-            prediction_result = predict_churn_advanced(customer)
+        # Scoring vectorisé du lot complet, prédictions sauvegardées en une seule écriture
+        results = predict_churn_vectorized([customer.dict() for customer in batch_input.customers])
+        for customer, prediction_result in zip(batch_input.customers, results):
             prediction_id = str(uuid.uuid4())
             timestamp = datetime.now().isoformat()
             
-            # Sauvegarder chaque prédiction
-            prediction_data = {
+            rows.append({
                 "prediction_id": prediction_id,
                 "customer_id": customer.customer_id,
                 "customer_name": customer.customer_name,
                 "timestamp": timestamp,
                 "created_at": datetime.now(),
+                "model_version": model_version,
                 **prediction_result
-            }
-            await mongodb.save_prediction(prediction_data)
+            })
             
             # Sauvegarder le client
             if customer.customer_id or customer.customer_name:
@@ -401,7 +483,7 @@ async def batch_predict(batch_input: BatchPredictionInput):
                     "name": customer.customer_name,
                     **customer.dict()
                 }
-                await mongodb.save_customer(customer_data)
+                await storage.save_customer(customer_data)
             
             prediction_response = PredictionResponse(
                 prediction_id=prediction_id,
@@ -414,6 +496,8 @@ async def batch_predict(batch_input: BatchPredictionInput):
             if prediction_result['prediction'] == 1:
                 churn_count += 1
         
+        await storage.save_predictions(rows)
+        
         summary = {
             "total_customers": len(batch_input.customers),
             "churn_count": churn_count,
@@ -429,66 +513,107 @@ async def batch_predict(batch_input: BatchPredictionInput):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/model/metrics", response_model=ModelMetricsResponse)
-async def get_model_metrics():
+async def score_stored_customers(customer_ids: List[str]):
+    """Charger les features stockées des clients (une requête $in) et les scorer en une passe vectorisée"""
+    features_by_id = await storage.get_customer_features(customer_ids)
+    found_ids = [customer_id for customer_id in dict.fromkeys(customer_ids) if customer_id in features_by_id]
+    results = predict_churn_vectorized([features_by_id[customer_id] for customer_id in found_ids])
+    
+    predictions = []
+    rows = []
+    for customer_id, prediction_result in zip(found_ids, results):
+        prediction_id = str(uuid.uuid4())
+        timestamp = datetime.now().isoformat()
+        rows.append({
+            "prediction_id": prediction_id,
+            "customer_id": customer_id,
+            "customer_name": features_by_id[customer_id].get("name"),
+            "timestamp": timestamp,
+            "created_at": datetime.now(),
+            "model_version": model_version,
+            **prediction_result
+        })
+        predictions.append(PredictionResponse(
+            prediction_id=prediction_id,
+            customer_id=customer_id,
+            timestamp=timestamp,
+            **prediction_result
+        ))
+    
+    # Une seule écriture pour le lot (insert groupé + rollups agrégés)
+    await storage.save_predictions(rows)
+    
+    missing_ids = [customer_id for customer_id in customer_ids if customer_id not in features_by_id]
+    return predictions, missing_ids
+
+@app.post("/predict/by-id", response_model=PredictionResponse)
+async def predict_churn_by_id(input_data: PredictionByIdInput):
+    """Prédiction à partir des dernières features stockées d'un client"""
+    predictions, missing_ids = await score_stored_customers([input_data.customer_id])
+    if missing_ids:
+        raise HTTPException(status_code=404, detail=f"Client introuvable: {input_data.customer_id}")
+    return predictions[0]
+
+@app.post("/predict/by-id/batch", response_model=BatchPredictionResponse)
+async def batch_predict_by_id(batch_input: BatchPredictionByIdInput):
+    """Prédictions par lot à partir d'une liste de customer_id"""
     try:
-        # Essayer de récupérer depuis MongoDB d'abord
-        db_metrics = await mongodb.get_latest_model_metrics()
-        if db_metrics:
-            return ModelMetricsResponse(
-                model_version=db_metrics.get('model_version', '3.0.0'),
-                training_date=db_metrics.get('training_date', datetime.now().strftime('%Y-%m-%d')),
-                accuracy=db_metrics.get('accuracy', 0.85),
-                precision=db_metrics.get('precision', 0.82),
-                recall=db_metrics.get('recall', 0.80),
-                f1_score=db_metrics.get('f1_score', 0.81),
-                feature_importance=db_metrics.get('feature_importance', {}),
-                confusion_matrix={
-                    "true_positive": [45],
-                    "false_positive": [10],
-                    "false_negative": [12],
-                    "true_negative": [133]
-                }
-            )
+        predictions, missing_ids = await score_stored_customers(batch_input.customer_ids)
+        churn_count = sum(1 for p in predictions if p.prediction == 1)
         
-        # Fallback vers les métriques en mémoire
-        if not model_metrics:
-            return ModelMetricsResponse(
-                model_version="3.0.0",
-                training_date=datetime.now().strftime('%Y-%m-%d'),
-                accuracy=0.85,
-                precision=0.82,
-                recall=0.80,
-                f1_score=0.81,
-                feature_importance={
-                    "customer_service_calls": 0.25,
-                    "international_plan": 0.18,
-                    "total_day_minutes": 0.15,
-                    "total_day_charge": 0.12,
-                    "account_length": 0.10
-                },
-                confusion_matrix={
-                    "true_positive": [45],
-                    "false_positive": [10],
-                    "false_negative": [12],
-                    "true_negative": [133]
-                }
-            )
+        summary = {
+            "total_customers": len(predictions),
+            "churn_count": churn_count,
+            "churn_rate": churn_count / len(predictions) if predictions else 0,
+            "avg_confidence": float(np.mean([p.confidence for p in predictions])) if predictions else 0,
+            "missing_customer_ids": missing_ids
+        }
         
+        return BatchPredictionResponse(
+            batch_id=str(uuid.uuid4()),
+            predictions=predictions,
+            summary=summary
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def metrics_response(metrics: Dict[str, Any]) -> ModelMetricsResponse:
+    """Réponse /model/metrics à partir d'une évaluation holdout stockée"""
+    return ModelMetricsResponse(
+        model_version=metrics.get('model_version', model_version),
+        evaluation_status="evaluated",
+        artifact=metrics.get('artifact'),
+        holdout_source=(metrics.get('holdout') or {}).get('source'),
+        training_date=metrics.get('training_date'),
+        accuracy=metrics['accuracy'],
+        precision=metrics['precision'],
+        recall=metrics['recall'],
+        f1_score=metrics['f1_score'],
+        feature_importance=metrics.get('feature_importance', {}),
+        confusion_matrix=metrics['confusion_matrix'],
+        auc_score=metrics.get('auc_score'),
+        evaluated_rows=metrics.get('rows'),
+        latency=metrics.get('latency')
+    )
+
+@app.get("/model/metrics", response_model=ModelMetricsResponse)
+async def get_model_metrics():
+    try:
+        # Évaluation holdout de la version servie (calculée au chargement, jamais à la requête)
+        if model_metrics:
+            return metrics_response(model_metrics)
+        
+        # Évaluation en cours : la dernière évaluation enregistrée pour cette même version et ce même artefact fait foi
+        if model is not None:
+            db_metrics = await storage.get_latest_model_metrics()
+            if (db_metrics and db_metrics.get('model_version') == model_version
+                    and db_metrics.get('artifact') == served_artifact and 'confusion_matrix' in db_metrics):
+                return metrics_response(db_metrics)
+        
+        # Aucune évaluation disponible : état explicite, sans métriques
         return ModelMetricsResponse(
-            model_version=model_metrics.get('model_version', '3.0.0'),
-            training_date=model_metrics.get('training_date', datetime.now().strftime('%Y-%m-%d')),
-            accuracy=model_metrics.get('accuracy', 0.85),
-            precision=model_metrics.get('precision', 0.82),
-            recall=model_metrics.get('recall', 0.80),
-            f1_score=model_metrics.get('f1_score', 0.81),
-            feature_importance=model_metrics.get('feature_importance', {}),
-            confusion_matrix={
-                "true_positive": [45],
-                "false_positive": [10],
-                "false_negative": [12],
-                "true_negative": [133]
-            }
+            model_version=model_version,
+            evaluation_status=model_evaluation_status if model is not None else "not_evaluated"
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur récupération métriques: {str(e)}")
@@ -498,7 +623,7 @@ async def get_analytics_dashboard():
     """Endpoint pour les données du tableau de bord analytique depuis MongoDB"""
     try:
         # Récupérer toutes les données depuis MongoDB
-        total_predictions = await mongodb.get_predictions_count()
+        total_predictions = await storage.get_predictions_count()
         
         # Si pas de données, retourner des valeurs par défaut
         if total_predictions == 0:
@@ -511,11 +636,11 @@ async def get_analytics_dashboard():
                 hourly_distribution={str(i): 0 for i in range(24)}
             )
         
-        churn_count = await mongodb.get_churn_count()
-        predictions_today = await mongodb.get_predictions_today()
-        high_risk_customers = await mongodb.get_high_risk_count()
-        avg_confidence = await mongodb.get_avg_confidence()
-        hourly_distribution = await mongodb.get_hourly_distribution()
+        churn_count = await storage.get_churn_count()
+        predictions_today = await storage.get_predictions_today()
+        high_risk_customers = await storage.get_high_risk_count()
+        avg_confidence = await storage.get_avg_confidence()
+        hourly_distribution = await storage.get_hourly_distribution()
         
         churn_rate = churn_count / total_predictions if total_predictions > 0 else 0
         
@@ -540,186 +665,156 @@ async def get_analytics_dashboard():
             hourly_distribution={str(i): 0 for i in range(24)}
         )
     
+@app.get("/analytics/trends", response_model=TrendsResponse)
+async def get_analytics_trends(start: Optional[str] = None, end: Optional[str] = None, granularity: str = "day"):
+    """Tendances de churn sur une période arbitraire, servies depuis les rollups"""
+    if granularity not in TREND_GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"Granularité invalide: {granularity} (attendu: {', '.join(TREND_GRANULARITIES)})")
+    
+    try:
+        end_date = datetime.fromisoformat(end) if end else datetime.now()
+        start_date = datetime.fromisoformat(start) if start else end_date - timedelta(days=30)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Date invalide: {str(e)}")
+    
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="La date de début doit précéder la date de fin")
+    if granularity == "hour" and end_date - start_date > timedelta(days=92):
+        raise HTTPException(status_code=400, detail="Période trop longue pour une granularité horaire (max 92 jours)")
+    
+    points = await storage.get_trends(start_date, end_date, granularity)
+    
+    return TrendsResponse(
+        granularity=granularity,
+        start=start_date.isoformat(),
+        end=end_date.isoformat(),
+        points=[TrendPoint(**point) for point in points]
+    )
+
+@app.get("/analytics/stream")
+async def stream_analytics():
+    """Flux SSE des deltas du tableau de bord (nouvelles prédictions, distribution horaire, clients à haut risque)"""
+    return StreamingResponse(
+        live_feed.stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/predictions/history", response_model=PredictionHistoryResponse)
 async def get_prediction_history(limit: int = 50, offset: int = 0):
     """Endpoint pour récupérer l'historique des prédictions depuis MongoDB"""
     try:
-        predictions = await mongodb.get_predictions(limit, offset)
-        total_count = await mongodb.get_predictions_count()
-        
-        # Convertir le format MongoDB en format de réponse
-        formatted_predictions = []
-        for pred in predictions:
-            formatted_pred = PredictionResponse(
-                prediction_id=pred.get("prediction_id", ""),
-                customer_id=pred.get("customer_id"),
-                timestamp=pred.get("timestamp", ""),
-                churn_probability=pred.get("churn_probability", 0),
-                prediction=pred.get("prediction", 0),
-                confidence=pred.get("confidence", 0),
-                risk_level=pred.get("risk_level", "LOW"),
-                message=pred.get("message", ""),
-                feature_importance=pred.get("feature_importance")
-            )
-            formatted_predictions.append(formatted_pred)
-        
-        return PredictionHistoryResponse(
-            predictions=formatted_predictions,
-            total_count=total_count,
-            has_more=(offset + limit) < total_count
-        )
+        predictions = await storage.get_predictions(limit, offset)
+        total_count = await storage.get_predictions_count()
+        
+        # Les documents sont déjà décodés dans la forme PredictionResponse : pas de re-validation
+        # Pydantic, sérialisation directe avec orjson (le schéma OpenAPI reste celui du response_model)
+        return ORJSONResponse({
+            "predictions": predictions,
+            "total_count": total_count,
+            "has_more": (offset + limit) < total_count
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur récupération historique: {str(e)}")
 
+@app.get("/predictions/export")
+async def export_predictions(start: str, end: Optional[str] = None, risk_level: Optional[str] = None,
+                             format: str = "ndjson", batch_size: int = 5000):
+    """Export en streaming des prédictions d'une période (NDJSON, CSV ou Parquet), sans troncature"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format invalide: {format} (attendu: {', '.join(EXPORT_FORMATS)})")
+    if format == "parquet" and not PARQUET_AVAILABLE:
+        raise HTTPException(status_code=400, detail="Export Parquet indisponible: pyarrow non installé")
+    if risk_level and risk_level not in RISK_LEVELS:
+        raise HTTPException(status_code=400, detail=f"Niveau de risque invalide: {risk_level}")
+    
+    try:
+        start_date = datetime.fromisoformat(start)
+        end_date = datetime.fromisoformat(end) if end else datetime.now()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Date invalide: {str(e)}")
+    
+    batches = storage.iter_predictions(start_date, end_date, risk_level, batch_size=min(max(batch_size, 100), 50000))
+    filename = f"predictions_{start_date.date()}_{end_date.date()}.{format}"
+    
+    return StreamingResponse(
+        stream_export(batches, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @app.get("/customers", response_model=List[CustomerResponse])
 async def get_customers(limit: int = 50):
     """Récupérer la liste des clients depuis MongoDB"""
     try:
-        customers = await mongodb.get_customers(limit)
-        
-        formatted_customers = []
-        for customer in customers:
-            formatted_customer = CustomerResponse(
-                id=customer.get("_id", ""),
-                name=customer.get("name"),
-                email=customer.get("email"),
-                phone=customer.get("phone"),
-                signup_date=customer.get("signup_date"),
-                account_length=customer.get("account_length", 0),
-                international_plan=customer.get("international_plan", 0),
-                voice_mail_plan=customer.get("voice_mail_plan", 0),
-                number_vmail_messages=customer.get("number_vmail_messages", 0),
-                total_day_minutes=customer.get("total_day_minutes", 0),
-                total_day_calls=customer.get("total_day_calls", 0),
-                total_day_charge=customer.get("total_day_charge", 0),
-                total_eve_minutes=customer.get("total_eve_minutes", 0),
-                total_eve_calls=customer.get("total_eve_calls", 0),
-                total_eve_charge=customer.get("total_eve_charge", 0),
-                total_night_minutes=customer.get("total_night_minutes", 0),
-                total_night_calls=customer.get("total_night_calls", 0),
-                total_night_charge=customer.get("total_night_charge", 0),
-                total_intl_minutes=customer.get("total_intl_minutes", 0),
-                total_intl_calls=customer.get("total_intl_calls", 0),
-                total_intl_charge=customer.get("total_intl_charge", 0),
-                customer_service_calls=customer.get("customer_service_calls", 0),
-                customer_id=customer.get("customer_id"),
-                created_at=customer.get("created_at")
-            )
-            formatted_customers.append(formatted_customer)
+        customers = await storage.get_customers(limit)
         
-        return formatted_customers
+        # Les clients sont déjà projetés dans la forme CustomerResponse : sérialisation directe
+        return ORJSONResponse(customers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur récupération clients: {str(e)}")
 
 @app.post("/model/retrain")
-async def retrain_model(background_tasks: BackgroundTasks):
-    """Endpoint pour réentraîner le modèle en arrière-plan"""
-    background_tasks.add_task(train_and_save_model_advanced)
-    return {"message": "Réentraînement du modèle démarré en arrière-plan"}
-
-# Fonction d'entraînement avancée (identique à la version précédente)
-def train_and_save_model_advanced():
-    """Fonction d'entraînement du modèle avec des fonctionnalités avancées"""
-    print("🔮 Démarrage de l'entraînement du modèle avancé...")
-    
-    try:
-        # Charger les données
-        data = pd.read_csv('churn-bigml-80.csv')
-        
-        # Feature engineering avancé
-        data['Total minutes'] = data['Total day minutes'] + data['Total eve minutes'] + data['Total night minutes']
-        data['Total calls'] = data['Total day calls'] + data['Total eve calls'] + data['Total night calls']
-        data['Avg call duration'] = data['Total minutes'] / data['Total calls']
-        data['Service call ratio'] = data['Customer service calls'] / data['Total calls']
-        
-        # Encoder les variables catégorielles
-        encoder = LabelEncoder()
-        categorical_columns = ['International plan', 'Voice mail plan']
-        for col in categorical_columns:
-            if col in data.columns and data[col].dtype == 'object':
-                data[col] = encoder.fit_transform(data[col])
-        
-        # Préparer les features
-        features_to_drop = ['Churn', 'State'] if 'State' in data.columns else ['Churn']
-        X = data.drop(columns=features_to_drop, errors='ignore')
-        y = data['Churn']
-        
-        # Split des données
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
-        
-        # Standardisation
-        scaler = StandardScaler()
-        X_train_scaled = scaler.fit_transform(X_train)
-        X_test_scaled = scaler.transform(X_test)
-        
-        # Entraînement de multiple modèles
-        models = {
-            'Random Forest': RandomForestClassifier(n_estimators=200, random_state=42, max_depth=15),
-            'Gradient Boosting': GradientBoostingClassifier(n_estimators=100, random_state=42)
-        }
-        
-        best_model = None
-        best_score = 0
-        model_results = {}
-        
-        for name, model in models.items():
-            print(f"🏋️  Entraînement du modèle: {name}")
-            
-            # Validation croisée
-            cv_scores = cross_val_score(model, X_train_scaled, y_train, cv=5, scoring='accuracy')
-            
-            # Entraînement final
-            model.fit(X_train_scaled, y_train)
-            
-            # Prédictions
-            y_pred = model.predict(X_test_scaled)
-            y_pred_proba = model.predict_proba(X_test_scaled)[:, 1]
-            
-            # Métriques
-            accuracy = accuracy_score(y_test, y_pred)
-            auc_score = roc_auc_score(y_test, y_pred_proba)
-            
-            model_results[name] = {
-                'cv_mean': cv_scores.mean(),
-                'cv_std': cv_scores.std(),
-                'accuracy': accuracy,
-                'auc_score': auc_score,
-                'feature_importance': dict(zip(X.columns, model.feature_importances_)) if hasattr(model, 'feature_importances_') else {}
-            }
-            
-            print(f"📊 {name} - Accuracy: {accuracy:.3f}, AUC: {auc_score:.3f}")
-            
-            if auc_score > best_score:
-                best_score = auc_score
-                best_model = model
-        
-        # Sauvegarde du meilleur modèle
-        os.makedirs('app/models', exist_ok=True)
-        
-        joblib.dump(best_model, 'app/models/best_churn_model.pkl')
-        joblib.dump(scaler, 'app/models/scaler.pkl')
-        joblib.dump(X.columns.tolist(), 'app/models/feature_names.pkl')
-        
-        # Sauvegarde des métriques
-        metrics = {
-            'training_date': datetime.now().isoformat(),
-            'best_model': 'Random Forest' if isinstance(best_model, RandomForestClassifier) else 'Gradient Boosting',
-            'best_auc_score': best_score,
-            'model_comparison': model_results,
-            'feature_names': X.columns.tolist()
-        }
-        
-        with open('app/models/training_metrics.json', 'w') as f:
-            json.dump(metrics, f, indent=2)
-        
-        print("✅ Entraînement avancé terminé!")
-        print(f"🎯 Meilleur modèle: AUC = {best_score:.3f}")
-        
-        # Recharger le modèle
-        load_model()
-        
-    except Exception as e:
-        print(f"❌ Erreur lors de l'entraînement: {e}")
+async def retrain_model(mode: str = "full"):
+    """Endpoint pour réentraîner le modèle en arrière-plan (un seul entraînement à la fois).
+    mode=incremental ajoute des arbres / étapes de boosting entraînés sur les nouvelles données labellisées ;
+    mode=out_of_core entraîne en flux des modèles partial_fit sur un fichier plus grand que la mémoire."""
+    if mode not in TRAINING_MODES:
+        raise HTTPException(status_code=400, detail=f"Mode invalide. Valeurs possibles: {', '.join(TRAINING_MODES)}")
+    if mode == "incremental" and current_model_version() is None:
+        raise HTTPException(status_code=409, detail=INCREMENTAL_REQUIRES_VERSION)
+    job = training_scheduler.request(mode)
+    if job is training_scheduler.running:
+        message = "Réentraînement du modèle démarré en arrière-plan"
+    else:
+        message = "Réentraînement déjà en cours : demande fusionnée dans le prochain entraînement"
+    return {"message": message, "job": job.to_dict()}
+
+@app.get("/model/retrain/status")
+async def retrain_status():
+    """Job en cours, job en attente et historique des entraînements"""
+    return training_scheduler.status()
+
+@app.get("/model/retrain/{job_id}")
+async def retrain_job_status(job_id: str):
+    """État et progression d'un job d'entraînement"""
+    job = training_scheduler.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job d'entraînement introuvable: {job_id}")
+    return job.to_dict()
+
+@app.delete("/model/retrain/{job_id}")
+async def cancel_retrain_job(job_id: str):
+    """Annuler un entraînement en attente ou en cours"""
+    job = training_scheduler.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Aucun job actif avec l'identifiant: {job_id}")
+    return {"message": "Annulation demandée", "job": job.to_dict()}
+
+@app.post("/model/rescore")
+async def rescore_portfolio():
+    """Re-scorer tous les clients avec le modèle courant"""
+    replaced = rescorer.start(storage, predict_churn_vectorized, model_version)
+    return {
+        "message": "Re-scoring du portefeuille démarré en arrière-plan",
+        "replaced_running_job": replaced,
+        "model_version": model_version
+    }
+
+@app.get("/model/rescore/status")
+async def rescore_status():
+    """Progression du re-scoring : clients traités, débit et temps restant estimé"""
+    return rescorer.status()
+
+async def reload_and_rescore(job: TrainingJob):
+    """Après un entraînement réussi : recharger le modèle puis re-scorer le portefeuille"""
+    previous_version = model_version
+    load_model()
+    # Un hit du cache de runs peut réactiver la version déjà servie : rien à re-scorer
+    if settings.RESCORE_ON_RETRAIN and model is not None and model_version != previous_version:
+        rescorer.start(storage, predict_churn_vectorized, model_version)
+
+training_scheduler = TrainingScheduler(train_in_worker, on_success=reload_and_rescore)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,26 @@
+"""Migration des documents de prédiction existants vers le schéma compact.
+
+Usage : python migrate_predictions.py [--batch-size 1000]
+"""
+import argparse
+import asyncio
+
+from database import mongodb
+
+async def migrate(batch_size: int):
+    await mongodb.connect()
+    try:
+        print("🔁 Migration des prédictions vers le schéma compact...")
+        migrated = await mongodb.migrate_to_compact_schema(batch_size)
+        print(f"✅ {migrated} prédictions migrées")
+        
+        # Les rollups sont recalculés à partir des champs compacts
+        await mongodb.rebuild_rollups()
+    finally:
+        await mongodb.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrer les prédictions vers le schéma compact")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(migrate(args.batch_size))
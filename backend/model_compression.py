@@ -0,0 +1,150 @@
+import copy
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.model_selection import train_test_split
+from sklearn.tree import DecisionTreeRegressor
+
+from config import settings
+from model_training import benchmark_inference
+
+def compression_settings() -> Dict[str, Any]:
+    """Paramètres de compression (entrent dans la clé du cache de runs)"""
+    return {
+        "enabled": settings.COMPRESSION_ENABLED,
+        "auc_tolerance": settings.COMPRESSION_AUC_TOLERANCE,
+        "distill_max_depth": settings.DISTILL_MAX_DEPTH,
+        "validation_size": settings.COMPRESSION_VALIDATION_SIZE
+    }
+
+class DistilledClassifier:
+    """Élève distillé : arbre de régression peu profond ajusté sur les probabilités du modèle enseignant,
+    exposé avec l'interface d'un classifieur (predict_proba / predict).
+
+    Picklé tel quel dans compressed_churn_model.pkl : le processus qui charge cet artefact doit pouvoir
+    importer `model_compression` (main.py l'importe explicitement pour cette raison)."""
+
+    def __init__(self, regressor: DecisionTreeRegressor):
+        self.regressor = regressor
+        self.classes_ = np.array([0, 1])
+
+    @property
+    def feature_importances_(self) -> np.ndarray:
+        return self.regressor.feature_importances_
+
+    def predict_proba(self, X) -> np.ndarray:
+        probabilities = np.clip(self.regressor.predict(X), 0.0, 1.0)
+        return np.column_stack([1.0 - probabilities, probabilities])
+
+    def predict(self, X) -> np.ndarray:
+        return (self.predict_proba(X)[:, 1] > 0.5).astype(np.int64)
+
+def select_tree_subset(model: RandomForestClassifier, X_val: np.ndarray, y_val: np.ndarray,
+                       tolerance: float) -> Tuple[RandomForestClassifier, List[Dict[str, Any]]]:
+    """Plus petit sous-ensemble d'arbres (sélection gloutonne) dont l'AUC de validation atteint
+    celle de la forêt complète à `tolerance` près"""
+    tree_probabilities = np.array([tree.predict_proba(X_val)[:, 1] for tree in model.estimators_])
+    target_auc = roc_auc_score(y_val, tree_probabilities.mean(axis=0)) - tolerance
+
+    selected: List[int] = []
+    remaining = set(range(len(model.estimators_)))
+    total = np.zeros(len(y_val))
+    trace = []
+    while remaining:
+        # Ajouter l'arbre qui améliore le plus l'AUC de la moyenne courante
+        index, auc = max(
+            ((index, roc_auc_score(y_val, (total + tree_probabilities[index]) / (len(selected) + 1))) for index in remaining),
+            key=lambda candidate: candidate[1]
+        )
+        selected.append(index)
+        remaining.remove(index)
+        total += tree_probabilities[index]
+        trace.append({"n_trees": len(selected), "validation_auc": float(auc)})
+        if auc >= target_auc:
+            break
+
+    compressed = copy.copy(model)
+    compressed.estimators_ = [model.estimators_[index] for index in selected]
+    compressed.n_estimators = len(selected)
+    return compressed, trace
+
+def distill(teacher, X_train: np.ndarray, max_depth: int) -> DistilledClassifier:
+    """Entraîner un arbre peu profond sur les probabilités (soft labels) du modèle enseignant"""
+    soft_labels = teacher.predict_proba(X_train)[:, 1]
+    regressor = DecisionTreeRegressor(max_depth=max_depth, min_samples_leaf=5, random_state=42)
+    return DistilledClassifier(regressor.fit(X_train, soft_labels))
+
+def fidelity_report(model, teacher_probabilities: np.ndarray, teacher_auc: float,
+                    X_eval: np.ndarray, y_eval: np.ndarray) -> Dict[str, Any]:
+    """Qualité, fidélité à l'enseignant et coût d'inférence d'un modèle compressé (holdout, rapport seulement)"""
+    probabilities = model.predict_proba(X_eval)[:, 1]
+    auc = roc_auc_score(y_eval, probabilities)
+    return {
+        'auc_score': auc,
+        'auc_drop': teacher_auc - auc,
+        'accuracy': accuracy_score(y_eval, probabilities > 0.5),
+        'agreement': float(np.mean((probabilities > 0.5) == (teacher_probabilities > 0.5))),
+        'mean_abs_probability_diff': float(np.mean(np.abs(probabilities - teacher_probabilities))),
+        **benchmark_inference(model, X_eval)
+    }
+
+def compress_model(teacher, X_train: np.ndarray, y_train: np.ndarray,
+                   X_test: np.ndarray, y_test: np.ndarray) -> Tuple[Optional[Any], Dict[str, Any]]:
+    """Compresser le modèle retenu (sous-ensemble d'arbres pour une forêt, distillation pour tous).
+
+    Le holdout a déjà servi à choisir l'enseignant : tous les choix de compression (arbres gardés,
+    artefact retenu) se font sur une validation prise dans les données d'entraînement. Comme
+    l'enseignant a vu ces lignes, une copie de l'enseignant est réentraînée sans elles et les
+    candidats sont construits à partir de cette copie. Le holdout ne sert qu'au rapport de fidélité.
+    Retourne l'artefact le plus léger dont la perte d'AUC de validation reste dans la tolérance
+    (ou None) et le rapport."""
+    tolerance = settings.COMPRESSION_AUC_TOLERANCE
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        X_train, y_train, test_size=settings.COMPRESSION_VALIDATION_SIZE, random_state=42, stratify=y_train
+    )
+    reference = clone(teacher).fit(X_fit, y_fit)
+    reference_val_auc = roc_auc_score(y_val, reference.predict_proba(X_val)[:, 1])
+
+    teacher_probabilities = teacher.predict_proba(X_test)[:, 1]
+    teacher_auc = roc_auc_score(y_test, teacher_probabilities)
+    teacher_cost = benchmark_inference(teacher, X_test)
+
+    compressed_models = {}
+    report: Dict[str, Any] = {
+        'settings': compression_settings(),
+        'teacher': {'auc_score': teacher_auc, **teacher_cost},
+        'validation': {'rows': len(y_val), 'reference_auc': reference_val_auc},
+        'candidates': {}
+    }
+
+    if isinstance(reference, RandomForestClassifier):
+        subset, trace = select_tree_subset(reference, X_val, y_val, tolerance)
+        compressed_models['tree_subset'] = subset
+        report['tree_subset_trace'] = trace
+
+    compressed_models['distilled'] = distill(reference, X_fit, settings.DISTILL_MAX_DEPTH)
+
+    for name, model in compressed_models.items():
+        validation_auc = roc_auc_score(y_val, model.predict_proba(X_val)[:, 1])
+        fidelity = fidelity_report(model, teacher_probabilities, teacher_auc, X_test, y_test)
+        fidelity['validation_auc'] = validation_auc
+        fidelity['validation_auc_drop'] = reference_val_auc - validation_auc
+        fidelity['within_tolerance'] = fidelity['validation_auc_drop'] <= tolerance
+        fidelity['size_ratio'] = fidelity['model_size_bytes'] / teacher_cost['model_size_bytes']
+        fidelity['p99_speedup'] = (teacher_cost['single_row_p99_latency_ms'] / fidelity['single_row_p99_latency_ms']
+                                   if fidelity['single_row_p99_latency_ms'] > 0 else None)
+        report['candidates'][name] = fidelity
+        print(f"🗜️  {name}: AUC validation {validation_auc:.3f} (écart {fidelity['validation_auc_drop']:+.4f}), "
+              f"holdout {fidelity['auc_score']:.3f}, taille x{fidelity['size_ratio']:.3f}, accord {fidelity['agreement']:.1%}")
+
+    # Artefact retenu : le plus léger parmi ceux qui restent dans la tolérance (sur la validation)
+    eligible = [name for name, fidelity in report['candidates'].items() if fidelity['within_tolerance']]
+    selected = min(eligible, key=lambda name: report['candidates'][name]['model_size_bytes']) if eligible else None
+    report['selected'] = selected
+    if selected is None:
+        print("⚠️  Aucun modèle compressé ne reste dans la tolérance d'AUC")
+        return None, report
+    return compressed_models[selected], report
@@ -0,0 +1,176 @@
+import os
+import pickle
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.model_selection import StratifiedKFold
+
+from config import settings
+
+def parallelism_budget(n_jobs: Optional[int] = None) -> int:
+    """Nombre de processus d'entraînement : TRAINING_N_JOBS, borné aux CPU réellement disponibles"""
+    if hasattr(os, "sched_getaffinity"):
+        available = len(os.sched_getaffinity(0))
+    else:
+        available = os.cpu_count() or 1
+    n_jobs = n_jobs if n_jobs is not None else settings.TRAINING_N_JOBS
+    if n_jobs is None or n_jobs <= 0:
+        return available
+    return min(n_jobs, available)
+
+def _fit_fold(estimator, X: np.ndarray, y: np.ndarray, train_index: np.ndarray, val_index: np.ndarray) -> float:
+    model = clone(estimator).fit(X[train_index], y[train_index])
+    return accuracy_score(y[val_index], model.predict(X[val_index]))
+
+def _fit_final(estimator, X: np.ndarray, y: np.ndarray):
+    started = time.perf_counter()
+    model = clone(estimator).fit(X, y)
+    return model, time.perf_counter() - started
+
+def _loaded_memory_bytes(serialized: bytes) -> int:
+    """Mémoire allouée pour charger le modèle (pic tracemalloc pendant la désérialisation)"""
+    tracemalloc.start()
+    try:
+        pickle.loads(serialized)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+def benchmark_inference(model, X: np.ndarray, single_row_calls: int = 200, batch_repeats: int = 5) -> Dict[str, float]:
+    """Taille sérialisée, mémoire et latences d'inférence (une ligne à la fois et lot complet)"""
+    single_row_latencies = []
+    for index in range(min(single_row_calls, len(X))):
+        started = time.perf_counter()
+        model.predict_proba(X[index:index + 1])
+        single_row_latencies.append(time.perf_counter() - started)
+
+    batch_latencies = []
+    for _ in range(batch_repeats):
+        started = time.perf_counter()
+        model.predict_proba(X)
+        batch_latencies.append(time.perf_counter() - started)
+    batch_latency = float(np.median(batch_latencies))
+
+    serialized = pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)
+    return {
+        'model_size_bytes': len(serialized),
+        'memory_bytes': _loaded_memory_bytes(serialized),
+        'single_row_latency_ms': float(np.median(single_row_latencies)) * 1000,
+        'single_row_p99_latency_ms': float(np.percentile(single_row_latencies, 99)) * 1000,
+        'batch_size': len(X),
+        'batch_latency_ms': batch_latency * 1000,
+        'batch_rows_per_second': len(X) / batch_latency if batch_latency > 0 else 0.0
+    }
+
+def train_candidates(candidates: Dict[str, Any], X_train, y_train, X_test, y_test,
+                     feature_columns: List[str], cv: int = 5,
+                     n_jobs: Optional[int] = None) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Any]]:
+    """Validation croisée et entraînement final de tous les candidats sur un pool de processus.
+    Chaque pli de CV et chaque fit final est une tâche indépendante : les candidats et les plis
+    s'exécutent en même temps, dans la limite du budget de parallélisme."""
+    X_train, y_train = np.asarray(X_train), np.asarray(y_train)
+    X_test, y_test = np.asarray(X_test), np.asarray(y_test)
+    folds = list(StratifiedKFold(n_splits=cv).split(X_train, y_train))
+    names = list(candidates)
+
+    tasks = []
+    for name in names:
+        tasks.extend(delayed(_fit_fold)(candidates[name], X_train, y_train, train_index, val_index)
+                     for train_index, val_index in folds)
+        tasks.append(delayed(_fit_final)(candidates[name], X_train, y_train))
+
+    budget = parallelism_budget(n_jobs)
+    print(f"⚙️  {len(tasks)} tâches d'entraînement ({len(names)} modèles x {cv} plis + fits finaux) sur {budget} processus")
+    outputs = Parallel(n_jobs=min(budget, len(tasks)), backend="loky")(tasks)
+
+    model_results = {}
+    fitted_models = {}
+    for position, name in enumerate(names):
+        task_outputs = outputs[position * (cv + 1):(position + 1) * (cv + 1)]
+        cv_scores = np.array(task_outputs[:cv])
+        model, train_time = task_outputs[cv]
+
+        # Prédictions
+        y_pred = model.predict(X_test)
+        y_pred_proba = model.predict_proba(X_test)[:, 1]
+
+        # Métriques
+        accuracy = accuracy_score(y_test, y_pred)
+        auc_score = roc_auc_score(y_test, y_pred_proba)
+
+        model_results[name] = {
+            'cv_mean': cv_scores.mean(),
+            'cv_std': cv_scores.std(),
+            'accuracy': accuracy,
+            'auc_score': auc_score,
+            'train_time_seconds': train_time,
+            **benchmark_inference(model, X_test),
+            'feature_importance': dict(zip(feature_columns, model.feature_importances_)) if hasattr(model, 'feature_importances_') else {}
+        }
+        fitted_models[name] = model
+
+        print(f"📊 {name} - Accuracy: {accuracy:.3f}, AUC: {auc_score:.3f}, "
+              f"fit {train_time:.2f}s, 1 ligne {model_results[name]['single_row_latency_ms']:.2f}ms")
+
+    return model_results, fitted_models
+
+# --- Sélection sous contraintes de latence et de taille ---
+
+def selection_budgets() -> Dict[str, float]:
+    """Budgets de latence p99, taille sérialisée et mémoire chargée (SELECTION_*)"""
+    return {
+        'max_p99_latency_ms': settings.SELECTION_MAX_P99_LATENCY_MS,
+        'max_model_size_mb': settings.SELECTION_MAX_MODEL_SIZE_MB,
+        'max_memory_mb': settings.SELECTION_MAX_MEMORY_MB
+    }
+
+def budget_violations(result: Dict[str, Any], budgets: Dict[str, float]) -> List[str]:
+    """Budgets dépassés par un candidat (les mesures absentes ne sont pas contraintes)"""
+    checks = [
+        ('single_row_p99_latency_ms', 1, 'max_p99_latency_ms'),
+        ('model_size_bytes', 1024 * 1024, 'max_model_size_mb'),
+        ('memory_bytes', 1024 * 1024, 'max_memory_mb')
+    ]
+    violations = []
+    for metric, unit, budget in checks:
+        if budgets.get(budget) and metric in result and result[metric] / unit > budgets[budget]:
+            violations.append(budget)
+    return violations
+
+def tradeoff_table(model_results: Dict[str, Dict[str, Any]], selected: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Tableau qualité / coût de tous les candidats, trié par AUC"""
+    budgets = selection_budgets()
+    rows = []
+    for name, result in model_results.items():
+        violations = budget_violations(result, budgets)
+        rows.append({
+            'model': name,
+            'auc_score': result.get('auc_score'),
+            'accuracy': result.get('accuracy'),
+            'single_row_p50_ms': result.get('single_row_latency_ms'),
+            'single_row_p99_ms': result.get('single_row_p99_latency_ms'),
+            'batch_rows_per_second': result.get('batch_rows_per_second'),
+            'model_size_bytes': result.get('model_size_bytes'),
+            'memory_bytes': result.get('memory_bytes'),
+            'train_time_seconds': result.get('train_time_seconds'),
+            'within_budget': not violations,
+            'budget_violations': violations,
+            'selected': name == selected
+        })
+    return sorted(rows, key=lambda row: row['auc_score'] or 0.0, reverse=True)
+
+def select_best_model(model_results: Dict[str, Dict[str, Any]]) -> str:
+    """Meilleur AUC parmi les candidats qui respectent les budgets de latence, taille et mémoire.
+    Si aucun ne les respecte, le meilleur AUC global est retenu (signalé dans le tableau)."""
+    budgets = selection_budgets()
+    eligible = [name for name, result in model_results.items() if not budget_violations(result, budgets)]
+    if not eligible:
+        print("⚠️  Aucun candidat ne respecte les budgets de latence / taille : sélection sur l'AUC seul")
+        eligible = list(model_results)
+    return max(eligible, key=lambda name: model_results[name]['auc_score'])
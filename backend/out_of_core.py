@@ -0,0 +1,227 @@
+import os
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+from sklearn.naive_bayes import GaussianNB
+from sklearn.preprocessing import StandardScaler
+
+from config import settings
+from training_pipeline import (
+    CATEGORICAL_COLUMNS, DROPPED_COLUMNS, TARGET_COLUMN,
+    collinear_features_from_covariance, encode_categorical, engineer_features
+)
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+# Types explicites : pas d'inférence par chunk (types incohérents entre chunks, objets coûteux en mémoire)
+TRAINING_DTYPES = {
+    'State': 'category',
+    'Account length': 'int32',
+    'Area code': 'int32',
+    'International plan': 'category',
+    'Voice mail plan': 'category',
+    'Number vmail messages': 'int32',
+    'Total day minutes': 'float32',
+    'Total day calls': 'int32',
+    'Total day charge': 'float32',
+    'Total eve minutes': 'float32',
+    'Total eve calls': 'int32',
+    'Total eve charge': 'float32',
+    'Total night minutes': 'float32',
+    'Total night calls': 'int32',
+    'Total night charge': 'float32',
+    'Total intl minutes': 'float32',
+    'Total intl calls': 'int32',
+    'Total intl charge': 'float32',
+    'Customer service calls': 'int32',
+    'Churn': 'bool'
+}
+
+# Nombre d'intervalles de l'histogramme des probabilités pour l'AUC en flux
+AUC_BINS = 10000
+
+def out_of_core_candidates() -> Dict[str, Tuple[Any, int]]:
+    """Modèles supportant partial_fit, avec leur nombre de passes sur les données"""
+    return {
+        'SGD Logistic Regression': (SGDClassifier(loss='log_loss', alpha=1e-4, random_state=42), settings.OUT_OF_CORE_EPOCHS),
+        # Naive Bayes accumule des statistiques exactes : une seule passe
+        'Gaussian Naive Bayes': (GaussianNB(), 1)
+    }
+
+class ChunkedDataset:
+    """Lecture en flux d'un fichier CSV ou Parquet, encodé et découpé en train/holdout chunk par chunk"""
+
+    def __init__(self, path: str, chunk_rows: int, test_size: float = 0.2, random_state: int = 42):
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.test_size = test_size
+        self.random_state = random_state
+        self.feature_names: Optional[List[str]] = None
+        # Colonnes retenues par l'étape de réduction (toutes tant que select() n'a pas été appelé)
+        self.columns: Optional[List[int]] = None
+
+    def select(self, columns: List[int]):
+        """Restreindre les chunks suivants aux colonnes retenues"""
+        self.feature_names = [self.feature_names[index] for index in columns]
+        self.columns = columns
+
+    def _frames(self) -> Iterator[pd.DataFrame]:
+        if self.path.endswith(".parquet"):
+            if pq is None:
+                raise RuntimeError("pyarrow est requis pour l'entraînement sur Parquet")
+            for batch in pq.ParquetFile(self.path).iter_batches(batch_size=self.chunk_rows):
+                yield batch.to_pandas()
+        else:
+            yield from pd.read_csv(self.path, dtype=TRAINING_DTYPES, chunksize=self.chunk_rows)
+
+    def chunks(self) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Chunks (X, y, masque holdout) ; le masque est déterministe, identique à chaque passe"""
+        for index, frame in enumerate(self._frames()):
+            table = {column: frame[column] for column in frame.columns}
+            table = engineer_features(table)
+            for column in CATEGORICAL_COLUMNS:
+                if column in table:
+                    # Même codage que le pipeline en mémoire : libellés Yes/No ou codes 0/1, sinon erreur
+                    table[column] = encode_categorical(table[column], column)
+
+            feature_names = [column for column in table if column not in DROPPED_COLUMNS]
+            if self.feature_names is None:
+                self.feature_names = feature_names
+            X = np.column_stack([np.asarray(table[column], dtype=np.float64) for column in feature_names])
+            if self.columns is not None:
+                X = X[:, self.columns]
+            y = np.asarray(table[TARGET_COLUMN], dtype=np.int64)
+            holdout = np.random.default_rng([self.random_state, index]).random(len(y)) < self.test_size
+            yield X, y, holdout
+
+class StreamingBinaryMetrics:
+    """Accuracy et AUC calculées en flux (histogramme des probabilités, mémoire constante)"""
+
+    def __init__(self, bins: int = AUC_BINS):
+        self.bins = bins
+        self.positives = np.zeros(bins, dtype=np.int64)
+        self.negatives = np.zeros(bins, dtype=np.int64)
+        self.correct = 0
+        self.total = 0
+
+    def update(self, y_true: np.ndarray, probabilities: np.ndarray):
+        buckets = np.minimum((probabilities * self.bins).astype(np.int64), self.bins - 1)
+        self.positives += np.bincount(buckets[y_true == 1], minlength=self.bins)
+        self.negatives += np.bincount(buckets[y_true == 0], minlength=self.bins)
+        self.correct += int(np.sum((probabilities > 0.5) == (y_true == 1)))
+        self.total += len(y_true)
+
+    def accuracy(self) -> float:
+        return self.correct / self.total if self.total else 0.0
+
+    def auc(self) -> float:
+        n_positive, n_negative = self.positives.sum(), self.negatives.sum()
+        if n_positive == 0 or n_negative == 0:
+            return 0.0
+        # Paires (positif, négatif) correctement ordonnées ; ex-aequo d'un même intervalle comptés pour moitié
+        negatives_below = np.cumsum(self.negatives) - self.negatives
+        pairs = np.sum(self.positives * (negatives_below + 0.5 * self.negatives))
+        return float(pairs / (n_positive * n_negative))
+
+def _select_scaler(scaler: StandardScaler, columns: List[int]) -> StandardScaler:
+    """Scaler restreint aux colonnes retenues (statistiques déjà calculées, pas de nouvelle passe)"""
+    selected = StandardScaler()
+    selected.mean_ = scaler.mean_[columns]
+    selected.var_ = scaler.var_[columns]
+    selected.scale_ = scaler.scale_[columns]
+    selected.n_samples_seen_ = scaler.n_samples_seen_[columns] if np.ndim(scaler.n_samples_seen_) else scaler.n_samples_seen_
+    selected.n_features_in_ = len(columns)
+    return selected
+
+def train_out_of_core(data_path: str, report: Optional[Callable[[str, float], None]] = None) -> Dict[str, Any]:
+    """Entraîner les candidats partial_fit en flux : mémoire bornée par la taille d'un chunk"""
+    report = report or (lambda stage, progress: None)
+    dataset = ChunkedDataset(data_path, settings.OUT_OF_CORE_CHUNK_ROWS)
+    candidates = out_of_core_candidates()
+    total_passes = 2 + max(epochs for _, epochs in candidates.values())
+
+    # Passe 1 : statistiques du scaler (moyenne / variance incrémentales) et matrice de Gram des
+    # lignes complètes, pour l'étape de réduction
+    report("scaler_statistics", 0.05)
+    scaler = StandardScaler()
+    rows = train_rows = chunks = complete_rows = 0
+    gram = sums = None
+    for X, y, holdout in dataset.chunks():
+        if (~holdout).any():
+            scaler.partial_fit(X[~holdout])
+            X_complete = X[~holdout][np.isfinite(X[~holdout]).all(axis=1)]
+            gram = X_complete.T @ X_complete if gram is None else gram + X_complete.T @ X_complete
+            sums = X_complete.sum(axis=0) if sums is None else sums + X_complete.sum(axis=0)
+            complete_rows += len(X_complete)
+        rows += len(y)
+        train_rows += int((~holdout).sum())
+        chunks += 1
+    if train_rows == 0:
+        raise ValueError(f"Aucune ligne d'entraînement dans {data_path}")
+    print(f"📏 Scaler calculé en flux: {rows} lignes, {chunks} chunks")
+
+    # Réduction : mêmes features redondantes que l'étape reduce du pipeline en mémoire
+    mean = sums / complete_rows
+    covariance = gram / complete_rows - np.outer(mean, mean)
+    kept, dropped = collinear_features_from_covariance(covariance, dataset.feature_names, settings.FEATURE_COLLINEARITY_R2)
+    if dropped:
+        print(f"✂️  Features redondantes retirées: {', '.join(dropped)}")
+    dataset.select(kept)
+    scaler = _select_scaler(scaler, kept)
+
+    # Passes suivantes : partial_fit de chaque candidat sur les lignes d'entraînement
+    classes = np.array([0, 1])
+    train_times = {name: 0.0 for name in candidates}
+    max_epochs = max(epochs for _, epochs in candidates.values())
+    for epoch in range(max_epochs):
+        report(f"epoch_{epoch + 1}", 0.1 + 0.8 * epoch / total_passes)
+        for X, y, holdout in dataset.chunks():
+            X_train = scaler.transform(X[~holdout])
+            y_train = y[~holdout]
+            if len(y_train) == 0:
+                continue
+            for name, (model, epochs) in candidates.items():
+                if epoch < epochs:
+                    started = time.perf_counter()
+                    model.partial_fit(X_train, y_train, classes=classes)
+                    train_times[name] += time.perf_counter() - started
+
+    # Dernière passe : évaluation sur le holdout
+    report("evaluation", 0.9)
+    metrics = {name: StreamingBinaryMetrics() for name in candidates}
+    for X, y, holdout in dataset.chunks():
+        if not holdout.any():
+            continue
+        X_test = scaler.transform(X[holdout])
+        for name, (model, _) in candidates.items():
+            metrics[name].update(y[holdout], model.predict_proba(X_test)[:, 1])
+
+    model_results = {}
+    for name, (model, epochs) in candidates.items():
+        model_results[name] = {
+            'accuracy': metrics[name].accuracy(),
+            'auc_score': metrics[name].auc(),
+            'epochs': epochs,
+            'train_time_seconds': train_times[name],
+            'feature_importance': {}
+        }
+        print(f"📊 {name} - Accuracy: {model_results[name]['accuracy']:.3f}, AUC: {model_results[name]['auc_score']:.3f}")
+
+    return {
+        'models': {name: model for name, (model, _) in candidates.items()},
+        'model_results': model_results,
+        'scaler': scaler,
+        'feature_names': dataset.feature_names,
+        'dropped_features': dropped,
+        'rows': rows,
+        'train_rows': train_rows,
+        'chunks': chunks,
+        'chunk_rows': settings.OUT_OF_CORE_CHUNK_ROWS,
+        'data_size_bytes': os.path.getsize(data_path)
+    }
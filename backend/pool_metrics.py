@@ -0,0 +1,101 @@
+import threading
+from typing import Any, Dict
+
+from pymongo import monitoring
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Télémétrie du pool de connexions MongoDB (événements CMAP de pymongo)"""
+
+    def __init__(self):
+        # Les événements sont émis depuis les threads d'exécution de Motor
+        self._lock = threading.Lock()
+        self.pools_created = 0
+        self.pools_cleared = 0
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.checkouts_started = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.checkins = 0
+        self.max_waiting = 0
+        self.max_in_use = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    # --- Pool ---
+
+    def pool_created(self, event):
+        with self._lock:
+            self.pools_created += 1
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pools_cleared += 1
+
+    def pool_closed(self, event):
+        pass
+
+    # --- Connexions ---
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+
+    # --- Checkout / checkin ---
+
+    def connection_check_out_started(self, event):
+        with self._lock:
+            self.checkouts_started += 1
+            self.max_waiting = max(self.max_waiting, self._waiting())
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checkouts += 1
+            self.max_in_use = max(self.max_in_use, self._in_use())
+            # `duration` (secondes) est fourni par pymongo >= 4.7
+            duration = getattr(event, "duration", None)
+            if duration is not None:
+                self.wait_time_total += duration
+                self.wait_time_max = max(self.wait_time_max, duration)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checkins += 1
+
+    def _waiting(self) -> int:
+        return self.checkouts_started - self.checkouts - self.checkout_failures
+
+    def _in_use(self) -> int:
+        return self.checkouts - self.checkins
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Instantané des compteurs pour /health"""
+        with self._lock:
+            return {
+                "connections_open": self.connections_created - self.connections_closed,
+                "connections_created": self.connections_created,
+                "connections_closed": self.connections_closed,
+                "in_use": self._in_use(),
+                "max_in_use": self.max_in_use,
+                "waiting": self._waiting(),
+                "max_waiting": self.max_waiting,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "avg_wait_ms": self.wait_time_total / self.checkouts * 1000 if self.checkouts else 0.0,
+                "max_wait_ms": self.wait_time_max * 1000,
+                "pools_cleared": self.pools_cleared
+            }
@@ -0,0 +1,110 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+# Schéma compact des documents de prédiction stockés dans MongoDB :
+#   pid  prediction_id      cid  customer_id       cn  customer_name
+#   ts   date de création   p    churn_probability y   prediction
+#   c    confidence         r    code risque       m   code message
+#   mv   référence de version du modèle (porte la feature_importance)
+
+RISK_CODES = {"LOW": 0, "MEDIUM": 1, "HIGH": 2}
+RISK_LEVELS_BY_CODE = {code: level for level, code in RISK_CODES.items()}
+
+MESSAGES = [
+    "Faible risque de churn - Client fidèle",
+    "Risque de churn modéré - Surveillance recommandée",
+    "Client à haut risque de churn - Action immédiate recommandée"
+]
+MESSAGE_CODES = {message: code for code, message in enumerate(MESSAGES)}
+
+# Champs compacts utilisés dans les requêtes
+FIELD_TIMESTAMP = "ts"
+FIELD_CUSTOMER_ID = "cid"
+FIELD_PREDICTION = "y"
+FIELD_RISK = "r"
+FIELD_MODEL_VERSION = "mv"
+
+PREDICTION_RESPONSE_FIELDS = [
+    "prediction_id", "customer_id", "timestamp", "churn_probability", "prediction",
+    "confidence", "risk_level", "message", "feature_importance"
+]
+
+# Projection minimale pour les listes (historique, haut risque) : forme PredictionResponse.
+# Les champs longs couvrent les documents hérités tant que migrate_predictions.py n'a pas tourné.
+PREDICTION_RESPONSE_PROJECTION = {
+    "_id": 0, "pid": 1, "cid": 1, "ts": 1, "p": 1, "y": 1, "c": 1, "r": 1, "m": 1, "mv": 1,
+    **{field: 1 for field in PREDICTION_RESPONSE_FIELDS}
+}
+
+def encode_prediction(prediction_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Convertir une prédiction au format API en document compact"""
+    message = prediction_data.get("message", "")
+    document = {
+        "pid": prediction_data.get("prediction_id"),
+        "ts": prediction_data.get("created_at") or datetime.now(),
+        "p": float(prediction_data.get("churn_probability", 0.0)),
+        "y": int(prediction_data.get("prediction", 0)),
+        "c": float(prediction_data.get("confidence", 0.0)),
+        "r": RISK_CODES.get(prediction_data.get("risk_level"), 0),
+        "m": MESSAGE_CODES.get(message, message),
+        "mv": prediction_data.get("model_version")
+    }
+
+    # Les champs client facultatifs ne sont stockés que s'ils sont renseignés
+    if prediction_data.get("customer_id") is not None:
+        document["cid"] = prediction_data["customer_id"]
+    if prediction_data.get("customer_name") is not None:
+        document["cn"] = prediction_data["customer_name"]
+    if "_id" in prediction_data:
+        document["_id"] = prediction_data["_id"]
+
+    return document
+
+def is_compact(document: Dict[str, Any]) -> bool:
+    return "pid" in document
+
+def decode_prediction(document: Dict[str, Any],
+                      feature_importance: Optional[Dict[str, float]] = None,
+                      serialize_dates: bool = True) -> Dict[str, Any]:
+    """Reconstruire la forme API d'une prédiction à partir d'un document compact"""
+    if not is_compact(document):
+        # Document hérité (non migré) : déjà au format API
+        return document
+
+    created_at = document["ts"]
+    message = document.get("m", "")
+    decoded = {
+        "_id": document.get("_id"),
+        "prediction_id": document["pid"],
+        "customer_id": document.get("cid"),
+        "customer_name": document.get("cn"),
+        "timestamp": created_at.isoformat(),
+        "created_at": created_at.isoformat() if serialize_dates else created_at,
+        "churn_probability": document.get("p", 0.0),
+        "prediction": document.get("y", 0),
+        "confidence": document.get("c", 0.0),
+        "risk_level": RISK_LEVELS_BY_CODE.get(document.get("r"), "LOW"),
+        "message": MESSAGES[message] if isinstance(message, int) else message,
+        "feature_importance": feature_importance,
+        "model_version": document.get("mv")
+    }
+    return decoded
+
+def decode_prediction_response(document: Dict[str, Any],
+                               feature_importance: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """Décoder un document projeté directement dans la forme PredictionResponse"""
+    if not is_compact(document):
+        return {field: document.get(field) for field in PREDICTION_RESPONSE_FIELDS}
+
+    message = document.get("m", "")
+    return {
+        "prediction_id": document["pid"],
+        "customer_id": document.get("cid"),
+        "timestamp": document["ts"].isoformat(),
+        "churn_probability": document.get("p", 0.0),
+        "prediction": document.get("y", 0),
+        "confidence": document.get("c", 0.0),
+        "risk_level": RISK_LEVELS_BY_CODE.get(document.get("r"), "LOW"),
+        "message": MESSAGES[message] if isinstance(message, int) else message,
+        "feature_importance": feature_importance
+    }
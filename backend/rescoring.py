@@ -0,0 +1,128 @@
+import asyncio
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from storage import StorageBackend
+
+ScoreBatch = Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]
+
+# Champs d'identité des fiches clients, ignorés pour comparer les features
+IDENTITY_FIELDS = {"customer_id", "name"}
+
+def check_scores_vary(customers: List[Dict[str, Any]], results: List[Dict[str, Any]]):
+    """Refuser un lot où des clients aux features différentes reçoivent tous le même score :
+    symptôme de features non transmises au modèle (toutes à la même valeur)"""
+    distinct_features = {
+        tuple(sorted((key, value) for key, value in customer.items() if key not in IDENTITY_FIELDS))
+        for customer in customers
+    }
+    distinct_scores = {result["churn_probability"] for result in results}
+    if len(distinct_features) > 1 and len(distinct_scores) == 1:
+        raise ValueError(
+            f"Scores identiques ({distinct_scores.pop():.4f}) pour {len(distinct_features)} profils clients "
+            "différents : re-scoring interrompu"
+        )
+
+class PortfolioRescorer:
+    """Re-scoring de tout le portefeuille clients après un changement de modèle :
+    lecture du curseur clients par lots, scoring vectorisé sur un pool de workers, écriture en masse"""
+
+    def __init__(self, batch_size: int = 2000, workers: int = 2):
+        self.batch_size = batch_size
+        self.workers = max(1, workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="rescore")
+        self._task: Optional[asyncio.Task] = None
+        self.progress: Dict[str, Any] = {"state": "idle"}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, storage: StorageBackend, score_batch: ScoreBatch, model_version: str) -> bool:
+        """Lancer un re-scoring ; un re-scoring en cours (ancien modèle) est annulé et remplacé"""
+        replaced = self.running
+        if replaced:
+            self._task.cancel()
+        self._task = asyncio.create_task(self.run(storage, score_batch, model_version))
+        return replaced
+
+    async def run(self, storage: StorageBackend, score_batch: ScoreBatch, model_version: str):
+        started = time.perf_counter()
+        self.progress = {
+            "state": "running",
+            "model_version": model_version,
+            "total": await storage.count_customers(),
+            "processed": 0,
+            "started_at": datetime.now().isoformat(),
+            "finished_at": None,
+            "elapsed_seconds": 0.0,
+            "throughput_per_second": 0.0,
+            "eta_seconds": None,
+            "error": None
+        }
+        print(f"🔄 Re-scoring du portefeuille ({self.progress['total']} clients) avec le modèle {model_version}")
+
+        loop = asyncio.get_running_loop()
+        # Lots en cours de scoring : la lecture du curseur continue pendant que les workers calculent
+        pending = deque()
+        try:
+            async for customers in storage.iter_customer_features(self.batch_size):
+                pending.append((customers, loop.run_in_executor(self._executor, score_batch, customers)))
+                if len(pending) >= self.workers:
+                    await self._save_batch(storage, *pending.popleft(), model_version, started)
+
+            while pending:
+                await self._save_batch(storage, *pending.popleft(), model_version, started)
+
+            self.progress["state"] = "completed"
+            self.progress["eta_seconds"] = 0.0
+            print(
+                f"✅ Re-scoring terminé: {self.progress['processed']} clients en "
+                f"{self.progress['elapsed_seconds']:.1f}s ({self.progress['throughput_per_second']:.0f} clients/s)"
+            )
+        except asyncio.CancelledError:
+            self.progress["state"] = "cancelled"
+            raise
+        except Exception as e:
+            self.progress["state"] = "failed"
+            self.progress["error"] = str(e)
+            print(f"❌ Erreur lors du re-scoring: {e}")
+        finally:
+            self.progress["finished_at"] = datetime.now().isoformat()
+
+    async def _save_batch(self, storage: StorageBackend, customers: List[Dict[str, Any]],
+                          scoring: asyncio.Future, model_version: str, started: float):
+        results = await scoring
+        check_scores_vary(customers, results)
+        timestamp = datetime.now().isoformat()
+        predictions = [
+            {
+                "prediction_id": str(uuid.uuid4()),
+                "customer_id": customer.get("customer_id"),
+                "customer_name": customer.get("name"),
+                "timestamp": timestamp,
+                "model_version": model_version,
+                **result
+            }
+            for customer, result in zip(customers, results)
+        ]
+        await storage.save_predictions(predictions)
+
+        # Débit et temps restant estimés sur l'ensemble du run
+        elapsed = time.perf_counter() - started
+        processed = self.progress["processed"] + len(predictions)
+        throughput = processed / elapsed if elapsed > 0 else 0.0
+        remaining = max(self.progress["total"] - processed, 0)
+        self.progress.update({
+            "processed": processed,
+            "elapsed_seconds": round(elapsed, 3),
+            "throughput_per_second": round(throughput, 1),
+            "eta_seconds": round(remaining / throughput, 1) if throughput > 0 else None
+        })
+
+    def status(self) -> Dict[str, Any]:
+        return dict(self.progress)
@@ -0,0 +1,675 @@
+import asyncio
+import json
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from config import settings
+from archive import PredictionArchive
+from live_stream import live_feed
+from prediction_schema import RISK_CODES, RISK_LEVELS_BY_CODE, MESSAGES, MESSAGE_CODES, PREDICTION_RESPONSE_FIELDS
+from storage import (
+    StorageBackend, RISK_LEVELS, CUSTOMER_FEATURE_FIELDS, CUSTOMER_OPTIONAL_FIELDS,
+    build_trend_points, trend_start
+)
+
+# Format fixe des dates stockées : l'ordre lexicographique est l'ordre chronologique
+TS_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+CUSTOMER_COLUMNS = CUSTOMER_OPTIONAL_FIELDS + CUSTOMER_FEATURE_FIELDS
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY,
+    prediction_id TEXT,
+    customer_id TEXT,
+    customer_name TEXT,
+    created_at TEXT NOT NULL,
+    churn_probability REAL,
+    prediction INTEGER,
+    confidence REAL,
+    risk_level INTEGER,
+    message TEXT,
+    model_version TEXT
+);
+CREATE INDEX IF NOT EXISTS predictions_created_at ON predictions (created_at);
+CREATE INDEX IF NOT EXISTS predictions_risk_created_at ON predictions (risk_level, created_at);
+CREATE INDEX IF NOT EXISTS predictions_prediction_created_at ON predictions (prediction, created_at);
+CREATE INDEX IF NOT EXISTS predictions_customer_created_at ON predictions (customer_id, created_at);
+
+CREATE TABLE IF NOT EXISTS customers (
+    id INTEGER PRIMARY KEY,
+    {", ".join(f"{column} {'TEXT' if column in CUSTOMER_OPTIONAL_FIELDS else 'REAL'}" for column in CUSTOMER_COLUMNS)},
+    created_at TEXT,
+    updated_at TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS customers_customer_id ON customers (customer_id);
+CREATE INDEX IF NOT EXISTS customers_created_at ON customers (created_at);
+
+CREATE TABLE IF NOT EXISTS rollups_hourly (
+    bucket TEXT PRIMARY KEY, count INTEGER, churn_count INTEGER,
+    low_count INTEGER, medium_count INTEGER, high_count INTEGER, probability_sum REAL
+);
+CREATE TABLE IF NOT EXISTS rollups_daily (
+    bucket TEXT PRIMARY KEY, count INTEGER, churn_count INTEGER,
+    low_count INTEGER, medium_count INTEGER, high_count INTEGER, probability_sum REAL
+);
+
+-- Totaux des prédictions non archivées, tenus dans la transaction de chaque insertion et suppression
+CREATE TABLE IF NOT EXISTS prediction_totals (
+    id INTEGER PRIMARY KEY CHECK (id = 1), count INTEGER NOT NULL, confidence_sum REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS model_versions (version TEXT PRIMARY KEY, feature_importance TEXT);
+CREATE TABLE IF NOT EXISTS model_metrics (id INTEGER PRIMARY KEY, data TEXT, saved_at TEXT);
+"""
+
+ROLLUP_UPSERT = """
+INSERT INTO {table} (bucket, count, churn_count, low_count, medium_count, high_count, probability_sum)
+VALUES (?, 1, ?, ?, ?, ?, ?)
+ON CONFLICT(bucket) DO UPDATE SET
+    count = count + 1,
+    churn_count = churn_count + excluded.churn_count,
+    low_count = low_count + excluded.low_count,
+    medium_count = medium_count + excluded.medium_count,
+    high_count = high_count + excluded.high_count,
+    probability_sum = probability_sum + excluded.probability_sum
+"""
+
+TOTALS_UPDATE = "UPDATE prediction_totals SET count = count + ?, confidence_sum = confidence_sum + ? WHERE id = 1"
+
+PREDICTION_COLUMNS = (
+    "id, prediction_id, customer_id, customer_name, created_at, churn_probability, "
+    "prediction, confidence, risk_level, message, model_version"
+)
+
+def _ts(moment: datetime) -> str:
+    return moment.strftime(TS_FORMAT)
+
+def _open_connection(path: str, read_only: bool = False) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536")
+    conn.execute("PRAGMA mmap_size=268435456")
+    if read_only:
+        conn.execute("PRAGMA query_only=ON")
+    return conn
+
+def _ensure_totals(conn: sqlite3.Connection):
+    """Créer la ligne de totaux à partir des prédictions existantes si elle manque (base antérieure)"""
+    if conn.execute("SELECT 1 FROM prediction_totals WHERE id = 1").fetchone() is None:
+        conn.execute(
+            "INSERT INTO prediction_totals (id, count, confidence_sum) "
+            "SELECT 1, COUNT(*), COALESCE(SUM(confidence), 0) FROM predictions"
+        )
+
+def _insert_prediction(conn: sqlite3.Connection, prediction_data: Dict[str, Any]) -> int:
+    """Insérer une prédiction et incrémenter ses rollups et les totaux (dans la transaction courante)"""
+    created_at = prediction_data["created_at"]
+    message = prediction_data.get("message", "")
+    risk_level = prediction_data.get("risk_level", "LOW")
+    prediction = int(prediction_data.get("prediction", 0))
+    probability = float(prediction_data.get("churn_probability", 0.0))
+    confidence = float(prediction_data.get("confidence", 0.0))
+    risk_flags = [1 if risk_level == level else 0 for level in RISK_LEVELS]
+
+    cursor = conn.execute(
+        "INSERT INTO predictions (prediction_id, customer_id, customer_name, created_at, churn_probability, "
+        "prediction, confidence, risk_level, message, model_version) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            prediction_data.get("prediction_id"), prediction_data.get("customer_id"),
+            prediction_data.get("customer_name"), _ts(created_at), probability, prediction,
+            confidence, RISK_CODES.get(risk_level, 0),
+            str(MESSAGE_CODES[message]) if message in MESSAGE_CODES else message,
+            prediction_data.get("model_version")
+        )
+    )
+    hour_bucket = _ts(created_at.replace(minute=0, second=0, microsecond=0))
+    day_bucket = _ts(datetime(created_at.year, created_at.month, created_at.day))
+    conn.execute(ROLLUP_UPSERT.format(table="rollups_hourly"), (hour_bucket, prediction, *risk_flags, probability))
+    conn.execute(ROLLUP_UPSERT.format(table="rollups_daily"), (day_bucket, prediction, *risk_flags, probability))
+    conn.execute(TOTALS_UPDATE, (1, confidence))
+    return cursor.lastrowid
+
+class SQLiteStorage(StorageBackend):
+    """Backend embarqué : SQLite en mode WAL avec écritures regroupées en transactions par lots"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self.archive = PredictionArchive(settings.ARCHIVE_DIR)
+        self.model_versions: Dict[str, Optional[Dict[str, float]]] = {}
+        self._write_conn: Optional[sqlite3.Connection] = None
+        self._read_conn: Optional[sqlite3.Connection] = None
+        # Un thread d'écriture unique (sérialise les transactions) et un thread de lecture (WAL)
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
+        self._reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-reader")
+        self._pending: Optional[asyncio.Queue] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self.transactions = 0
+        self.writes = 0
+
+    @property
+    def is_connected(self) -> bool:
+        return self._write_conn is not None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "transactions": self.transactions,
+            "writes": self.writes,
+            "avg_writes_per_transaction": self.writes / self.transactions if self.transactions else 0.0
+        }
+
+    async def connect(self):
+        """Ouvrir la base SQLite et créer le schéma"""
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            loop = asyncio.get_running_loop()
+            self._write_conn = await loop.run_in_executor(self._writer, _open_connection, self.path)
+            await loop.run_in_executor(self._writer, self._write_conn.executescript, SCHEMA)
+            await loop.run_in_executor(self._writer, _ensure_totals, self._write_conn)
+            self._read_conn = await loop.run_in_executor(self._reader, _open_connection, self.path, True)
+
+            self._pending = asyncio.Queue()
+            self._flush_task = asyncio.create_task(self._flush_loop())
+            print(f"✅ Base SQLite ouverte: {self.path}")
+        except Exception as e:
+            print(f"❌ Erreur d'ouverture SQLite: {e}")
+            raise
+
+    async def close(self):
+        """Vider les écritures en attente et fermer la base"""
+        if self._flush_task:
+            await self._pending.join()
+            self._flush_task.cancel()
+        loop = asyncio.get_running_loop()
+        if self._write_conn:
+            await loop.run_in_executor(self._writer, self._write_conn.close)
+            self._write_conn = None
+        if self._read_conn:
+            await loop.run_in_executor(self._reader, self._read_conn.close)
+            self._read_conn = None
+
+    # --- Exécution ---
+
+    async def _write(self, operation: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Mettre une écriture en file ; elle sera validée avec les autres écritures du même lot"""
+        future = asyncio.get_running_loop().create_future()
+        await self._pending.put((operation, future))
+        return await future
+
+    async def _flush_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._pending.get()]
+            # Laisser les écritures concurrentes s'accumuler avant de valider
+            await asyncio.sleep(settings.SQLITE_BATCH_DELAY_MS / 1000)
+            while len(batch) < settings.SQLITE_BATCH_SIZE and not self._pending.empty():
+                batch.append(self._pending.get_nowait())
+
+            try:
+                results = await loop.run_in_executor(self._writer, self._run_transaction, batch)
+                for (_, future), (ok, value) in zip(batch, results):
+                    if future.done():
+                        continue
+                    if ok:
+                        future.set_result(value)
+                    else:
+                        future.set_exception(value)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                for _ in batch:
+                    self._pending.task_done()
+
+    def _run_transaction(self, batch) -> List:
+        """Exécuter un lot d'écritures dans une seule transaction (un savepoint par écriture)"""
+        conn = self._write_conn
+        results = []
+        conn.execute("BEGIN")
+        try:
+            for operation, _ in batch:
+                conn.execute("SAVEPOINT write_op")
+                try:
+                    results.append((True, operation(conn)))
+                    conn.execute("RELEASE write_op")
+                except Exception as e:
+                    conn.execute("ROLLBACK TO write_op")
+                    conn.execute("RELEASE write_op")
+                    results.append((False, e))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self.transactions += 1
+        self.writes += len(batch)
+        return results
+
+    async def _read(self, query: Callable[[sqlite3.Connection], Any]) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._reader, query, self._read_conn)
+
+    async def _fetch(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        return await self._read(lambda conn: conn.execute(sql, params).fetchall())
+
+    async def _scalar(self, sql: str, params: tuple = ()) -> Any:
+        rows = await self._fetch(sql, params)
+        return rows[0][0] if rows else None
+
+    # --- Décodage ---
+
+    async def _load_model_versions(self, rows: List[sqlite3.Row]):
+        missing = {row["model_version"] for row in rows if row["model_version"] and row["model_version"] not in self.model_versions}
+        if missing:
+            placeholders = ", ".join("?" for _ in missing)
+            versions = await self._fetch(
+                f"SELECT version, feature_importance FROM model_versions WHERE version IN ({placeholders})",
+                tuple(missing)
+            )
+            for version in versions:
+                self.model_versions[version["version"]] = json.loads(version["feature_importance"] or "{}")
+
+    def _decode_row(self, row: sqlite3.Row) -> Dict[str, Any]:
+        created_at = datetime.strptime(row["created_at"], TS_FORMAT)
+        message = row["message"]
+        return {
+            "_id": str(row["id"]),
+            "prediction_id": row["prediction_id"],
+            "customer_id": row["customer_id"],
+            "customer_name": row["customer_name"],
+            "timestamp": created_at.isoformat(),
+            "created_at": created_at.isoformat(),
+            "churn_probability": row["churn_probability"],
+            "prediction": row["prediction"],
+            "confidence": row["confidence"],
+            "risk_level": RISK_LEVELS_BY_CODE.get(row["risk_level"], "LOW"),
+            "message": MESSAGES[int(message)] if message is not None and message.isdigit() else message,
+            "feature_importance": self.model_versions.get(row["model_version"]),
+            "model_version": row["model_version"]
+        }
+
+    # --- Prédictions ---
+
+    async def save_prediction(self, prediction_data: Dict[str, Any]) -> str:
+        """Sauvegarder une prédiction et incrémenter les rollups dans la même transaction"""
+        try:
+            prediction_data["created_at"] = datetime.now()
+
+            model_version = prediction_data.get("model_version")
+            if model_version and model_version not in self.model_versions:
+                await self.register_model_version(model_version, prediction_data.get("feature_importance"))
+
+            inserted_id = await self._write(lambda conn: _insert_prediction(conn, prediction_data))
+
+            # Diffuser le delta aux abonnés du tableau de bord en direct
+            live_feed.publish_prediction(prediction_data)
+
+            return str(inserted_id)
+        except Exception as e:
+            print(f"❌ Erreur sauvegarde prédiction: {e}")
+            raise
+
+    async def save_predictions(self, predictions: List[Dict[str, Any]]) -> int:
+        """Sauvegarder un lot de prédictions en une seule opération d'écriture"""
+        if not predictions:
+            return 0
+        try:
+            created_at = datetime.now()
+            for prediction_data in predictions:
+                prediction_data["created_at"] = created_at
+
+            model_version = predictions[0].get("model_version")
+            if model_version and model_version not in self.model_versions:
+                await self.register_model_version(model_version, predictions[0].get("feature_importance"))
+
+            def operation(conn):
+                for prediction_data in predictions:
+                    _insert_prediction(conn, prediction_data)
+                return len(predictions)
+
+            inserted = await self._write(operation)
+            live_feed.publish_predictions(predictions)
+            return inserted
+        except Exception as e:
+            print(f"❌ Erreur sauvegarde prédictions en masse: {e}")
+            raise
+
+    async def get_predictions(self, limit: int = 50, skip: int = 0) -> List[Dict]:
+        """Récupérer une page de prédictions au format PredictionResponse (base puis archive)"""
+        try:
+            rows = await self._fetch(
+                f"SELECT {PREDICTION_COLUMNS} FROM predictions ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                (limit, skip)
+            )
+            await self._load_model_versions(rows)
+            predictions = [
+                {field: decoded[field] for field in PREDICTION_RESPONSE_FIELDS}
+                for decoded in map(self._decode_row, rows)
+            ]
+
+            # Compléter la page avec les prédictions archivées
+            if len(predictions) < limit and self.archive.partitions():
+                hot_count = skip + len(predictions) if predictions else await self._scalar("SELECT COUNT(*) FROM predictions")
+                archived = await asyncio.to_thread(self.archive.read_page, max(skip - hot_count, 0), limit - len(predictions))
+                predictions.extend({field: row.get(field) for field in PREDICTION_RESPONSE_FIELDS} for row in archived)
+
+            return predictions
+        except Exception as e:
+            print(f"❌ Erreur récupération prédictions: {e}")
+            return []
+
+    async def iter_predictions(self, start: datetime, end: datetime, risk_level: Optional[str] = None,
+                               batch_size: int = 1000):
+        """Parcourir les prédictions d'un intervalle par lots (archive puis base, pagination par clé)"""
+        for partition_key in self.archive.partitions_in_range(start, end):
+            rows = await asyncio.to_thread(self.archive.read_range, partition_key, start, end)
+            if risk_level:
+                rows = [row for row in rows if row.get("risk_level") == risk_level]
+            for i in range(0, len(rows), batch_size):
+                yield rows[i:i + batch_size]
+
+        risk_filter = "AND risk_level = ?" if risk_level else ""
+        risk_params = (RISK_CODES[risk_level],) if risk_level else ()
+        last_key = ("", 0)
+        while True:
+            rows = await self._fetch(
+                f"SELECT {PREDICTION_COLUMNS} FROM predictions "
+                f"WHERE created_at >= ? AND created_at <= ? {risk_filter} AND (created_at, id) > (?, ?) "
+                f"ORDER BY created_at, id LIMIT ?",
+                (_ts(start), _ts(end), *risk_params, *last_key, batch_size)
+            )
+            if not rows:
+                break
+            await self._load_model_versions(rows)
+            yield [self._decode_row(row) for row in rows]
+            last_key = (rows[-1]["created_at"], rows[-1]["id"])
+
+    async def archive_old_predictions(self, older_than_days: int = None) -> int:
+        """Déplacer les prédictions plus anciennes que N jours vers l'archive Parquet, puis les supprimer"""
+        if not self.archive.available:
+            print("⚠️  pyarrow non installé, archivage désactivé")
+            return 0
+
+        older_than_days = older_than_days if older_than_days is not None else settings.ARCHIVE_AFTER_DAYS
+        today = datetime.now().date()
+        cutoff = datetime(today.year, today.month, today.day) - timedelta(days=older_than_days)
+        archived_count = 0
+
+        try:
+            while True:
+                rows = await self._fetch(
+                    f"SELECT {PREDICTION_COLUMNS} FROM predictions WHERE created_at < ? ORDER BY created_at, id LIMIT ?",
+                    (_ts(cutoff), settings.ARCHIVE_BATCH_SIZE)
+                )
+                if not rows:
+                    break
+                await self._load_model_versions(rows)
+
+                # Un fichier par journée du lot, écrit avant la suppression
+                by_day: Dict[str, List[Dict[str, Any]]] = {}
+                for row in rows:
+                    decoded = self._decode_row(row)
+                    decoded["created_at"] = datetime.fromisoformat(decoded["created_at"])
+                    by_day.setdefault(row["created_at"][:10], []).append(decoded)
+                for documents in by_day.values():
+                    await asyncio.to_thread(self.archive.write_partition, documents[0]["created_at"].date(), documents)
+
+                ids = [row["id"] for row in rows]
+                placeholders = ", ".join("?" for _ in ids)
+                confidence_sum = sum(row["confidence"] or 0.0 for row in rows)
+
+                def delete_archived(conn):
+                    # Les totaux ne comptent que la base : décrémentés dans la transaction de la suppression
+                    conn.execute(TOTALS_UPDATE, (-len(ids), -confidence_sum))
+                    conn.execute(f"DELETE FROM predictions WHERE id IN ({placeholders})", ids)
+
+                await self._write(delete_archived)
+                archived_count += len(rows)
+
+            if archived_count:
+                print(f"📦 {archived_count} prédictions archivées (antérieures au {cutoff.date()})")
+            return archived_count
+        except Exception as e:
+            print(f"❌ Erreur archivage prédictions: {e}")
+            return archived_count
+
+    # --- Statistiques du tableau de bord ---
+
+    async def get_predictions_count(self) -> int:
+        try:
+            return await self._scalar("SELECT COUNT(*) FROM predictions") + self.archive.stats()["count"]
+        except Exception as e:
+            print(f"❌ Erreur comptage prédictions: {e}")
+            return 0
+
+    async def get_predictions_today(self) -> int:
+        try:
+            today = datetime.now().date()
+            start_of_day = datetime(today.year, today.month, today.day)
+            return await self._scalar(
+                "SELECT COUNT(*) FROM predictions WHERE created_at >= ? AND created_at < ?",
+                (_ts(start_of_day), _ts(start_of_day + timedelta(days=1)))
+            )
+        except Exception as e:
+            print(f"❌ Erreur comptage prédictions aujourd'hui: {e}")
+            return 0
+
+    async def get_high_risk_count(self) -> int:
+        try:
+            hot_count = await self._scalar("SELECT COUNT(*) FROM predictions WHERE risk_level = ?", (RISK_CODES["HIGH"],))
+            return hot_count + self.archive.stats()["high_risk_count"]
+        except Exception as e:
+            print(f"❌ Erreur comptage haut risque: {e}")
+            return 0
+
+    async def get_churn_count(self) -> int:
+        try:
+            hot_count = await self._scalar("SELECT COUNT(*) FROM predictions WHERE prediction = 1")
+            return hot_count + self.archive.stats()["churn_count"]
+        except Exception as e:
+            print(f"❌ Erreur comptage churn: {e}")
+            return 0
+
+    async def get_avg_confidence(self) -> float:
+        try:
+            rows = await self._fetch("SELECT confidence_sum, count FROM prediction_totals WHERE id = 1")
+            archive_stats = self.archive.stats()
+            confidence_sum = archive_stats["confidence_sum"] + (rows[0]["confidence_sum"] if rows else 0.0)
+            count = archive_stats["count"] + (rows[0]["count"] if rows else 0)
+            return float(confidence_sum / count) if count > 0 else 0.85
+        except Exception as e:
+            print(f"❌ Erreur calcul confiance moyenne: {e}")
+            return 0.85
+
+    async def get_hourly_distribution(self) -> Dict[str, int]:
+        try:
+            today = datetime.now().date()
+            start_of_day = datetime(today.year, today.month, today.day)
+            rows = await self._fetch(
+                "SELECT bucket, count FROM rollups_hourly WHERE bucket >= ? AND bucket < ?",
+                (_ts(start_of_day), _ts(start_of_day + timedelta(days=1)))
+            )
+            distribution = {str(i): 0 for i in range(24)}
+            for row in rows:
+                distribution[str(datetime.strptime(row["bucket"], TS_FORMAT).hour)] = row["count"]
+            return distribution
+        except Exception as e:
+            print(f"❌ Erreur distribution horaire: {e}")
+            return {str(i): 0 for i in range(24)}
+
+    async def get_trends(self, start: datetime, end: datetime, granularity: str = "day") -> List[Dict]:
+        try:
+            table = "rollups_hourly" if granularity == "hour" else "rollups_daily"
+            start = trend_start(start, granularity)
+            rows = await self._fetch(
+                f"SELECT * FROM {table} WHERE bucket >= ? AND bucket <= ? ORDER BY bucket",
+                (_ts(start), _ts(end))
+            )
+            rollups = [
+                {
+                    "bucket": datetime.strptime(row["bucket"], TS_FORMAT),
+                    "count": row["count"],
+                    "churn_count": row["churn_count"],
+                    "probability_sum": row["probability_sum"],
+                    "risk_counts": {"LOW": row["low_count"], "MEDIUM": row["medium_count"], "HIGH": row["high_count"]}
+                }
+                for row in rows
+            ]
+            return build_trend_points(rollups, start, end, granularity)
+        except Exception as e:
+            print(f"❌ Erreur récupération tendances: {e}")
+            return []
+
+    # --- Clients ---
+
+    async def save_customer(self, customer_data: Dict[str, Any]) -> str:
+        """Sauvegarder un client (mise à jour si customer_id existe déjà)"""
+        try:
+            now = _ts(datetime.now())
+            values = {column: customer_data.get(column) for column in CUSTOMER_COLUMNS}
+
+            def operation(conn):
+                if values["customer_id"]:
+                    existing = conn.execute("SELECT id FROM customers WHERE customer_id = ?", (values["customer_id"],)).fetchone()
+                    if existing:
+                        assignments = ", ".join(f"{column} = ?" for column in CUSTOMER_COLUMNS)
+                        conn.execute(
+                            f"UPDATE customers SET {assignments}, updated_at = ? WHERE id = ?",
+                            (*values.values(), now, existing["id"])
+                        )
+                        return existing["id"]
+
+                placeholders = ", ".join("?" for _ in CUSTOMER_COLUMNS)
+                cursor = conn.execute(
+                    f"INSERT INTO customers ({', '.join(CUSTOMER_COLUMNS)}, created_at, updated_at) VALUES ({placeholders}, ?, ?)",
+                    (*values.values(), now, now)
+                )
+                return cursor.lastrowid
+
+            return str(await self._write(operation))
+        except Exception as e:
+            print(f"❌ Erreur sauvegarde client: {e}")
+            raise
+
+    async def get_customers(self, limit: int = 50) -> List[Dict]:
+        """Récupérer la liste des clients au format CustomerResponse"""
+        try:
+            rows = await self._fetch(
+                f"SELECT id, {', '.join(CUSTOMER_COLUMNS)}, created_at FROM customers ORDER BY created_at DESC LIMIT ?",
+                (limit,)
+            )
+            customers = []
+            for row in rows:
+                customer = {field: row[field] if row[field] is not None else 0 for field in CUSTOMER_FEATURE_FIELDS}
+                for field in CUSTOMER_OPTIONAL_FIELDS:
+                    customer[field] = row[field]
+                customer["id"] = str(row["id"])
+                customer["created_at"] = datetime.strptime(row["created_at"], TS_FORMAT).isoformat() if row["created_at"] else None
+                customers.append(customer)
+            return customers
+        except Exception as e:
+            print(f"❌ Erreur récupération clients: {e}")
+            return []
+
+    async def count_customers(self) -> int:
+        """Nombre total de clients"""
+        try:
+            return await self._scalar("SELECT COUNT(*) FROM customers") or 0
+        except Exception as e:
+            print(f"❌ Erreur comptage clients: {e}")
+            return 0
+
+    async def iter_customer_features(self, batch_size: int = 1000):
+        """Parcourir tous les clients par lots (pagination par clé sur id)"""
+        last_id = 0
+        while True:
+            rows = await self._fetch(
+                f"SELECT id, customer_id, name, {', '.join(CUSTOMER_FEATURE_FIELDS)} FROM customers "
+                f"WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, batch_size)
+            )
+            if not rows:
+                return
+            yield [
+                {
+                    **{field: row[field] if row[field] is not None else 0 for field in CUSTOMER_FEATURE_FIELDS},
+                    "customer_id": row["customer_id"] or str(row["id"]),
+                    "name": row["name"]
+                }
+                for row in rows
+            ]
+            last_id = rows[-1]["id"]
+
+    async def get_customer_features(self, customer_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Charger les features des clients demandés en une requête IN sur l'index customer_id"""
+        try:
+            unique_ids = list(set(customer_ids))
+            if not unique_ids:
+                return {}
+            placeholders = ", ".join("?" for _ in unique_ids)
+            rows = await self._fetch(
+                f"SELECT customer_id, name, {', '.join(CUSTOMER_FEATURE_FIELDS)} FROM customers "
+                f"WHERE customer_id IN ({placeholders})",
+                tuple(unique_ids)
+            )
+            return {
+                row["customer_id"]: {
+                    **{field: row[field] if row[field] is not None else 0 for field in CUSTOMER_FEATURE_FIELDS},
+                    "name": row["name"]
+                }
+                for row in rows
+            }
+        except Exception as e:
+            print(f"❌ Erreur récupération features clients: {e}")
+            return {}
+
+    # --- Modèle ---
+
+    async def register_model_version(self, version: str, feature_importance: Optional[Dict[str, float]]):
+        try:
+            feature_importance = {k: float(v) for k, v in (feature_importance or {}).items()}
+            await self._write(lambda conn: conn.execute(
+                "INSERT OR REPLACE INTO model_versions (version, feature_importance) VALUES (?, ?)",
+                (version, json.dumps(feature_importance))
+            ))
+            self.model_versions[version] = feature_importance
+        except Exception as e:
+            print(f"❌ Erreur enregistrement version du modèle: {e}")
+
+    async def save_model_metrics(self, metrics: Dict[str, Any]) -> str:
+        try:
+            saved_at = _ts(datetime.now())
+            data = json.dumps(metrics, default=float)
+
+            def operation(conn):
+                conn.execute("DELETE FROM model_metrics")
+                return conn.execute("INSERT INTO model_metrics (data, saved_at) VALUES (?, ?)", (data, saved_at)).lastrowid
+
+            return str(await self._write(operation))
+        except Exception as e:
+            print(f"❌ Erreur sauvegarde métriques: {e}")
+            raise
+
+    async def get_latest_model_metrics(self) -> Optional[Dict]:
+        try:
+            rows = await self._fetch("SELECT id, data, saved_at FROM model_metrics ORDER BY id DESC LIMIT 1")
+            if not rows:
+                return None
+            metrics = json.loads(rows[0]["data"])
+            metrics["_id"] = str(rows[0]["id"])
+            metrics["saved_at"] = datetime.strptime(rows[0]["saved_at"], TS_FORMAT).isoformat()
+            return metrics
+        except Exception as e:
+            print(f"❌ Erreur récupération métriques: {e}")
+            return None
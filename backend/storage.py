@@ -0,0 +1,207 @@
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from config import settings
+
+RISK_LEVELS = ["LOW", "MEDIUM", "HIGH"]
+TREND_GRANULARITIES = ["hour", "day", "month"]
+
+# Read model des listes de clients : seuls les champs de CustomerResponse sont lus
+CUSTOMER_FEATURE_FIELDS = [
+    "account_length", "international_plan", "voice_mail_plan", "number_vmail_messages",
+    "total_day_minutes", "total_day_calls", "total_day_charge",
+    "total_eve_minutes", "total_eve_calls", "total_eve_charge",
+    "total_night_minutes", "total_night_calls", "total_night_charge",
+    "total_intl_minutes", "total_intl_calls", "total_intl_charge",
+    "customer_service_calls"
+]
+CUSTOMER_OPTIONAL_FIELDS = ["name", "email", "phone", "signup_date", "customer_id"]
+
+def trend_period(moment: datetime, granularity: str) -> str:
+    """Libellé de la période contenant un instant donné"""
+    if granularity == "hour":
+        return moment.strftime("%Y-%m-%dT%H:00")
+    if granularity == "month":
+        return moment.strftime("%Y-%m")
+    return moment.strftime("%Y-%m-%d")
+
+def next_period(moment: datetime, granularity: str) -> datetime:
+    """Début de la période suivante"""
+    if granularity == "hour":
+        return moment + timedelta(hours=1)
+    if granularity == "month":
+        return datetime(moment.year + moment.month // 12, moment.month % 12 + 1, 1)
+    return moment + timedelta(days=1)
+
+def trend_start(start: datetime, granularity: str) -> datetime:
+    """Aligner le début d'une période de tendances sur la granularité demandée"""
+    if granularity == "hour":
+        return start.replace(minute=0, second=0, microsecond=0)
+    start = datetime(start.year, start.month, start.day)
+    return start.replace(day=1) if granularity == "month" else start
+
+def build_trend_points(rollups: List[Dict[str, Any]], start: datetime, end: datetime,
+                       granularity: str) -> List[Dict[str, Any]]:
+    """Série continue de points de tendance à partir de rollups horaires ou journaliers
+    (chaque rollup porte `bucket`, `count`, `churn_count`, `probability_sum` et `risk_counts`)"""
+    # Initialiser toutes les périodes à 0 pour obtenir une série continue
+    buckets = {}
+    current = start
+    while current <= end:
+        buckets[trend_period(current, granularity)] = {
+            "count": 0,
+            "churn_count": 0,
+            "risk_counts": {level: 0 for level in RISK_LEVELS},
+            "probability_sum": 0.0
+        }
+        current = next_period(current, granularity)
+
+    # Remplir (et agréger par mois si nécessaire) avec les rollups
+    for rollup in rollups:
+        bucket = buckets.get(trend_period(rollup["bucket"], granularity))
+        if bucket is None:
+            continue
+        bucket["count"] += rollup.get("count", 0)
+        bucket["churn_count"] += rollup.get("churn_count", 0)
+        bucket["probability_sum"] += rollup.get("probability_sum", 0.0)
+        for level, count in rollup.get("risk_counts", {}).items():
+            bucket["risk_counts"][level] = bucket["risk_counts"].get(level, 0) + count
+
+    return [
+        {
+            "period": period,
+            "count": bucket["count"],
+            "churn_count": bucket["churn_count"],
+            "churn_rate": bucket["churn_count"] / bucket["count"] if bucket["count"] > 0 else 0.0,
+            "avg_probability": bucket["probability_sum"] / bucket["count"] if bucket["count"] > 0 else 0.0,
+            "risk_counts": bucket["risk_counts"]
+        }
+        for period, bucket in buckets.items()
+    ]
+
+class StorageBackend(ABC):
+    """Interface de persistance dont dépend main.py (MongoDB ou moteur embarqué)"""
+
+    name = "storage"
+
+    @property
+    @abstractmethod
+    def is_connected(self) -> bool:
+        ...
+
+    @abstractmethod
+    async def connect(self):
+        ...
+
+    @abstractmethod
+    async def close(self):
+        ...
+
+    def status(self) -> Dict[str, Any]:
+        """Informations spécifiques au backend exposées dans /health"""
+        return {}
+
+    # --- Prédictions ---
+
+    @abstractmethod
+    async def save_prediction(self, prediction_data: Dict[str, Any]) -> str:
+        ...
+
+    @abstractmethod
+    async def save_predictions(self, predictions: List[Dict[str, Any]]) -> int:
+        """Écriture en masse d'un lot de prédictions (rollups et flux en direct inclus)"""
+        ...
+
+    @abstractmethod
+    async def get_predictions(self, limit: int = 50, skip: int = 0) -> List[Dict]:
+        ...
+
+    @abstractmethod
+    def iter_predictions(self, start: datetime, end: datetime, risk_level: Optional[str] = None,
+                         batch_size: int = 1000) -> AsyncIterator[List[Dict]]:
+        """Générateur asynchrone de lots de prédictions (ordre chronologique, archive incluse)"""
+        ...
+
+    @abstractmethod
+    async def archive_old_predictions(self, older_than_days: int = None) -> int:
+        ...
+
+    # --- Statistiques du tableau de bord ---
+
+    @abstractmethod
+    async def get_predictions_count(self) -> int:
+        ...
+
+    @abstractmethod
+    async def get_predictions_today(self) -> int:
+        ...
+
+    @abstractmethod
+    async def get_high_risk_count(self) -> int:
+        ...
+
+    @abstractmethod
+    async def get_churn_count(self) -> int:
+        ...
+
+    @abstractmethod
+    async def get_avg_confidence(self) -> float:
+        ...
+
+    @abstractmethod
+    async def get_hourly_distribution(self) -> Dict[str, int]:
+        ...
+
+    @abstractmethod
+    async def get_trends(self, start: datetime, end: datetime, granularity: str = "day") -> List[Dict]:
+        ...
+
+    # --- Clients ---
+
+    @abstractmethod
+    async def save_customer(self, customer_data: Dict[str, Any]) -> str:
+        ...
+
+    @abstractmethod
+    async def get_customers(self, limit: int = 50) -> List[Dict]:
+        ...
+
+    @abstractmethod
+    async def get_customer_features(self, customer_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Dernières features stockées par customer_id (une seule requête)"""
+        ...
+
+    @abstractmethod
+    async def count_customers(self) -> int:
+        ...
+
+    @abstractmethod
+    def iter_customer_features(self, batch_size: int = 1000) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Générateur asynchrone de lots de clients (customer_id, name et features)"""
+        ...
+
+    # --- Modèle ---
+
+    @abstractmethod
+    async def register_model_version(self, version: str, feature_importance: Optional[Dict[str, float]]):
+        ...
+
+    @abstractmethod
+    async def save_model_metrics(self, metrics: Dict[str, Any]) -> str:
+        ...
+
+    @abstractmethod
+    async def get_latest_model_metrics(self) -> Optional[Dict]:
+        ...
+
+def create_storage(backend: str = None) -> StorageBackend:
+    """Instancier le backend de stockage configuré (STORAGE_BACKEND)"""
+    backend = backend or settings.STORAGE_BACKEND
+    if backend == "sqlite":
+        from sqlite_storage import SQLiteStorage
+        return SQLiteStorage(settings.SQLITE_PATH)
+    if backend == "mongo":
+        from database import mongodb
+        return mongodb
+    raise ValueError(f"Backend de stockage inconnu: {backend} (attendu: mongo, sqlite)")
@@ -0,0 +1,67 @@
+import os
+import sys
+
+import pytest
+
+# Les modules du backend sont à plat : même chemin d'import que `python main.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+def churn_table(n_rows: int = 400, seed: int = 0, categorical_labels: bool = True) -> pd.DataFrame:
+    """Petit jeu au format du CSV d'entraînement, churn lié aux appels au service client"""
+    rng = np.random.default_rng(seed)
+    day_minutes = rng.normal(180, 50, n_rows)
+    eve_minutes = rng.normal(200, 40, n_rows)
+    night_minutes = rng.normal(200, 45, n_rows)
+    intl_minutes = rng.exponential(10, n_rows)
+    service_calls = rng.poisson(2, n_rows)
+    international_plan = rng.choice([0, 1], n_rows, p=[0.8, 0.2])
+    voice_mail_plan = rng.choice([0, 1], n_rows, p=[0.6, 0.4])
+    churn = (service_calls >= 4) | ((international_plan == 1) & (day_minutes > 200)) | (rng.random(n_rows) < 0.05)
+
+    def labels(codes):
+        return np.where(codes == 1, "Yes", "No") if categorical_labels else codes
+
+    return pd.DataFrame({
+        'State': rng.choice(["KS", "OH", "NJ"], n_rows),
+        'Account length': rng.integers(1, 240, n_rows),
+        'Area code': rng.choice([408, 415, 510], n_rows),
+        'International plan': labels(international_plan),
+        'Voice mail plan': labels(voice_mail_plan),
+        'Number vmail messages': voice_mail_plan * rng.poisson(20, n_rows),
+        'Total day minutes': day_minutes,
+        'Total day calls': rng.poisson(100, n_rows),
+        'Total day charge': day_minutes * 0.17,
+        'Total eve minutes': eve_minutes,
+        'Total eve calls': rng.poisson(100, n_rows),
+        'Total eve charge': eve_minutes * 0.085,
+        'Total night minutes': night_minutes,
+        'Total night calls': rng.poisson(100, n_rows),
+        'Total night charge': night_minutes * 0.045,
+        'Total intl minutes': intl_minutes,
+        'Total intl calls': rng.poisson(4, n_rows),
+        'Total intl charge': intl_minutes * 0.27,
+        'Customer service calls': service_calls,
+        'Churn': churn
+    })
+
+@pytest.fixture
+def churn_csv(tmp_path):
+    path = tmp_path / "churn.csv"
+    churn_table().to_csv(path, index=False)
+    return str(path)
+
+def customer_record(**overrides):
+    """Fiche client au format de l'API (champs snake_case)"""
+    record = {
+        "account_length": 100, "international_plan": 0, "voice_mail_plan": 1, "number_vmail_messages": 20,
+        "total_day_minutes": 180.0, "total_day_calls": 100, "total_day_charge": 30.6,
+        "total_eve_minutes": 200.0, "total_eve_calls": 100, "total_eve_charge": 17.0,
+        "total_night_minutes": 200.0, "total_night_calls": 100, "total_night_charge": 9.0,
+        "total_intl_minutes": 10.0, "total_intl_calls": 4, "total_intl_charge": 2.7,
+        "customer_service_calls": 1
+    }
+    record.update(overrides)
+    return record
@@ -0,0 +1,56 @@
+"""Étape reduce : features colinéaires retirées de la dernière à la première colonne."""
+import numpy as np
+import pytest
+
+from training_pipeline import collinear_features, collinear_features_from_covariance
+
+def _columns(n_rows: int = 200, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    a, b = rng.normal(size=n_rows), rng.normal(size=n_rows)
+    return {"a": a, "b": b, "total": 2 * a + b, "noise": rng.normal(size=n_rows), "constant": np.full(n_rows, 3.0)}
+
+def _reduce(names, r2_threshold=0.99):
+    columns = _columns()
+    X = np.column_stack([columns[name] for name in names])
+    kept, dropped = collinear_features(X, names, r2_threshold)
+    return [names[index] for index in kept], dropped
+
+def test_derived_column_is_dropped_when_last():
+    kept, dropped = _reduce(["a", "b", "total", "noise"])
+    assert kept == ["a", "b", "noise"]
+    assert list(dropped) == ["total"]
+    assert dropped["total"] == pytest.approx(1.0)
+
+def test_result_depends_on_column_order():
+    # Même groupe colinéaire, autre ordre : c'est la dernière colonne du groupe qui part
+    kept, dropped = _reduce(["total", "a", "b", "noise"])
+    assert kept == ["total", "a", "noise"]
+    assert list(dropped) == ["b"]
+
+def test_constant_column_is_dropped_and_noise_kept():
+    kept, dropped = _reduce(["a", "constant", "noise"])
+    assert kept == ["a", "noise"]
+    assert dropped == {"constant": 1.0}
+
+def test_threshold_keeps_partially_explained_columns():
+    columns = _columns()
+    rng = np.random.default_rng(1)
+    noisy = columns["a"] + rng.normal(scale=1.0, size=len(columns["a"]))
+    X = np.column_stack([columns["a"], noisy])
+    assert collinear_features(X, ["a", "noisy"], 0.99) == ([0, 1], {})
+
+def test_rows_with_missing_values_are_ignored():
+    columns = _columns()
+    X = np.column_stack([columns["a"], columns["b"], columns["total"]])
+    X[0, 2] = np.nan
+    kept, dropped = collinear_features(X, ["a", "b", "total"], 0.99)
+    assert kept == [0, 1] and list(dropped) == ["total"]
+
+def test_covariance_entry_point_matches_array_entry_point():
+    names = ["a", "b", "total", "noise"]
+    columns = _columns()
+    X = np.column_stack([columns[name] for name in names])
+    # Covariance reconstituée à partir de sommes (comme le parcours hors mémoire)
+    mean = X.mean(axis=0)
+    covariance = X.T @ X / len(X) - np.outer(mean, mean)
+    assert collinear_features_from_covariance(covariance, names, 0.99)[0] == collinear_features(X, names, 0.99)[0]
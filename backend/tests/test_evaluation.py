@@ -0,0 +1,46 @@
+import shutil
+
+import pytest
+
+pytest.importorskip("sklearn")
+import joblib
+from sklearn.ensemble import RandomForestClassifier
+
+from config import settings
+from evaluation import COMPRESSED_ARTIFACT, EVALUATION_FILES, evaluate_version, load_or_evaluate
+from training_pipeline import TrainingPipeline
+
+@pytest.fixture
+def model_dir(churn_csv, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "TRAINING_DATA_PATH", churn_csv)
+    monkeypatch.setattr(settings, "TRAINING_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(settings, "EVALUATION_DATA_PATH", "")
+    monkeypatch.setattr(settings, "EVALUATION_LATENCY_SAMPLES", 5)
+    data = TrainingPipeline(churn_csv).run()
+    directory = tmp_path / "version"
+    directory.mkdir()
+    joblib.dump(RandomForestClassifier(n_estimators=10, random_state=0).fit(data.X_train, data.y_train), directory / "best_churn_model.pkl")
+    joblib.dump(data.scaler, directory / "scaler.pkl")
+    joblib.dump(data.feature_names, directory / "feature_names.pkl")
+    return str(directory), data
+
+def test_default_evaluation_uses_the_pipeline_test_split(model_dir):
+    directory, data = model_dir
+    evaluation = load_or_evaluate(directory)
+    assert evaluation["holdout"]["source"] == "training_split"
+    assert evaluation["rows"] == len(data.y_test)
+
+def test_external_holdout_identical_to_training_data_is_refused(model_dir, churn_csv, tmp_path, monkeypatch):
+    directory, _ = model_dir
+    copy = tmp_path / "holdout.csv"
+    shutil.copy(churn_csv, copy)
+    monkeypatch.setattr(settings, "EVALUATION_DATA_PATH", str(copy))
+    with pytest.raises(ValueError, match="in-sample"):
+        load_or_evaluate(directory)
+
+def test_each_served_artifact_gets_its_own_evaluation(model_dir):
+    directory, _ = model_dir
+    shutil.copy(f"{directory}/best_churn_model.pkl", f"{directory}/{COMPRESSED_ARTIFACT}")
+    evaluate_version(directory)
+    assert load_or_evaluate(directory, COMPRESSED_ARTIFACT)["artifact"] == COMPRESSED_ARTIFACT
+    assert EVALUATION_FILES[COMPRESSED_ARTIFACT] != EVALUATION_FILES["best_churn_model.pkl"]
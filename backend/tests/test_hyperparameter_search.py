@@ -0,0 +1,57 @@
+"""Successive halving : taille des tours et plis stratifiables malgré une classe minoritaire rare."""
+import numpy as np
+import pytest
+
+from config import settings
+from hyperparameter_search import stratified_sample_floor, successive_halving_search
+
+def test_sample_floor_reaches_n_splits_rows_of_each_class():
+    y_ordered = np.array([0, 0, 1, 0, 0, 0, 1, 0, 1, 0])
+    # 3e ligne de classe 1 en position 8 ; la 3e de classe 0 est en position 3
+    assert stratified_sample_floor(y_ordered, 3) == 9
+    assert stratified_sample_floor(y_ordered, 2) == 7
+    assert stratified_sample_floor(y_ordered, 1) == 3
+
+@pytest.fixture
+def small_search(monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_N_CANDIDATES", 3)
+    monkeypatch.setattr(settings, "SEARCH_ETA", 3)
+    monkeypatch.setattr(settings, "SEARCH_MIN_SAMPLES", 10)
+    monkeypatch.setattr(settings, "SEARCH_CV_FOLDS", 5)
+    monkeypatch.setattr(settings, "SEARCH_TIME_BUDGET_SECONDS", 600)
+
+def _rare_positive_data(n_rows: int = 60, n_positive: int = 3):
+    rng = np.random.default_rng(0)
+    y = np.zeros(n_rows, dtype=int)
+    y[rng.choice(n_rows, n_positive, replace=False)] = 1
+    X = rng.normal(size=(n_rows, 4)) + y[:, None]
+    return X, y
+
+def test_folds_are_capped_by_the_minority_class(small_search):
+    X, y = _rare_positive_data()
+    result = successive_halving_search(X, y, n_jobs=1)
+    assert result["cv_folds"] == 3
+
+    rounds = sorted({(score["round"], score["n_samples"]) for score in result["trace"]})
+    sizes = [n_samples for _, n_samples in rounds]
+    # Échantillons croissants, jeu complet au dernier tour
+    assert sizes == sorted(sizes) and sizes[-1] == len(y)
+    # Le premier tour est agrandi jusqu'à contenir 3 positifs (au-delà de SEARCH_MIN_SAMPLES)
+    order = np.random.default_rng(42).permutation(len(y))
+    assert sizes[0] == max(10, stratified_sample_floor(y[order], 3))
+    assert y[order[:sizes[0]]].sum() >= 3
+
+def test_each_round_keeps_one_in_eta_configurations(small_search):
+    X, y = _rare_positive_data(n_positive=12)
+    result = successive_halving_search(X, y, n_jobs=1)
+    first_round = [score for score in result["trace"] if score["round"] == 1]
+    last_round = [score for score in result["trace"] if score["round"] == result["best"]["round"]]
+    assert len(first_round) == 3
+    # Un tiers des configurations (eta = 3) passe au tour suivant
+    assert len(last_round) == 1 and result["best"]["round"] == 2
+    assert result["cv_folds"] == 5
+
+def test_too_rare_minority_class_is_refused(small_search):
+    X, y = _rare_positive_data(n_positive=1)
+    with pytest.raises(ValueError):
+        successive_halving_search(X, y, n_jobs=1)
@@ -0,0 +1,44 @@
+"""Sélection du modèle sous budgets de latence, taille et mémoire."""
+import pytest
+
+from config import settings
+from model_training import budget_violations, select_best_model, tradeoff_table
+
+MB = 1024 * 1024
+
+RESULTS = {
+    "Large": {"auc_score": 0.95, "accuracy": 0.93, "single_row_p99_latency_ms": 40.0, "model_size_bytes": 200 * MB, "memory_bytes": 300 * MB},
+    "Medium": {"auc_score": 0.92, "accuracy": 0.91, "single_row_p99_latency_ms": 4.0, "model_size_bytes": 20 * MB, "memory_bytes": 30 * MB},
+    "Small": {"auc_score": 0.88, "accuracy": 0.90, "single_row_p99_latency_ms": 1.0, "model_size_bytes": 1 * MB, "memory_bytes": 2 * MB}
+}
+
+@pytest.fixture
+def budgets(monkeypatch):
+    def apply(latency_ms, size_mb, memory_mb):
+        monkeypatch.setattr(settings, "SELECTION_MAX_P99_LATENCY_MS", latency_ms)
+        monkeypatch.setattr(settings, "SELECTION_MAX_MODEL_SIZE_MB", size_mb)
+        monkeypatch.setattr(settings, "SELECTION_MAX_MEMORY_MB", memory_mb)
+    return apply
+
+def test_best_auc_within_budgets(budgets):
+    budgets(10.0, 50.0, 100.0)
+    assert select_best_model(RESULTS) == "Medium"
+
+def test_unconstrained_budgets_pick_best_auc(budgets):
+    # Un budget à 0 n'est pas contraint
+    budgets(0, 0, 0)
+    assert select_best_model(RESULTS) == "Large"
+
+def test_no_candidate_within_budgets_falls_back_to_best_auc(budgets):
+    budgets(0.5, 0.5, 0.5)
+    assert select_best_model(RESULTS) == "Large"
+    table = tradeoff_table(RESULTS, selected="Large")
+    assert [row["model"] for row in table] == ["Large", "Medium", "Small"]
+    assert not any(row["within_budget"] for row in table)
+    assert [row["selected"] for row in table] == [True, False, False]
+
+def test_missing_measurements_are_not_constrained():
+    assert budget_violations({"auc_score": 0.9}, {"max_p99_latency_ms": 1.0, "max_model_size_mb": 1.0}) == []
+    assert budget_violations(RESULTS["Medium"], {"max_p99_latency_ms": 1.0, "max_model_size_mb": 0, "max_memory_mb": 10.0}) == [
+        "max_p99_latency_ms", "max_memory_mb"
+    ]
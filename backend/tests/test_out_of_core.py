@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+
+from sklearn.metrics import accuracy_score, roc_auc_score
+
+from config import settings
+from conftest import churn_table
+from out_of_core import ChunkedDataset, StreamingBinaryMetrics, train_out_of_core
+from training_pipeline import TrainingPipeline
+
+@pytest.fixture
+def numeric_csv(tmp_path):
+    path = tmp_path / "numeric.csv"
+    churn_table(categorical_labels=False).to_csv(path, index=False)
+    return str(path)
+
+def test_numeric_categorical_codes_pass_through(numeric_csv):
+    dataset = ChunkedDataset(numeric_csv, chunk_rows=150)
+    column = None
+    values = []
+    for X, _, _ in dataset.chunks():
+        column = dataset.feature_names.index('International plan')
+        values.append(X[:, column])
+    expected = churn_table(categorical_labels=False)['International plan'].to_numpy()
+    assert np.array_equal(np.concatenate(values), expected)
+
+def test_unknown_categorical_code_raises(tmp_path):
+    table = churn_table()
+    table.loc[3, 'Voice mail plan'] = "Maybe"
+    path = tmp_path / "bad.csv"
+    table.to_csv(path, index=False)
+    with pytest.raises(ValueError, match="Voice mail plan"):
+        list(ChunkedDataset(str(path), chunk_rows=100).chunks())
+
+def test_out_of_core_drops_the_same_features_as_the_reduce_stage(churn_csv, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "OUT_OF_CORE_CHUNK_ROWS", 120)
+    monkeypatch.setattr(settings, "OUT_OF_CORE_EPOCHS", 1)
+    in_memory = TrainingPipeline(churn_csv, cache_dir=str(tmp_path / "cache")).run()
+    result = train_out_of_core(churn_csv)
+    assert set(result['dropped_features']) == set(in_memory.dropped_features)
+    assert result['feature_names'] == in_memory.feature_names
+    assert result['scaler'].n_features_in_ == len(result['feature_names'])
+
+def _scores(n_rows: int = 2000, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    y = rng.integers(0, 2, size=n_rows)
+    probabilities = np.clip(rng.normal(0.4 + 0.2 * y, 0.2), 0.0, 1.0)
+    return y, probabilities
+
+def test_streaming_auc_matches_sklearn_on_bin_centres():
+    # Probabilités au centre des intervalles : l'histogramme ne perd rien, ex-aequo compris
+    y, probabilities = _scores()
+    probabilities = (np.floor(probabilities * 20).clip(max=19) + 0.5) / 20
+    metrics = StreamingBinaryMetrics(bins=20)
+    metrics.update(y, probabilities)
+    assert metrics.auc() == pytest.approx(roc_auc_score(y, probabilities), abs=1e-12)
+
+def test_streaming_metrics_accumulate_over_chunks():
+    y, probabilities = _scores()
+    metrics = StreamingBinaryMetrics()
+    for start in range(0, len(y), 300):
+        metrics.update(y[start:start + 300], probabilities[start:start + 300])
+    # Erreur bornée par les paires tombées dans un même intervalle
+    assert metrics.auc() == pytest.approx(roc_auc_score(y, probabilities), abs=1e-3)
+    assert metrics.accuracy() == pytest.approx(accuracy_score(y, probabilities > 0.5))
+
+def test_streaming_auc_without_both_classes_is_zero():
+    metrics = StreamingBinaryMetrics()
+    metrics.update(np.ones(5, dtype=int), np.linspace(0, 1, 5))
+    assert metrics.auc() == 0.0
@@ -0,0 +1,40 @@
+"""Entraînement parallèle des candidats : mêmes scores de CV que cross_val_score, quel que soit le pool."""
+import os
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import cross_val_score
+from sklearn.tree import DecisionTreeClassifier
+
+from model_training import parallelism_budget, train_candidates
+
+def _data(seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(240, 4))
+    y = (X[:, 0] + 0.5 * X[:, 1] + rng.normal(scale=0.5, size=240) > 0).astype(int)
+    return X[:180], y[:180], X[180:], y[180:]
+
+CANDIDATES = {
+    "Tree": DecisionTreeClassifier(max_depth=3, random_state=0),
+    "Logistic": LogisticRegression()
+}
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_cv_scores_match_cross_val_score(n_jobs):
+    X_train, y_train, X_test, y_test = _data()
+    results, models = train_candidates(CANDIDATES, X_train, y_train, X_test, y_test, ["a", "b", "c", "d"], n_jobs=n_jobs)
+    assert list(results) == list(CANDIDATES) and set(models) == set(CANDIDATES)
+    for name, estimator in CANDIDATES.items():
+        expected = cross_val_score(estimator, X_train, y_train, cv=5)
+        assert results[name]["cv_mean"] == pytest.approx(expected.mean())
+        assert results[name]["cv_std"] == pytest.approx(expected.std())
+    assert set(results["Tree"]["feature_importance"]) == {"a", "b", "c", "d"}
+    assert results["Logistic"]["feature_importance"] == {}
+
+def test_parallelism_budget_is_capped_by_available_cpus():
+    available = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    assert parallelism_budget(0) == available
+    assert parallelism_budget(-1) == available
+    assert parallelism_budget(1) == 1
+    assert parallelism_budget(available + 8) == available
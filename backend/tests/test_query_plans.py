@@ -0,0 +1,61 @@
+"""Plans d'exécution des requêtes MongoDB (voir check_query_plans.py), sur une base jetable.
+Ignoré si motor n'est pas installé ou si aucun mongod n'est joignable à MONGODB_URL."""
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+
+motor = pytest.importorskip("motor.motor_asyncio")
+pymongo = pytest.importorskip("pymongo")
+
+from config import settings
+
+def _mongod_reachable() -> bool:
+    client = pymongo.MongoClient(settings.MONGODB_URL, serverSelectionTimeoutMS=500)
+    try:
+        client.admin.command("ping")
+        return True
+    except Exception:
+        return False
+    finally:
+        client.close()
+
+pytestmark = pytest.mark.skipif(not _mongod_reachable(), reason="aucun mongod joignable")
+
+async def _seed_and_check(legacy: bool):
+    from check_query_plans import plan_failures
+    from database import MongoDB
+
+    database_name = f"churn_query_plans_{uuid.uuid4().hex[:8]}"
+    client = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGODB_URL)
+    now = datetime.now()
+    predictions = [
+        {"pid": f"p{index}", "cid": f"c{index}", "ts": now, "p": 0.8, "y": 1, "c": 0.8, "r": 2, "m": 0, "mv": "v1"}
+        for index in range(20)
+    ]
+    if legacy:
+        predictions.append({"prediction_id": "old", "created_at": now, "risk_level": "HIGH", "prediction": 1, "confidence": 0.9})
+    await client[database_name][settings.COLLECTION_PREDICTIONS].insert_many(predictions)
+    await client[database_name][settings.COLLECTION_CUSTOMERS].insert_many([
+        {"customer_id": f"c{index}", "created_at": now, "updated_at": now} for index in range(20)
+    ])
+
+    storage = MongoDB()
+    original_name = settings.DATABASE_NAME
+    settings.DATABASE_NAME = database_name
+    try:
+        await storage.connect()
+        assert storage.legacy_predictions == legacy
+        return await plan_failures(storage)
+    finally:
+        settings.DATABASE_NAME = original_name
+        await storage.close()
+        await client.drop_database(database_name)
+        client.close()
+
+def test_query_plans_use_indexes():
+    assert asyncio.run(_seed_and_check(legacy=False)) == []
+
+def test_legacy_branches_use_indexes_until_migration():
+    assert asyncio.run(_seed_and_check(legacy=True)) == []
@@ -0,0 +1,19 @@
+import pytest
+
+from conftest import customer_record
+from rescoring import check_scores_vary
+
+def scores(*probabilities):
+    return [{"churn_probability": probability} for probability in probabilities]
+
+def test_identical_scores_for_different_customers_abort():
+    customers = [customer_record(customer_id="A"), customer_record(customer_id="B", customer_service_calls=6)]
+    with pytest.raises(ValueError, match="Scores identiques"):
+        check_scores_vary(customers, scores(0.12, 0.12))
+
+def test_varied_scores_or_identical_profiles_pass():
+    check_scores_vary([customer_record(customer_id="A"), customer_record(customer_id="B", customer_service_calls=6)],
+                      scores(0.12, 0.8))
+    # Deux fiches aux features identiques peuvent légitimement avoir le même score
+    check_scores_vary([customer_record(customer_id="A", name="x"), customer_record(customer_id="B", name="y")],
+                      scores(0.3, 0.3))
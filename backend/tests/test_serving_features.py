@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+from sklearn.ensemble import RandomForestClassifier
+
+from conftest import customer_record
+from training_pipeline import TrainingPipeline, encode_categorical, serving_frame
+
+@pytest.fixture
+def trained(churn_csv, tmp_path):
+    data = TrainingPipeline(churn_csv, cache_dir=str(tmp_path / "cache")).run()
+    model = RandomForestClassifier(n_estimators=50, random_state=0).fit(data.X_train, data.y_train)
+    return data, model
+
+def test_serving_frame_uses_training_columns(trained):
+    data, _ = trained
+    frame = serving_frame([customer_record()], data.feature_names)
+    assert list(frame.columns) == data.feature_names
+    assert frame["Total day minutes"].iloc[0] == 180.0
+    assert frame["Service call ratio"].iloc[0] == pytest.approx(1 / 300)
+
+def test_different_customers_get_different_probabilities(trained):
+    data, model = trained
+    loyal = customer_record()
+    at_risk = customer_record(customer_service_calls=6, international_plan=1, total_day_minutes=320.0)
+    frame = serving_frame([loyal, at_risk], data.feature_names)
+    probabilities = model.predict_proba(data.scaler.transform(frame.to_numpy()))[:, 1]
+    assert probabilities[0] != probabilities[1]
+    assert probabilities[1] > probabilities[0]
+
+def test_missing_model_feature_raises(trained):
+    data, _ = trained
+    with pytest.raises(ValueError, match="Area code"):
+        serving_frame([customer_record()], data.feature_names + ["Area code"])
+    record = customer_record()
+    del record["total_day_minutes"]
+    with pytest.raises(ValueError, match="Total day minutes"):
+        serving_frame([record], data.feature_names)
+
+def test_encode_categorical_accepts_labels_and_codes():
+    assert encode_categorical(np.array(["No", "Yes", "Yes"], dtype=object), "International plan").tolist() == [0, 1, 1]
+    assert encode_categorical(np.array([0, 1, 0]), "International plan").tolist() == [0, 1, 0]
+    with pytest.raises(ValueError, match="Maybe"):
+        encode_categorical(np.array(["No", "Maybe"], dtype=object), "International plan")
@@ -0,0 +1,84 @@
+"""Ligne de totaux SQLite : tenue à l'insertion et à l'archivage, reconstruite si absente."""
+import asyncio
+import sqlite3
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from config import settings
+
+def _prediction(confidence: float, created_at: datetime):
+    return {
+        "prediction_id": str(uuid.uuid4()), "customer_id": "C1", "customer_name": None,
+        "created_at": created_at, "churn_probability": confidence, "prediction": 1,
+        "confidence": confidence, "risk_level": "HIGH", "message": "", "model_version": None
+    }
+
+def _table_totals(path: str):
+    conn = sqlite3.connect(path)
+    try:
+        return (
+            conn.execute("SELECT count, confidence_sum FROM prediction_totals WHERE id = 1").fetchone(),
+            conn.execute("SELECT COUNT(*), COALESCE(SUM(confidence), 0) FROM predictions").fetchone()
+        )
+    finally:
+        conn.close()
+
+@pytest.fixture
+def sqlite_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ARCHIVE_DIR", str(tmp_path / "archive"))
+    return str(tmp_path / "churn.db")
+
+def test_totals_follow_inserts_and_archive(sqlite_path):
+    from sqlite_storage import SQLiteStorage, _insert_prediction
+
+    async def scenario():
+        storage = SQLiteStorage(sqlite_path)
+        await storage.connect()
+        try:
+            old = datetime.now() - timedelta(days=400)
+            await storage._write(lambda conn: [_insert_prediction(conn, _prediction(0.6, old)) for _ in range(3)])
+            await storage.save_predictions([_prediction(0.9, datetime.now()) for _ in range(2)])
+            before = await storage.get_avg_confidence()
+            archived = await storage.archive_old_predictions(older_than_days=30) if storage.archive.available else 0
+            return before, archived, await storage.get_avg_confidence()
+        finally:
+            await storage.close()
+
+    before, archived, after = asyncio.run(scenario())
+    assert before == pytest.approx((3 * 0.6 + 2 * 0.9) / 5)
+    # L'archive reprend les lignes supprimées : la moyenne globale ne bouge pas
+    assert after == pytest.approx(before)
+    totals, recomputed = _table_totals(sqlite_path)
+    assert totals[0] == recomputed[0] == 5 - archived
+    assert totals[1] == pytest.approx(recomputed[1])
+
+def test_missing_totals_row_is_rebuilt(sqlite_path):
+    from sqlite_storage import SQLiteStorage
+
+    async def open_and_save():
+        storage = SQLiteStorage(sqlite_path)
+        await storage.connect()
+        try:
+            await storage.save_predictions([_prediction(0.7, datetime.now()) for _ in range(4)])
+        finally:
+            await storage.close()
+
+    asyncio.run(open_and_save())
+    conn = sqlite3.connect(sqlite_path)
+    conn.execute("DELETE FROM prediction_totals")
+    conn.commit()
+    conn.close()
+
+    async def reopen():
+        storage = SQLiteStorage(sqlite_path)
+        await storage.connect()
+        try:
+            return await storage.get_avg_confidence()
+        finally:
+            await storage.close()
+
+    assert asyncio.run(reopen()) == pytest.approx(0.7)
+    totals, recomputed = _table_totals(sqlite_path)
+    assert totals[0] == recomputed[0] == 4
@@ -0,0 +1,93 @@
+"""Ordonnanceur single-flight : fusion des demandes en attente et montée de mode."""
+import asyncio
+import threading
+
+from training_jobs import TrainingCancelled, TrainingScheduler
+
+class BlockingTrainer:
+    """Fonction d'entraînement factice : bloque jusqu'à release() et note les modes entraînés"""
+
+    def __init__(self):
+        self.modes = []
+        self.started = threading.Event()
+        self.released = threading.Event()
+
+    def __call__(self, job):
+        self.modes.append(job.mode)
+        self.started.set()
+        self.released.wait(timeout=5)
+        if job.cancel_requested:
+            raise TrainingCancelled(job.job_id)
+        return {"mode": job.mode}
+
+    def release(self):
+        self.released.set()
+
+async def _drain(scheduler: TrainingScheduler):
+    while scheduler.running is not None or scheduler.pending is not None:
+        await asyncio.sleep(0.01)
+
+def test_requests_during_training_coalesce_and_upgrade_mode():
+    trainer = BlockingTrainer()
+    completed = []
+
+    async def on_success(job):
+        completed.append(job.job_id)
+
+    async def scenario():
+        scheduler = TrainingScheduler(trainer, on_success=on_success)
+        running = scheduler.request("incremental")
+        await asyncio.to_thread(trainer.started.wait, 5)
+
+        pending = scheduler.request("incremental")
+        assert pending is not running and pending.mode == "incremental"
+        # Une demande complète remplace le mode ; une demande incrémentale ne le rétrograde pas
+        assert scheduler.request("full") is pending and pending.mode == "full"
+        assert scheduler.request("incremental") is pending and pending.mode == "full"
+        assert scheduler.request("out_of_core") is pending and pending.mode == "out_of_core"
+        assert pending.requests == 4
+
+        trainer.release()
+        await _drain(scheduler)
+        return scheduler, running, pending
+
+    scheduler, running, pending = asyncio.run(scenario())
+    assert trainer.modes == ["incremental", "out_of_core"]
+    assert [job.state for job in (running, pending)] == ["completed", "completed"]
+    assert completed == [running.job_id, pending.job_id]
+    assert [job["job_id"] for job in scheduler.status()["history"]] == [pending.job_id, running.job_id]
+
+def test_cancelled_pending_job_is_not_trained():
+    trainer = BlockingTrainer()
+
+    async def scenario():
+        scheduler = TrainingScheduler(trainer)
+        running = scheduler.request("full")
+        await asyncio.to_thread(trainer.started.wait, 5)
+        pending = scheduler.request("full")
+        assert scheduler.cancel(pending.job_id) is pending
+        # La demande suivante ouvre un nouveau job en attente
+        replacement = scheduler.request("incremental")
+        assert replacement is not pending
+        trainer.release()
+        await _drain(scheduler)
+        return running, pending, replacement
+
+    running, pending, replacement = asyncio.run(scenario())
+    assert pending.state == "cancelled"
+    assert running.state == replacement.state == "completed"
+    assert trainer.modes == ["full", "incremental"]
+
+def test_cancel_running_job_marks_it_cancelled():
+    trainer = BlockingTrainer()
+
+    async def scenario():
+        scheduler = TrainingScheduler(trainer)
+        running = scheduler.request("full")
+        await asyncio.to_thread(trainer.started.wait, 5)
+        assert scheduler.cancel(running.job_id) is running and running.cancel_requested
+        trainer.release()
+        await _drain(scheduler)
+        return running
+
+    assert asyncio.run(scenario()).state == "cancelled"
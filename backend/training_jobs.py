@@ -0,0 +1,150 @@
+import asyncio
+import threading
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# full : réentraînement complet ; incremental : warm start sur les nouvelles données labellisées ;
+# out_of_core : apprentissage en flux (partial_fit) sur un fichier plus grand que la mémoire
+TRAINING_MODES = ["full", "incremental", "out_of_core"]
+
+class TrainingCancelled(Exception):
+    """Levée quand le job a été annulé (dans le worker, puis relayée par train_in_worker)"""
+
+class TrainingJob:
+    """Job d'entraînement : état, progression et demande d'annulation. La progression et
+    l'annulation passent par train_in_worker (file de messages et Event du processus worker)"""
+
+    def __init__(self, mode: str = "full"):
+        self.job_id = str(uuid.uuid4())
+        self.mode = mode
+        self.state = "queued"
+        self.requested_at = datetime.now().isoformat()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.requests = 1
+        self.stage = "queued"
+        self.progress = 0.0
+        self.error: Optional[str] = None
+        self.result: Any = None
+        self._cancelled = threading.Event()
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "mode": self.mode,
+            "state": self.state,
+            "stage": self.stage,
+            "progress": self.progress,
+            "requests": self.requests,
+            "requested_at": self.requested_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "cancel_requested": self.cancel_requested,
+            "error": self.error
+        }
+
+class TrainingScheduler:
+    """Ordonnanceur single-flight : un seul entraînement à la fois, les demandes
+    reçues pendant un entraînement sont fusionnées dans un unique job en attente"""
+
+    def __init__(self, train: Callable[[TrainingJob], Any],
+                 on_success: Optional[Callable[[TrainingJob], Awaitable[None]]] = None,
+                 history_size: int = 20):
+        self.train = train
+        self.on_success = on_success
+        self.running: Optional[TrainingJob] = None
+        self.pending: Optional[TrainingJob] = None
+        self.history: deque = deque(maxlen=history_size)
+        self._task: Optional[asyncio.Task] = None
+
+    def request(self, mode: str = "full") -> TrainingJob:
+        """Demander un entraînement ; retourne le job qui prendra la demande en charge"""
+        if self.pending is not None:
+            # Une demande attend déjà : le même entraînement servira les deux
+            # (un réentraînement complet ou out-of-core couvre aussi une demande incrémentale)
+            self.pending.requests += 1
+            if mode != "incremental":
+                self.pending.mode = mode
+            return self.pending
+
+        job = TrainingJob(mode)
+        if self.running is None:
+            self._start(job)
+        else:
+            # L'entraînement en cours a lu des données plus anciennes : en relancer un seul ensuite
+            self.pending = job
+        return job
+
+    def cancel(self, job_id: str) -> Optional[TrainingJob]:
+        """Annuler un job en attente ou en cours (l'entraînement s'arrête à la prochaine étape)"""
+        if self.pending is not None and self.pending.job_id == job_id:
+            job, self.pending = self.pending, None
+            job.cancel()
+            job.state = "cancelled"
+            job.finished_at = datetime.now().isoformat()
+            self.history.appendleft(job)
+            return job
+
+        if self.running is not None and self.running.job_id == job_id:
+            self.running.cancel()
+            return self.running
+
+        return None
+
+    def get(self, job_id: str) -> Optional[TrainingJob]:
+        for job in self._jobs():
+            if job.job_id == job_id:
+                return job
+        return None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self.running.to_dict() if self.running else None,
+            "pending": self.pending.to_dict() if self.pending else None,
+            "history": [job.to_dict() for job in self.history]
+        }
+
+    def _jobs(self) -> List[TrainingJob]:
+        jobs = [job for job in (self.running, self.pending) if job is not None]
+        return jobs + list(self.history)
+
+    def _start(self, job: TrainingJob):
+        job.state = "running"
+        job.stage = "starting"
+        job.started_at = datetime.now().isoformat()
+        self.running = job
+        self._task = asyncio.create_task(self._run(job))
+
+    async def _run(self, job: TrainingJob):
+        try:
+            # L'entraînement tourne hors de la boucle d'événements
+            job.result = await asyncio.to_thread(self.train, job)
+            job.state = "completed"
+            job.stage = "completed"
+            job.progress = 1.0
+            if self.on_success is not None:
+                await self.on_success(job)
+        except TrainingCancelled:
+            job.state = "cancelled"
+            print(f"⏹️  Entraînement {job.job_id} annulé")
+        except Exception as e:
+            job.state = "failed"
+            job.error = str(e)
+            print(f"❌ Erreur lors de l'entraînement {job.job_id}: {e}")
+        finally:
+            job.finished_at = datetime.now().isoformat()
+            self.history.appendleft(job)
+            self.running = None
+
+            next_job, self.pending = self.pending, None
+            if next_job is not None:
+                self._start(next_job)
@@ -0,0 +1,332 @@
+import hashlib
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from config import settings
+
+# Étapes du pipeline, dans l'ordre. La sortie de chaque étape est mise en cache (fichier .npz)
+# sous une clé dérivée du hash du fichier d'entrée, de la clé de l'étape précédente et des
+# paramètres de l'étape : une étape n'est recalculée que si elle ou une étape amont a changé.
+STAGES = ["load", "engineer", "encode", "split", "reduce", "scale"]
+
+# À incrémenter quand le code d'une étape change, pour invalider les caches existants
+PIPELINE_VERSION = "2"
+
+CATEGORICAL_COLUMNS = ['International plan', 'Voice mail plan']
+TARGET_COLUMN = 'Churn'
+# Area code n'est pas connu des fiches clients servies par l'API : il n'entre pas dans les features
+DROPPED_COLUMNS = ['Churn', 'State', 'Area code']
+
+# Codage fixe des variables Yes/No, partagé par l'entraînement, l'out-of-core et le service
+CATEGORY_CODES = {'No': 0, 'Yes': 1}
+
+# Champs des fiches clients (API, stockage) -> colonnes du fichier d'entraînement
+SERVING_COLUMNS = {
+    'account_length': 'Account length',
+    'international_plan': 'International plan',
+    'voice_mail_plan': 'Voice mail plan',
+    'number_vmail_messages': 'Number vmail messages',
+    'total_day_minutes': 'Total day minutes',
+    'total_day_calls': 'Total day calls',
+    'total_day_charge': 'Total day charge',
+    'total_eve_minutes': 'Total eve minutes',
+    'total_eve_calls': 'Total eve calls',
+    'total_eve_charge': 'Total eve charge',
+    'total_night_minutes': 'Total night minutes',
+    'total_night_calls': 'Total night calls',
+    'total_night_charge': 'Total night charge',
+    'total_intl_minutes': 'Total intl minutes',
+    'total_intl_calls': 'Total intl calls',
+    'total_intl_charge': 'Total intl charge',
+    'customer_service_calls': 'Customer service calls'
+}
+
+Arrays = Dict[str, np.ndarray]
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """Hash SHA-256 du contenu d'un fichier"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _table_arrays(columns: List[str], values: List[np.ndarray]) -> Arrays:
+    """Représentation d'un tableau en tableaux NumPy (noms de colonnes + une colonne par tableau)"""
+    arrays = {"columns": np.array(columns)}
+    for index, column in enumerate(values):
+        arrays[f"c{index}"] = column
+    return arrays
+
+def _table_columns(arrays: Arrays) -> Dict[str, np.ndarray]:
+    return {str(name): arrays[f"c{index}"] for index, name in enumerate(arrays["columns"])}
+
+def engineer_features(table: Dict[str, Any]) -> Dict[str, Any]:
+    """Feature engineering avancé (colonnes NumPy ou pandas ; aussi utilisé par l'entraînement out-of-core)"""
+    table['Total minutes'] = table['Total day minutes'] + table['Total eve minutes'] + table['Total night minutes']
+    table['Total calls'] = table['Total day calls'] + table['Total eve calls'] + table['Total night calls']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        table['Avg call duration'] = table['Total minutes'] / table['Total calls']
+        table['Service call ratio'] = table['Customer service calls'] / table['Total calls']
+    return table
+
+def encode_categorical(values, column: str) -> np.ndarray:
+    """Codes 0/1 d'une variable Yes/No : les libellés sont traduits, les codes 0/1 déjà numériques
+    passent tels quels ; toute autre valeur lève une erreur plutôt que d'être codée 0"""
+    values = pd.Series(np.asarray(values, dtype=object))
+    codes = pd.to_numeric(values.map(lambda value: CATEGORY_CODES.get(value.strip(), value) if isinstance(value, str) else value),
+                          errors='coerce')
+    unknown = ~codes.isin([0, 1])
+    if unknown.any():
+        raise ValueError(f"Valeurs inconnues pour {column}: {', '.join(sorted(set(map(str, values[unknown]))))}")
+    return codes.to_numpy(dtype=np.int64)
+
+def serving_frame(records: List[Dict[str, Any]], feature_names: List[str]) -> pd.DataFrame:
+    """Features du modèle pour des fiches clients (champs snake_case) : mêmes noms de colonnes,
+    même encodage et même feature engineering que l'entraînement, dans l'ordre du modèle.
+    Une feature du modèle absente des fiches lève une erreur (jamais de remplissage à 0)."""
+    frame = pd.DataFrame.from_records(records).rename(columns=SERVING_COLUMNS)
+    missing = [column for column in SERVING_COLUMNS.values() if column not in frame.columns]
+    if missing:
+        raise ValueError(f"Champs clients manquants: {', '.join(missing)}")
+
+    table = {column: frame[column].astype(np.float64) for column in SERVING_COLUMNS.values() if column not in CATEGORICAL_COLUMNS}
+    for column in CATEGORICAL_COLUMNS:
+        table[column] = encode_categorical(frame[column], column)
+    table = engineer_features(table)
+
+    feature_names = [str(name) for name in feature_names]
+    missing = [name for name in feature_names if name not in table]
+    if missing:
+        raise ValueError(f"Features du modèle non calculables à partir des fiches clients: {', '.join(missing)}")
+    return pd.DataFrame({name: np.asarray(table[name], dtype=np.float64) for name in feature_names})
+
+def collinear_features_from_covariance(covariance: np.ndarray, feature_names: List[str],
+                                      r2_threshold: float) -> Tuple[List[int], Dict[str, float]]:
+    """Features constantes ou expliquées linéairement par les autres (R² >= r2_threshold), à partir
+    de la matrice de covariance (R² d'une régression avec constante : c_jS · C_SS⁻¹ · c_Sj / c_jj).
+    Parcours glouton de la dernière à la première colonne : les features dérivées (charges, totaux
+    calculés) sont retirées avant les colonnes dont elles dépendent. Le résultat dépend de l'ordre
+    des colonnes (dans un groupe colinéaire, c'est la première colonne qui est gardée) et le coût est
+    d'une résolution p×p par feature, soit O(p⁴) : adapté aux quelques dizaines de colonnes du jeu de
+    churn, pas à des milliers de features."""
+    kept = list(range(covariance.shape[0]))
+    dropped = {}
+    for index in reversed(range(covariance.shape[0])):
+        variance = covariance[index, index]
+        others = [other for other in kept if other != index]
+        if variance <= 0:
+            r2 = 1.0
+        elif not others:
+            r2 = 0.0
+        else:
+            coefficients, *_ = np.linalg.lstsq(covariance[np.ix_(others, others)], covariance[others, index], rcond=None)
+            r2 = float(covariance[index, others] @ coefficients / variance)
+        if r2 >= r2_threshold:
+            kept.remove(index)
+            dropped[feature_names[index]] = float(r2)
+    return kept, dropped
+
+def collinear_features(X: np.ndarray, feature_names: List[str], r2_threshold: float) -> Tuple[List[int], Dict[str, float]]:
+    """collinear_features_from_covariance sur les lignes complètes (sans NaN/inf) de X"""
+    X = X[np.isfinite(X).all(axis=1)]
+    return collinear_features_from_covariance(np.cov(X, rowvar=False, bias=True), feature_names, r2_threshold)
+
+def feature_indices(available: List[str], selected: List[str]) -> List[int]:
+    """Position des features du modèle parmi les colonnes produites par le pipeline"""
+    missing = [name for name in selected if name not in available]
+    if missing:
+        raise ValueError(f"Features absentes des données: {', '.join(missing)}")
+    return [available.index(name) for name in selected]
+
+def scaler_from_arrays(arrays: Arrays) -> StandardScaler:
+    """Reconstruire le StandardScaler ajusté à partir des statistiques mises en cache"""
+    scaler = StandardScaler()
+    scaler.mean_ = arrays["scaler_mean"]
+    scaler.scale_ = arrays["scaler_scale"]
+    scaler.var_ = arrays["scaler_var"]
+    scaler.n_samples_seen_ = int(arrays["scaler_n_samples_seen"])
+    scaler.n_features_in_ = len(scaler.mean_)
+    return scaler
+
+class PreparedData:
+    """Sortie du pipeline : jeux d'entraînement et de test standardisés, prêts pour les modèles"""
+
+    def __init__(self, arrays: Arrays, data_hash: str, cache: Dict[str, str]):
+        self.X_train = arrays["X_train"]
+        self.X_test = arrays["X_test"]
+        self.y_train = arrays["y_train"]
+        self.y_test = arrays["y_test"]
+        self.feature_names: List[str] = [str(name) for name in arrays["feature_names"]]
+        # Features retirées par l'étape reduce, avec leur R² par rapport aux features conservées
+        self.dropped_features = {str(name): float(r2) for name, r2 in zip(arrays["dropped_features"], arrays["dropped_r2"])}
+        self.scaler = scaler_from_arrays(arrays)
+        self.data_hash = data_hash
+        self.cache = cache
+
+class TrainingPipeline:
+    """Pipeline de préparation des données : load → engineer → encode → split → reduce → scale"""
+
+    def __init__(self, data_path: str, cache_dir: Optional[str] = None,
+                 test_size: float = 0.2, random_state: int = 42):
+        self.data_path = data_path
+        self.cache_dir = cache_dir or settings.TRAINING_CACHE_DIR
+        self.params = {
+            "load": {},
+            "engineer": {},
+            "encode": {"categorical": CATEGORICAL_COLUMNS, "dropped": DROPPED_COLUMNS},
+            "split": {"test_size": test_size, "random_state": random_state},
+            "reduce": {"r2_threshold": settings.FEATURE_COLLINEARITY_R2},
+            "scale": {}
+        }
+
+    # --- Cache ---
+
+    def stage_keys(self, data_hash: str) -> List[Tuple[str, str]]:
+        """Clé de cache de chaque étape, chaînée sur la clé de l'étape précédente"""
+        keys = []
+        previous = data_hash
+        for stage in STAGES:
+            payload = json.dumps([PIPELINE_VERSION, previous, stage, self.params[stage]], sort_keys=True)
+            previous = hashlib.sha256(payload.encode()).hexdigest()
+            keys.append((stage, previous))
+        return keys
+
+    def _cache_path(self, stage: str, key: str) -> str:
+        return os.path.join(self.cache_dir, stage, f"{key}.npz")
+
+    def _load_cached(self, stage: str, key: str) -> Optional[Arrays]:
+        path = self._cache_path(stage, key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as cached:
+                return {name: cached[name] for name in cached.files}
+        except Exception as e:
+            print(f"⚠️  Cache d'étape illisible ({stage}): {e}")
+            return None
+
+    def _save_cached(self, stage: str, key: str, arrays: Arrays):
+        path = self._cache_path(stage, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    # --- Exécution ---
+
+    def run(self, report: Optional[Callable[[str, float], None]] = None) -> PreparedData:
+        """Exécuter le pipeline complet et retourner les jeux standardisés"""
+        data_hash = file_hash(self.data_path)
+        arrays, cache = self.run_stages(report, data_hash=data_hash)
+        return PreparedData(arrays, data_hash, cache)
+
+    def run_stages(self, report: Optional[Callable[[str, float], None]] = None, stop_after: str = "scale",
+                   data_hash: Optional[str] = None) -> Tuple[Arrays, Dict[str, str]]:
+        """Exécuter les étapes jusqu'à `stop_after` en reprenant à partir de la dernière étape en cache"""
+        report = report or (lambda stage, progress: None)
+        data_hash = data_hash or file_hash(self.data_path)
+        keys = self.stage_keys(data_hash)[:STAGES.index(stop_after) + 1]
+
+        # Reprendre depuis l'étape en cache la plus avancée ; les étapes amont ne sont pas relues
+        cache = {stage: "skipped" for stage, _ in keys}
+        arrays: Optional[Arrays] = None
+        start = 0
+        for position in range(len(keys) - 1, -1, -1):
+            stage, key = keys[position]
+            arrays = self._load_cached(stage, key)
+            if arrays is not None:
+                cache[stage] = "hit"
+                start = position + 1
+                break
+
+        for position in range(start, len(keys)):
+            stage, key = keys[position]
+            report(stage, 0.02 + 0.1 * position / len(keys))
+            arrays = getattr(self, f"_{stage}")(arrays)
+            self._save_cached(stage, key, arrays)
+            cache[stage] = "miss"
+
+        print(f"🗂️  Pipeline de données: {', '.join(f'{stage}={status}' for stage, status in cache.items())}")
+        return arrays, cache
+
+    # --- Étapes ---
+
+    def _load(self, _: Optional[Arrays]) -> Arrays:
+        # Charger les données
+        data = pd.read_csv(self.data_path)
+        values = [
+            data[column].astype(str).to_numpy() if data[column].dtype == 'object' else data[column].to_numpy()
+            for column in data.columns
+        ]
+        return _table_arrays(list(data.columns), values)
+
+    def _engineer(self, arrays: Arrays) -> Arrays:
+        table = engineer_features(_table_columns(arrays))
+        return _table_arrays(list(table), list(table.values()))
+
+    def _encode(self, arrays: Arrays) -> Arrays:
+        # Encoder les variables catégorielles
+        table = _table_columns(arrays)
+        for column in CATEGORICAL_COLUMNS:
+            if column in table:
+                table[column] = encode_categorical(table[column], column)
+
+        # Préparer les features
+        feature_names = [column for column in table if column not in DROPPED_COLUMNS]
+        return {
+            "X": np.column_stack([table[column].astype(np.float64) for column in feature_names]),
+            "y": table[TARGET_COLUMN].astype(np.int64),
+            "feature_names": np.array(feature_names)
+        }
+
+    def _split(self, arrays: Arrays) -> Arrays:
+        # Split des données
+        params = self.params["split"]
+        X_train, X_test, y_train, y_test = train_test_split(
+            arrays["X"], arrays["y"], test_size=params["test_size"],
+            random_state=params["random_state"], stratify=arrays["y"]
+        )
+        return {
+            "X_train": X_train, "X_test": X_test, "y_train": y_train, "y_test": y_test,
+            "feature_names": arrays["feature_names"]
+        }
+
+    def _reduce(self, arrays: Arrays) -> Arrays:
+        # Élimination des features redondantes, détectées sur le jeu d'entraînement uniquement
+        feature_names = [str(name) for name in arrays["feature_names"]]
+        kept, dropped = collinear_features(arrays["X_train"], feature_names, self.params["reduce"]["r2_threshold"])
+        if dropped:
+            print(f"✂️  Features redondantes retirées: {', '.join(dropped)}")
+        return {
+            "X_train": arrays["X_train"][:, kept],
+            "X_test": arrays["X_test"][:, kept],
+            "y_train": arrays["y_train"],
+            "y_test": arrays["y_test"],
+            "feature_names": np.array([feature_names[index] for index in kept]),
+            "dropped_features": np.array(list(dropped), dtype=str),
+            "dropped_r2": np.array(list(dropped.values()), dtype=np.float64)
+        }
+
+    def _scale(self, arrays: Arrays) -> Arrays:
+        # Standardisation
+        scaler = StandardScaler()
+        return {
+            "X_train": scaler.fit_transform(arrays["X_train"]),
+            "X_test": scaler.transform(arrays["X_test"]),
+            "y_train": arrays["y_train"],
+            "y_test": arrays["y_test"],
+            "feature_names": arrays["feature_names"],
+            "dropped_features": arrays["dropped_features"],
+            "dropped_r2": arrays["dropped_r2"],
+            "scaler_mean": scaler.mean_,
+            "scaler_scale": scaler.scale_,
+            "scaler_var": scaler.var_,
+            "scaler_n_samples_seen": np.asarray(scaler.n_samples_seen_)
+        }
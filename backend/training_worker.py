@@ -0,0 +1,513 @@
+import copy
+import hashlib
+import json
+import multiprocessing
+import os
+import queue
+import shutil
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import joblib
+from joblib.externals.loky import get_reusable_executor
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, HistGradientBoostingClassifier
+from sklearn.metrics import accuracy_score, roc_auc_score
+
+from config import settings
+from model_training import train_candidates, select_best_model, selection_budgets, tradeoff_table
+import model_training
+import training_pipeline
+from training_pipeline import TrainingPipeline, file_hash, feature_indices
+from out_of_core import train_out_of_core
+import hyperparameter_search
+from hyperparameter_search import successive_halving_search, build_searched_model, search_settings
+import model_compression
+from model_compression import compress_model, compression_settings
+from training_jobs import TrainingJob, TrainingCancelled
+from evaluation import evaluate_version
+
+# Les entraînements écrivent chacun une version d'artefacts dans MODELS_DIR/versions/<version>/ ;
+# le fichier MODELS_DIR/CURRENT désigne la version servie par l'API.
+VERSIONS_DIR = os.path.join(settings.MODELS_DIR, "versions")
+CURRENT_POINTER = os.path.join(settings.MODELS_DIR, "CURRENT")
+# Index des runs : clé de run (données + code + paramètres) -> version produite, compteurs hit/miss
+RUNS_INDEX = os.path.join(settings.MODELS_DIR, "runs.json")
+# Historique des activations (entraînement ou réutilisation d'une version), conservé dans runs.json
+MAX_ACTIVATIONS = 500
+
+CV_FOLDS = 5
+
+def current_model_dir() -> str:
+    """Répertoire des artefacts à servir (version courante, sinon MODELS_DIR pour les anciens modèles non versionnés)"""
+    if os.path.exists(CURRENT_POINTER):
+        with open(CURRENT_POINTER) as f:
+            version = f.read().strip()
+        version_dir = os.path.join(VERSIONS_DIR, version)
+        if version and os.path.isdir(version_dir):
+            return version_dir
+    return settings.MODELS_DIR
+
+def current_model_version() -> Optional[str]:
+    """Nom de la version courante, ou None si les artefacts ne sont pas versionnés"""
+    model_dir = current_model_dir()
+    return os.path.basename(model_dir) if model_dir != settings.MODELS_DIR else None
+
+def publish_version(version: str):
+    """Désigner une version comme courante (remplacement atomique du pointeur)"""
+    tmp_path = CURRENT_POINTER + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(version)
+    os.replace(tmp_path, CURRENT_POINTER)
+
+def build_candidates() -> Dict[str, Any]:
+    """Modèles candidats du tournoi"""
+    return {
+        'Random Forest': RandomForestClassifier(n_estimators=200, random_state=42, max_depth=15),
+        'Gradient Boosting': GradientBoostingClassifier(n_estimators=100, random_state=42),
+        'Hist Gradient Boosting': HistGradientBoostingClassifier(max_iter=200, learning_rate=0.1, random_state=42)
+    }
+
+# --- Cache des runs adressé par contenu ---
+
+def code_version() -> str:
+    """Hash du code qui produit les artefacts (modules d'entraînement)"""
+    digest = hashlib.sha256()
+    modules = [__file__, model_training.__file__, training_pipeline.__file__, hyperparameter_search.__file__, model_compression.__file__]
+    for module_path in sorted(modules):
+        with open(module_path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def training_run_key(data_hash: str, candidates: Dict[str, Any], pipeline_params: Dict[str, Any]) -> str:
+    """Identifiant d'un run : hash des données, du code et des paramètres"""
+    payload = json.dumps({
+        "data": data_hash,
+        "code": code_version(),
+        "pipeline": pipeline_params,
+        "candidates": {name: model.get_params() for name, model in candidates.items()},
+        "cv": CV_FOLDS,
+        "search": search_settings() if settings.SEARCH_ENABLED else None,
+        "selection": selection_budgets(),
+        "compression": compression_settings()
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def _load_runs_index() -> Dict[str, Any]:
+    if os.path.exists(RUNS_INDEX):
+        with open(RUNS_INDEX) as f:
+            return json.load(f)
+    return {"runs": {}, "hits": 0, "misses": 0, "activations": []}
+
+def _save_runs_index(index: Dict[str, Any]):
+    os.makedirs(settings.MODELS_DIR, exist_ok=True)
+    tmp_path = RUNS_INDEX + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp_path, RUNS_INDEX)
+
+def _record_activation(index: Dict[str, Any], version: str, run_key: str, status: str) -> Dict[str, Any]:
+    """Consigner comment une version a été obtenue (hit du cache ou nouvel entraînement)"""
+    activation = {
+        "version": version, "run_key": run_key, "status": status, "activated_at": datetime.now().isoformat(),
+        "hits": index["hits"], "misses": index["misses"]
+    }
+    index["activations"] = (index.get("activations", []) + [activation])[-MAX_ACTIVATIONS:]
+    return activation
+
+def version_activations(version: str) -> List[Dict[str, Any]]:
+    """Activations d'une version, la plus récente en dernier"""
+    return [activation for activation in _load_runs_index().get("activations", []) if activation["version"] == version]
+
+def _cached_run(index: Dict[str, Any], run_key: str) -> Optional[str]:
+    """Version déjà produite pour cette clé, si ses artefacts sont complets"""
+    version = index["runs"].get(run_key)
+    if version is None:
+        return None
+    version_dir = os.path.join(VERSIONS_DIR, version)
+    required = ['best_churn_model.pkl', 'scaler.pkl', 'feature_names.pkl', 'training_metrics.json']
+    if all(os.path.exists(os.path.join(version_dir, name)) for name in required):
+        return version
+    return None
+
+def _parse_cpu_list(value: str) -> List[int]:
+    """Liste de CPU au format "0,1" ou "2-5" """
+    cpus = []
+    for part in value.split(","):
+        part = part.strip()
+        if "-" in part:
+            first, last = part.split("-")
+            cpus.extend(range(int(first), int(last) + 1))
+        elif part:
+            cpus.append(int(part))
+    return cpus
+
+def _apply_cpu_budget():
+    """Baisser la priorité du worker et le restreindre aux CPU configurés"""
+    if settings.TRAINING_NICENESS and hasattr(os, "nice"):
+        try:
+            os.nice(settings.TRAINING_NICENESS)
+        except OSError as e:
+            print(f"⚠️  Impossible d'appliquer la niceness d'entraînement: {e}")
+    if settings.TRAINING_CPU_AFFINITY and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, _parse_cpu_list(settings.TRAINING_CPU_AFFINITY))
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Impossible d'appliquer l'affinité CPU d'entraînement: {e}")
+
+def train_and_save_model_advanced(output_dir: str, report: Optional[Callable[[str, float], None]] = None,
+                                  run_cache: Optional[Dict[str, Any]] = None):
+    """Fonction d'entraînement du modèle avec des fonctionnalités avancées (artefacts écrits dans output_dir)"""
+    print("🔮 Démarrage de l'entraînement du modèle avancé...")
+    report = report or (lambda stage, progress: None)
+    
+    try:
+        # Préparation des données (étapes en cache si le fichier d'entrée n'a pas changé)
+        data = TrainingPipeline(settings.TRAINING_DATA_PATH).run(report)
+        X_train_scaled, X_test_scaled = data.X_train, data.X_test
+        y_train, y_test = data.y_train, data.y_test
+        scaler = data.scaler
+        
+        # Entraînement de multiple modèles
+        models = build_candidates()
+        
+        # Recherche d'hyperparamètres : la configuration retenue rejoint le tournoi
+        search_result = None
+        if settings.SEARCH_ENABLED:
+            report("hyperparameter_search", 0.15)
+            search_result = successive_halving_search(X_train_scaled, y_train, report)
+            models[f"{search_result['best']['family']} (search)"] = build_searched_model(search_result)
+        
+        # CV et fits finaux de tous les candidats en parallèle
+        report("training_candidates", 0.5 if search_result else 0.15)
+        model_results, fitted_models = train_candidates(models, X_train_scaled, y_train, X_test_scaled, y_test, data.feature_names, cv=CV_FOLDS)
+        best_name = select_best_model(model_results)
+        best_model = fitted_models[best_name]
+        best_score = model_results[best_name]['auc_score']
+        
+        # Sauvegarde du meilleur modèle
+        os.makedirs(output_dir, exist_ok=True)
+        
+        joblib.dump(best_model, os.path.join(output_dir, 'best_churn_model.pkl'))
+        joblib.dump(scaler, os.path.join(output_dir, 'scaler.pkl'))
+        joblib.dump(data.feature_names, os.path.join(output_dir, 'feature_names.pkl'))
+        
+        # Sauvegarde des métriques
+        metrics = {
+            'training_date': datetime.now().isoformat(),
+            'best_model': best_name,
+            'best_auc_score': best_score,
+            'model_comparison': model_results,
+            'feature_names': data.feature_names,
+            'dropped_features': data.dropped_features,
+            'data_hash': data.data_hash,
+            'data_pipeline': data.cache,
+            'run_cache': run_cache or {}
+        }
+        
+        # Tableau des compromis qualité / latence / taille de tous les candidats
+        selection = {'budgets': selection_budgets(), 'selected': best_name, 'candidates': tradeoff_table(model_results, best_name)}
+        with open(os.path.join(output_dir, 'model_selection.json'), 'w') as f:
+            json.dump(selection, f, indent=2)
+        metrics['model_selection'] = {'budgets': selection['budgets'], 'tradeoff_file': 'model_selection.json'}
+        
+        # Artefact compressé pour le service à fort débit, avec son rapport de fidélité
+        if settings.COMPRESSION_ENABLED:
+            report("compression", 0.9)
+            compressed_model, compression_report = compress_model(best_model, X_train_scaled, y_train, X_test_scaled, y_test)
+            if compressed_model is not None:
+                joblib.dump(compressed_model, os.path.join(output_dir, 'compressed_churn_model.pkl'))
+            with open(os.path.join(output_dir, 'compression_report.json'), 'w') as f:
+                json.dump(compression_report, f, indent=2, default=str)
+            metrics['compression'] = {
+                'selected': compression_report['selected'],
+                'artifact': 'compressed_churn_model.pkl' if compressed_model is not None else None,
+                'report_file': 'compression_report.json'
+            }
+        
+        # Configuration retenue et trace complète de la recherche, à côté des métriques
+        if search_result is not None:
+            with open(os.path.join(output_dir, 'search_results.json'), 'w') as f:
+                json.dump(search_result, f, indent=2, default=str)
+            metrics['hyperparameter_search'] = {
+                'best': search_result['best'],
+                'elapsed_seconds': search_result['elapsed_seconds'],
+                'stopped_by_time_budget': search_result['stopped_by_time_budget'],
+                'evaluations': len(search_result['trace']),
+                'trace_file': 'search_results.json'
+            }
+        
+        report("saving", 0.95)
+        with open(os.path.join(output_dir, 'training_metrics.json'), 'w') as f:
+            json.dump(metrics, f, indent=2)
+        
+        print("✅ Entraînement avancé terminé!")
+        print(f"🎯 Meilleur modèle: AUC = {best_score:.3f}")
+        return metrics
+        
+    except Exception as e:
+        print(f"❌ Erreur lors de l'entraînement: {e}")
+        raise
+
+def run_training(version: str, report: Optional[Callable[[str, float], None]] = None) -> Tuple[str, Dict[str, Any]]:
+    """Entraîner une nouvelle version, ou retrouver la version déjà produite pour les mêmes
+    données, le même code et les mêmes paramètres (la publication est faite par l'appelant)"""
+    pipeline_params = TrainingPipeline(settings.TRAINING_DATA_PATH).params
+    run_key = training_run_key(file_hash(settings.TRAINING_DATA_PATH), build_candidates(), pipeline_params)
+    index = _load_runs_index()
+    cached_version = _cached_run(index, run_key) if settings.TRAINING_RUN_CACHE else None
+
+    if cached_version is not None:
+        index["hits"] += 1
+        activation = _record_activation(index, cached_version, run_key, "hit")
+        _save_runs_index(index)
+
+        # Les artefacts en cache restent immuables : le hit est consigné dans les activations de runs.json
+        # (référencées par training_metrics.json) et dans le résultat du job
+        with open(os.path.join(VERSIONS_DIR, cached_version, 'training_metrics.json')) as f:
+            metrics = json.load(f)
+        metrics['run_cache'] = {**metrics.get('run_cache', {}), **activation}
+
+        print(f"♻️  Run déjà entraîné ({run_key[:12]}) : version {cached_version} réactivée")
+        return cached_version, metrics
+
+    index["misses"] += 1
+    metrics = train_and_save_model_advanced(
+        os.path.join(VERSIONS_DIR, version), report,
+        run_cache={
+            "status": "miss", "run_key": run_key, "hits": index["hits"], "misses": index["misses"],
+            # Les réactivations ultérieures sont consignées ici, le fichier de métriques reste immuable
+            "activations": {"file": os.path.relpath(RUNS_INDEX, settings.MODELS_DIR), "key": "activations", "version": version}
+        }
+    )
+    index["runs"][run_key] = version
+    _record_activation(index, version, run_key, "miss")
+    _save_runs_index(index)
+    return version, metrics
+
+# --- Réentraînement incrémental (warm start) ---
+
+def _extend_model(model, n_new: int):
+    """Préparer un modèle à recevoir de nouveaux arbres / étapes de boosting (warm start)"""
+    if isinstance(model, RandomForestClassifier):
+        model.set_params(warm_start=True, n_estimators=len(model.estimators_) + n_new)
+    elif isinstance(model, GradientBoostingClassifier):
+        model.set_params(warm_start=True, n_estimators=model.n_estimators_ + n_new)
+    elif isinstance(model, HistGradientBoostingClassifier):
+        model.set_params(warm_start=True, max_iter=model.n_iter_ + n_new)
+    else:
+        raise ValueError(f"Réentraînement incrémental non supporté pour {type(model).__name__}")
+    return model
+
+def _holdout_metrics(model, X_test, y_test) -> Dict[str, float]:
+    return {
+        'accuracy': accuracy_score(y_test, model.predict(X_test)),
+        'auc_score': roc_auc_score(y_test, model.predict_proba(X_test)[:, 1])
+    }
+
+INCREMENTAL_REQUIRES_VERSION = (
+    "Réentraînement incrémental impossible : aucune version publiée (anciens artefacts non versionnés "
+    "de MODELS_DIR). Lancez d'abord un entraînement complet (mode=full)."
+)
+
+def run_incremental_training(version: str, report: Optional[Callable[[str, float], None]] = None) -> Tuple[str, Dict[str, Any]]:
+    """Ajouter au modèle courant des arbres (RF) ou des étapes (GB) entraînés sur les nouvelles données
+    labellisées. La nouvelle version n'est retenue que si les métriques du holdout se maintiennent ;
+    sinon la version de base est retournée."""
+    report = report or (lambda stage, progress: None)
+    base_dir = current_model_dir()
+    base_version = current_model_version()
+    if base_version is None:
+        raise ValueError(INCREMENTAL_REQUIRES_VERSION)
+    model = joblib.load(os.path.join(base_dir, 'best_churn_model.pkl'))
+    scaler = joblib.load(os.path.join(base_dir, 'scaler.pkl'))
+    feature_names = joblib.load(os.path.join(base_dir, 'feature_names.pkl'))
+
+    # Nouvelles données et holdout, standardisés avec le scaler du modèle courant (arbres existants inchangés)
+    report("loading_new_data", 0.05)
+    new_data, _ = TrainingPipeline(settings.INCREMENTAL_DATA_PATH).run_stages(report, stop_after="encode")
+    holdout, _ = TrainingPipeline(settings.TRAINING_DATA_PATH).run_stages(report, stop_after="split")
+    # Seules les features conservées par le modèle courant (après l'étape reduce) sont utilisées
+    new_columns = feature_indices([str(name) for name in new_data["feature_names"]], list(feature_names))
+    holdout_columns = feature_indices([str(name) for name in holdout["feature_names"]], list(feature_names))
+    X_new, y_new = scaler.transform(new_data["X"][:, new_columns]), new_data["y"]
+    X_test, y_test = scaler.transform(holdout["X_test"][:, holdout_columns]), holdout["y_test"]
+
+    report("evaluating_base_model", 0.2)
+    baseline = _holdout_metrics(model, X_test, y_test)
+
+    report("warm_start", 0.3)
+    n_new = settings.INCREMENTAL_TREES if isinstance(model, RandomForestClassifier) else settings.INCREMENTAL_BOOSTING_STAGES
+    updated_model = _extend_model(copy.deepcopy(model), n_new)
+    updated_model.fit(X_new, y_new)
+    updated_model.set_params(warm_start=False)
+
+    report("evaluating_updated_model", 0.8)
+    updated = _holdout_metrics(updated_model, X_test, y_test)
+    accepted = bool(updated['auc_score'] >= baseline['auc_score'] - settings.INCREMENTAL_MAX_AUC_DROP)
+
+    metrics = {
+        'training_date': datetime.now().isoformat(),
+        'mode': 'incremental',
+        'base_version': base_version,
+        'best_model': type(updated_model).__name__,
+        'best_auc_score': updated['auc_score'],
+        'incremental': {
+            'new_data_path': settings.INCREMENTAL_DATA_PATH,
+            'new_samples': int(len(y_new)),
+            'added_estimators': n_new,
+            'baseline': baseline,
+            'updated': updated,
+            'max_auc_drop': settings.INCREMENTAL_MAX_AUC_DROP,
+            'accepted': accepted
+        },
+        'feature_names': list(feature_names)
+    }
+
+    if not accepted:
+        print(f"↩️  Mise à jour incrémentale rejetée: AUC {updated['auc_score']:.3f} < {baseline['auc_score']:.3f}")
+        return base_version, metrics
+
+    report("saving", 0.95)
+    version_dir = os.path.join(VERSIONS_DIR, version)
+    os.makedirs(version_dir, exist_ok=True)
+    joblib.dump(updated_model, os.path.join(version_dir, 'best_churn_model.pkl'))
+    joblib.dump(scaler, os.path.join(version_dir, 'scaler.pkl'))
+    joblib.dump(list(feature_names), os.path.join(version_dir, 'feature_names.pkl'))
+    with open(os.path.join(version_dir, 'training_metrics.json'), 'w') as f:
+        json.dump(metrics, f, indent=2)
+
+    print(f"✅ Mise à jour incrémentale retenue: AUC {baseline['auc_score']:.3f} → {updated['auc_score']:.3f}")
+    return version, metrics
+
+# --- Entraînement out-of-core ---
+
+def run_out_of_core_training(version: str, report: Optional[Callable[[str, float], None]] = None) -> Tuple[str, Dict[str, Any]]:
+    """Entraîner en flux sur un fichier plus grand que la mémoire et sauvegarder le meilleur candidat"""
+    data_path = settings.OUT_OF_CORE_DATA_PATH or settings.TRAINING_DATA_PATH
+    result = train_out_of_core(data_path, report)
+    model_results = result['model_results']
+    best_name = select_best_model(model_results)
+
+    report("saving", 0.95)
+    version_dir = os.path.join(VERSIONS_DIR, version)
+    os.makedirs(version_dir, exist_ok=True)
+    joblib.dump(result['models'][best_name], os.path.join(version_dir, 'best_churn_model.pkl'))
+    joblib.dump(result['scaler'], os.path.join(version_dir, 'scaler.pkl'))
+    joblib.dump(result['feature_names'], os.path.join(version_dir, 'feature_names.pkl'))
+
+    metrics = {
+        'training_date': datetime.now().isoformat(),
+        'mode': 'out_of_core',
+        'best_model': best_name,
+        'best_auc_score': model_results[best_name]['auc_score'],
+        'model_comparison': model_results,
+        'feature_names': result['feature_names'],
+        'dropped_features': result['dropped_features'],
+        'out_of_core': {
+            key: result[key] for key in ('rows', 'train_rows', 'chunks', 'chunk_rows', 'data_size_bytes')
+        }
+    }
+    with open(os.path.join(version_dir, 'training_metrics.json'), 'w') as f:
+        json.dump(metrics, f, indent=2)
+
+    print(f"✅ Entraînement out-of-core terminé: {best_name}, AUC = {metrics['best_auc_score']:.3f}")
+    return version, metrics
+
+TRAINING_RUNNERS = {
+    "full": lambda version, report: run_training(version, report),
+    "incremental": lambda version, report: run_incremental_training(version, report),
+    "out_of_core": lambda version, report: run_out_of_core_training(version, report)
+}
+
+def _discard_version(version: str):
+    """Supprimer une version inachevée ; une version déjà publiée n'est jamais supprimée"""
+    if current_model_version() != version:
+        shutil.rmtree(os.path.join(VERSIONS_DIR, version), ignore_errors=True)
+
+def _worker_main(messages, cancel_event, version: str, mode: str = "full"):
+    """Point d'entrée du processus d'entraînement"""
+    _apply_cpu_budget()
+    train = TRAINING_RUNNERS[mode]
+
+    def report(stage: str, progress: float):
+        # Point d'annulation coopératif : l'entraînement s'arrête entre deux étapes
+        if cancel_event.is_set():
+            raise TrainingCancelled(version)
+        messages.put(("progress", stage, progress))
+
+    try:
+        trained_version, metrics = train(version, report=report)
+        # Évaluation holdout stockée avec la version : l'API la sert sans la recalculer
+        report("holdout_evaluation", 0.98)
+        evaluate_version(os.path.join(VERSIONS_DIR, trained_version))
+        # Publication en tout dernier : une annulation avant ce point ne touche pas la version servie
+        report("publishing", 0.99)
+        publish_version(trained_version)
+        messages.put(("done", trained_version, json.loads(json.dumps(metrics, default=float))))
+    except TrainingCancelled:
+        # Arrêter les processus du pool d'entraînement avant de quitter
+        get_reusable_executor().shutdown(wait=True, kill_workers=True)
+        _discard_version(version)
+        messages.put(("cancelled",))
+    except Exception as e:
+        _discard_version(version)
+        messages.put(("error", str(e)))
+
+def train_in_worker(job: TrainingJob) -> Dict[str, Any]:
+    """Exécuter un entraînement dans un processus séparé et relayer sa progression au job.
+    L'annulation est d'abord coopérative (le worker s'arrête à sa prochaine étape) ; passé
+    TRAINING_CANCEL_TIMEOUT_SECONDS le processus est terminé. La version inachevée est supprimée."""
+    context = multiprocessing.get_context("spawn")
+    messages = context.Queue()
+    cancel_event = context.Event()
+    version = datetime.now().strftime("%Y%m%d%H%M%S")
+    # Processus non démon : il lance lui-même le pool de processus d'entraînement
+    process = context.Process(target=_worker_main, args=(messages, cancel_event, version, job.mode),
+                              name=f"churn-training-{version}")
+    process.start()
+    print(f"🧵 Entraînement {job.mode} lancé dans le processus {process.pid} (version {version})")
+
+    cancel_deadline = None
+    try:
+        while True:
+            if job.cancel_requested and cancel_deadline is None:
+                cancel_event.set()
+                cancel_deadline = time.monotonic() + settings.TRAINING_CANCEL_TIMEOUT_SECONDS
+
+            if cancel_deadline is not None and time.monotonic() > cancel_deadline:
+                # Le worker n'a pas atteint de point d'annulation à temps
+                print(f"⚠️  Entraînement {job.job_id} non arrêté après {settings.TRAINING_CANCEL_TIMEOUT_SECONDS}s : processus terminé")
+                process.terminate()
+                process.join()
+                _discard_version(version)
+                raise TrainingCancelled(job.job_id)
+
+            try:
+                message = messages.get(timeout=0.5)
+            except queue.Empty:
+                if not process.is_alive():
+                    _discard_version(version)
+                    if cancel_deadline is not None:
+                        raise TrainingCancelled(job.job_id)
+                    raise RuntimeError(f"Le processus d'entraînement s'est arrêté (code {process.exitcode})")
+                continue
+
+            if message[0] == "progress":
+                _, job.stage, job.progress = message
+            elif message[0] == "done":
+                # Terminé et publié avant que l'annulation ne soit prise en compte : le résultat est conservé
+                return {"version": message[1], "metrics": message[2]}
+            elif message[0] == "cancelled":
+                raise TrainingCancelled(job.job_id)
+            else:
+                raise RuntimeError(message[1])
+    finally:
+        process.join(timeout=5)
+
+if __name__ == "__main__":
+    # Entraînement manuel hors API : nouvelle version publiée comme courante
+    _apply_cpu_budget()
+    published_version, _ = run_training(datetime.now().strftime("%Y%m%d%H%M%S"))
+    publish_version(published_version)
+    print(f"📦 Version {published_version} publiée")
@@ -41,10 +41,17 @@ export const Analytics: React.FC = () => {
     }
   }
 
-  // Recharger les données toutes les 30 secondes
+  // Appliquer les deltas poussés par le serveur en temps réel
   useEffect(() => {
-    const interval = setInterval(loadAllData, 30000)
-    return () => clearInterval(interval)
+    const unsubscribe = apiService.subscribeToDashboardStream((event) => {
+      setAdvancedAnalytics(current => current ? apiService.applyDashboardDelta(current, event) : current)
+    }, () => {
+      // Deltas manqués côté serveur : recharger les agrégats complets
+      apiService.getAdvancedAnalytics()
+        .then(setAdvancedAnalytics)
+        .catch(err => console.error('Error resyncing analytics:', err))
+    })
+    return unsubscribe
   }, [])
 
   if (loading) {
@@ -94,6 +101,11 @@ export const Analytics: React.FC = () => {
       color: getColorForIndex(index)
     }))
 
+  // Métriques absentes tant que le modèle n'a pas été évalué sur le holdout
+  function formatMetric(value: number | null): string {
+    return value === null ? 'N/A' : `${(value * 100).toFixed(1)}%`
+  }
+
   function getColorForIndex(index: number): string {
     const colors = ['#3b82f6', '#ef4444', '#10b981', '#f59e0b', '#8b5cf6', '#ec4899']
     return colors[index % colors.length]
@@ -194,30 +206,31 @@ export const Analytics: React.FC = () => {
               <div className="flex justify-between">
                 <span className="text-gray-600">Accuracy</span>
                 <span className="font-semibold text-green-600">
-                  {(modelMetrics.accuracy * 100).toFixed(1)}%
+                  {formatMetric(modelMetrics.accuracy)}
                 </span>
               </div>
               <div className="flex justify-between">
                 <span className="text-gray-600">Precision</span>
                 <span className="font-semibold text-blue-600">
-                  {(modelMetrics.precision * 100).toFixed(1)}%
+                  {formatMetric(modelMetrics.precision)}
                 </span>
               </div>
               <div className="flex justify-between">
                 <span className="text-gray-600">Recall</span>
                 <span className="font-semibold text-purple-600">
-                  {(modelMetrics.recall * 100).toFixed(1)}%
+                  {formatMetric(modelMetrics.recall)}
                 </span>
               </div>
               <div className="flex justify-between">
                 <span className="text-gray-600">F1-Score</span>
                 <span className="font-semibold text-orange-600">
-                  {(modelMetrics.f1_score * 100).toFixed(1)}%
+                  {formatMetric(modelMetrics.f1_score)}
                 </span>
               </div>
               <div className="pt-2 border-t border-gray-200">
                 <div className="text-sm text-gray-500">
-                  Model: {modelMetrics.model_version} • Trained: {modelMetrics.training_date}
+                  Model: {modelMetrics.model_version} • Trained: {modelMetrics.training_date ?? 'N/A'}
+                  {modelMetrics.evaluation_status !== 'evaluated' && ` • Evaluation: ${modelMetrics.evaluation_status}`}
                 </div>
               </div>
             </div>
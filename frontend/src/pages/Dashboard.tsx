@@ -13,8 +13,16 @@ export const Dashboard: React.FC = () => {
   useEffect(() => {
     loadDashboardData();
     
-    const interval = setInterval(loadDashboardData, 30000);
-    return () => clearInterval(interval);
+    // Mises à jour poussées par le serveur au lieu d'un polling toutes les 30 secondes
+    const unsubscribe = apiService.subscribeToDashboardStream((event) => {
+      setAnalytics(current => current ? apiService.applyDashboardDelta(current, event) : current);
+      setRecentPredictions(current => [event.prediction, ...current].slice(0, 5));
+      setLastUpdate(new Date().toLocaleTimeString());
+    }, () => {
+      // Deltas manqués côté serveur : recharger l'état complet
+      loadDashboardData();
+    });
+    return unsubscribe;
   }, []);
 
   const loadDashboardData = async () => {
@@ -10,7 +10,10 @@ import {
   AnalyticsResponse,
   BatchPredictionInput,
   BatchPredictionResponse,
-  PredictionHistory
+  PredictionHistory,
+  DashboardStreamEvent,
+  DashboardResyncEvent,
+  TrendsResponse
 } from '../types';
 
 const API_BASE_URL = 'http://localhost:8000';
@@ -73,25 +76,87 @@ class ApiService {
     );
   }
 
+  async getTrends(
+    start: Date,
+    end: Date,
+    granularity: 'hour' | 'day' | 'month' = 'day'
+  ): Promise<TrendsResponse> {
+    // Le backend travaille en heure locale naïve : ne pas convertir en UTC
+    const toLocalISO = (date: Date) =>
+      new Date(date.getTime() - date.getTimezoneOffset() * 60000).toISOString().slice(0, 19);
+    const params = new URLSearchParams({
+      start: toLocalISO(start),
+      end: toLocalISO(end),
+      granularity
+    });
+    return this.fetchWithErrorHandling(`${API_BASE_URL}/analytics/trends?${params}`);
+  }
+
   async retrainModel(): Promise<{ message: string }> {
     return this.fetchWithErrorHandling(`${API_BASE_URL}/model/retrain`, {
       method: 'POST',
     });
   }
 
+  // === FLUX EN DIRECT ===
+
+  subscribeToDashboardStream(
+    onEvent: (event: DashboardStreamEvent) => void,
+    onResync?: (event: DashboardResyncEvent) => void
+  ): () => void {
+    const source = new EventSource(`${API_BASE_URL}/analytics/stream`);
+    const handler = (message: MessageEvent) => {
+      try {
+        onEvent(JSON.parse(message.data));
+      } catch (error) {
+        console.error('Invalid stream event:', error);
+      }
+    };
+    source.addEventListener('prediction', handler as EventListener);
+    if (onResync) {
+      source.addEventListener('resync', ((message: MessageEvent) => onResync(JSON.parse(message.data))) as EventListener);
+    }
+    return () => source.close();
+  }
+
+  applyDashboardDelta(analytics: AnalyticsResponse, event: DashboardStreamEvent): AnalyticsResponse {
+    const { delta } = event;
+    const previousTotal = analytics.total_predictions;
+    const total = previousTotal + delta.total_predictions;
+    const churnCount = analytics.churn_rate * previousTotal + delta.churn_count;
+    const confidenceSum = analytics.avg_confidence * previousTotal + delta.confidence;
+
+    const hourly = { ...analytics.hourly_distribution };
+    Object.entries(delta.hourly_distribution).forEach(([hour, count]) => {
+      hourly[hour] = (hourly[hour] || 0) + count;
+    });
+
+    return {
+      total_predictions: total,
+      churn_rate: total > 0 ? churnCount / total : 0,
+      avg_confidence: total > 0 ? confidenceSum / total : analytics.avg_confidence,
+      predictions_today: analytics.predictions_today + delta.predictions_today,
+      high_risk_customers: analytics.high_risk_customers + delta.high_risk_customers,
+      hourly_distribution: hourly
+    };
+  }
+
   // === MÉTHODES DE COMPATIBILITÉ ===
 
   async getAnalytics(): Promise<AnalyticsData> {
     try {
       // Essayer d'abord le nouvel endpoint
-      const advancedData = await this.getAdvancedAnalytics();
+      const [advancedData, monthlyTrends] = await Promise.all([
+        this.getAdvancedAnalytics(),
+        this.getMonthlyTrends()
+      ]);
       
       // Convertir les nouvelles données en format ancien pour la compatibilité
       return {
         totalCustomers: advancedData.total_predictions,
         churnRate: advancedData.churn_rate,
         predictionAccuracy: advancedData.avg_confidence,
-        monthlyTrends: this.generateMonthlyTrends(advancedData)
+        monthlyTrends
       };
     } catch (error) {
       console.error('Failed to get advanced analytics, using fallback:', error);
@@ -100,15 +165,16 @@ class ApiService {
     }
   }
 
-  private generateMonthlyTrends(analytics: AnalyticsResponse) {
-    // Générer des tendances mensuelles basées sur les données actuelles
-    const months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun'];
-    const baseChurn = Math.round(analytics.total_predictions * analytics.churn_rate / 6);
-    
-    return months.map(month => ({
-      month,
-      churn: Math.round(baseChurn * (0.8 + Math.random() * 0.4)),
-      retained: Math.round((analytics.total_predictions / 6) * (1 - analytics.churn_rate) * (0.8 + Math.random() * 0.4))
+  private async getMonthlyTrends() {
+    // Tendances mensuelles réelles des 6 derniers mois, servies par les rollups du backend
+    const end = new Date();
+    const start = new Date(end.getFullYear(), end.getMonth() - 5, 1);
+    const trends = await this.getTrends(start, end, 'month');
+
+    return trends.points.map(point => ({
+      month: new Date(`${point.period}-01T00:00:00`).toLocaleString('en-US', { month: 'short' }),
+      churn: point.churn_count,
+      retained: point.count - point.churn_count
     }));
   }
 
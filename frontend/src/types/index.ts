@@ -61,18 +61,24 @@ export interface BatchPredictionResponse {
 // Interfaces pour les métriques du modèle
 export interface ModelMetricsResponse {
   model_version: string;
-  training_date: string;
-  accuracy: number;
-  precision: number;
-  recall: number;
-  f1_score: number;
+  evaluation_status: 'evaluated' | 'pending' | 'failed' | 'not_evaluated';
+  artifact?: string | null;
+  holdout_source?: 'training_split' | 'out_of_core_holdout' | 'external' | null;
+  training_date: string | null;
+  accuracy: number | null;
+  precision: number | null;
+  recall: number | null;
+  f1_score: number | null;
   feature_importance: { [key: string]: number };
   confusion_matrix: {
     true_positive: number[];
     false_positive: number[];
     false_negative: number[];
     true_negative: number[];
-  };
+  } | null;
+  auc_score?: number | null;
+  evaluated_rows?: number | null;
+  latency?: { [key: string]: number } | null;
 }
 
 // Interfaces pour l'analytics avancé
@@ -85,6 +91,51 @@ export interface AnalyticsResponse {
   hourly_distribution: { [key: string]: number };
 }
 
+// Interfaces pour les tendances (rollups)
+export interface TrendPoint {
+  period: string;
+  count: number;
+  churn_count: number;
+  churn_rate: number;
+  avg_probability: number;
+  risk_counts: { [key: string]: number };
+}
+
+export interface TrendsResponse {
+  granularity: 'hour' | 'day' | 'month';
+  start: string;
+  end: string;
+  points: TrendPoint[];
+}
+
+// Interfaces pour le flux en direct du tableau de bord (SSE)
+export interface DashboardDelta {
+  total_predictions: number;
+  churn_count: number;
+  predictions_today: number;
+  high_risk_customers: number;
+  confidence: number;
+  hourly_distribution: { [key: string]: number };
+}
+
+export interface DashboardStreamEvent {
+  type: 'prediction';
+  timestamp: string;
+  delta: DashboardDelta;
+  prediction: PredictionResponse;
+  high_risk_customer?: {
+    customer_id?: string;
+    customer_name?: string;
+    churn_probability: number;
+  };
+}
+
+// Envoyé à un abonné trop lent : ses deltas ont été abandonnés, l'état doit être rechargé
+export interface DashboardResyncEvent {
+  type: 'resync';
+  timestamp: string;
+}
+
 // Interface pour l'historique des prédictions
 export interface PredictionHistory {
   predictions: PredictionResponse[];